@@ -0,0 +1,31 @@
+import pygame
+
+# Font registry: each font name is matched against the system fonts once and
+# each (name, size) pair is loaded once, however many places ask for it.
+_font_paths = {}
+_fonts = {}
+# Rendered text, for labels that are drawn every frame but rarely change
+_texts = {}
+TEXT_CACHE_SIZE = 256  # Labels kept before the cache starts over
+
+def get_font(name, size):
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        if name not in _font_paths:
+            # None makes pygame fall back to its default font, like SysFont does
+            _font_paths[name] = pygame.font.match_font(name)
+        font = pygame.font.Font(_font_paths[name], size)
+        _fonts[key] = font
+    return font
+
+def render_text(font, text, color):
+    """font.render(text, True, color), rendered once per distinct label"""
+    key = (font, text, color)
+    surface = _texts.get(key)
+    if surface is None:
+        if len(_texts) >= TEXT_CACHE_SIZE:
+            _texts.clear()  # Changing labels (scores, settings) can't pile up
+        surface = font.render(text, True, color)
+        _texts[key] = surface
+    return surface
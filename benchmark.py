@@ -0,0 +1,127 @@
+"""Headless frame-time benchmark.
+
+Runs the game loop under SDL's dummy video driver with the AI driving and
+reports frame time statistics, so backends and settings can be compared:
+
+    python benchmark.py --backend software
+    python benchmark.py --backend texture --frames 1000
+    python benchmark.py --split   # simulation in its own process
+    python benchmark.py --lanes 8 --traffic 20   # wide road, heavy traffic
+    python benchmark.py --scenario scenarios/jam.jsonl   # the same traffic every run
+"""
+import argparse
+import collections
+import os
+import random
+import statistics
+import sys
+import time
+
+DRAW_FUNCTIONS = ("line", "lines", "aaline", "aalines", "polygon", "rect", "circle", "ellipse", "arc")
+
+def count_draw_calls(counts):
+    """Wrap the pygame.draw functions so every call bumps counts[name]"""
+    import pygame
+    for name in DRAW_FUNCTIONS:
+        def counted(*args, _draw=getattr(pygame.draw, name), _name=name, **kwargs):
+            counts[_name] += 1
+            return _draw(*args, **kwargs)
+        setattr(pygame.draw, name, counted)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["software", "texture"], default="software")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--warmup", type=int, default=60)
+    parser.add_argument("--scale", type=float, default=None, help="internal render scale")
+    parser.add_argument("--tier", default="High", help="fixed quality tier name")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--split", action="store_true", help="run the simulation in its own process")
+    parser.add_argument("--inline-effects", action="store_true",
+                        help="draw the background effects in the frame loop, not on a worker thread")
+    parser.add_argument("--lanes", type=int, default=None, help="number of lanes (NUM_LANES)")
+    parser.add_argument("--traffic", type=float, default=None, help="traffic density multiplier")
+    parser.add_argument("--scenario", default=None, help="scenario file to play (car_game/scenario.py)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import config
+    if args.inline_effects:
+        config.EFFECTS_THREADED = False
+    if args.lanes:
+        # Narrower lanes if needed so the road still fits on screen when it curves
+        config.NUM_LANES = args.lanes
+        config.LANE_WIDTH = min(config.LANE_WIDTH, (config.SCREEN_WIDTH - 2 * config.CURVE_AMPLITUDE) // args.lanes)
+        config.ROAD_WIDTH = config.LANE_WIDTH * args.lanes
+        config.MIDDLE_LANE = args.lanes // 2
+    from config import QUALITY_TIERS, RENDER_SCALE
+    from car_game.main import Game
+
+    random.seed(args.seed)
+    game = Game(args.backend, RENDER_SCALE if args.scale is None else args.scale, split=args.split,
+                scenario_path=args.scenario)
+    game.record_runs = False
+    if args.traffic is not None:
+        game.menu.settings["traffic_density"] = args.traffic
+    game.quality.adaptive = False
+    game.quality.tier_index = [t["name"] for t in QUALITY_TIERS].index(args.tier)
+    game.quality._apply()
+    game.state = "playing"
+    if args.split:
+        game.start_simulation()
+        # Measure from the first published tick, not the process start-up
+        while game.sim.sync() is None:
+            time.sleep(0.01)
+
+    frame_times = []
+    draw_counts = collections.Counter()
+    road_calls = 0
+    obstacle_count = 0
+    count_draw_calls(draw_counts)
+    for frame in range(args.warmup + args.frames):
+        if frame == args.warmup:
+            draw_counts.clear()
+            measure_start = time.perf_counter()
+            first_tick = game.sim.world.read()["tick"] if args.split else 0
+            compositor = game.effects.compositor
+            first_redraw = compositor.frames if compositor is not None else 0
+        start = time.perf_counter()
+        game.update()
+        game.render()
+        game.present()
+        if frame >= args.warmup:
+            frame_times.append((time.perf_counter() - start) * 1000)
+            road_calls += game.renderer.road_draw_calls
+            obstacle_count += len(game.obstacles.obstacles)
+        if game.game_over:
+            game.reset_game()
+
+    frame_times.sort()
+    p95 = frame_times[int(len(frame_times) * 0.95)]
+    print(f"backend={game.backend} scale={game.effects.target.scale} tier={args.tier} "
+          f"frames={args.frames} lanes={config.NUM_LANES} obstacles/frame={obstacle_count / args.frames:.1f}")
+    print(f"frame ms: mean {statistics.mean(frame_times):.2f}  "
+          f"median {statistics.median(frame_times):.2f}  p95 {p95:.2f}")
+    print(f"draw calls/frame: road {road_calls / args.frames:.1f}  pygame.draw "
+          f"{sum(draw_counts.values()) / args.frames:.1f} (" + "  ".join(
+              f"{name} {count / args.frames:.1f}" for name, count in draw_counts.most_common()) + ")")
+    if args.split:
+        ticks = int(game.sim.world.read()["tick"] - first_tick)
+        print(f"simulation: {ticks / (time.perf_counter() - measure_start):.1f} ticks/s in its own process")
+    post = game.renderer.post_processor
+    if game.backend == "software" and game.renderer.post_process and post is not None:
+        print("post-process ms: " + "  ".join(
+            f"{name} {post.cost_ms[name]:.2f} (skipped {post.skipped[name]})"
+            for name, enabled in post.enabled.items() if enabled))
+    if compositor is not None:
+        redraws = compositor.frames - first_redraw
+        print(f"background: {redraws / (time.perf_counter() - measure_start):.1f} "
+              f"redraws/s on its thread (target {compositor.fps})")
+    if game.sim is not None:
+        game.sim.close()
+    game.effects.shutdown()
+    game.io.shutdown()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,13 @@
+import asyncio
+import sys
 from car_game.main import Game
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    backend = "texture" if "--texture" in sys.argv else "software"
+    trace_path = sys.argv[sys.argv.index("--trace") + 1] if "--trace" in sys.argv else None
+    scenario_path = sys.argv[sys.argv.index("--scenario") + 1] if "--scenario" in sys.argv else None
+    game = Game(backend, trace_path=trace_path, split="--split" in sys.argv, scenario_path=scenario_path)
+    if "--async" in sys.argv:
+        asyncio.run(game.run_async())
+    else:
+        game.run()
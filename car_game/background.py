@@ -0,0 +1,69 @@
+import queue
+import threading
+import time
+
+class BackgroundIO:
+    """Runs disk and socket work off the frame loop.
+
+    Jobs go through a bounded queue to a small pool of worker threads.
+    submit() never blocks: when the queue is full the job is dropped and
+    counted, so a slow disk or collector can't stall frames.
+    """
+    def __init__(self, workers=2, max_pending=64):
+        self.jobs = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.failed = 0
+        self.threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._worker, name=f"background-io-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, func, *args, **kwargs):
+        """Queue func(*args, **kwargs); returns False if the job was dropped"""
+        try:
+            self.jobs.put_nowait((func, args, kwargs))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _worker(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                if job is None:
+                    return
+                func, args, kwargs = job
+                func(*args, **kwargs)
+            except Exception as e:
+                self.failed += 1
+                print(f"Background job failed: {e!r}")
+            finally:
+                self.jobs.task_done()
+
+    def shutdown(self, timeout=2.0):
+        """Let queued jobs finish (up to timeout) and stop the workers"""
+        for _ in self.threads:
+            try:
+                self.jobs.put(None, timeout=timeout)
+            except queue.Full:
+                break
+        deadline = time.monotonic() + timeout
+        for thread in self.threads:
+            thread.join(max(0, deadline - time.monotonic()))
+
+class FramePacer:
+    """Monotonic-clock frame scheduler used instead of pygame's clock.tick"""
+    def __init__(self, fps):
+        self.frame_time = 1.0 / fps
+        self.next_frame = time.monotonic()
+
+    def delay(self):
+        """Seconds to wait before the next frame is due"""
+        self.next_frame += self.frame_time
+        now = time.monotonic()
+        if now - self.next_frame > self.frame_time:
+            # Fell more than a frame behind: resync instead of bursting to catch up
+            self.next_frame = now
+        return max(0.0, self.next_frame - now)
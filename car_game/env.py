@@ -0,0 +1,162 @@
+import collections
+import random
+import numpy as np
+from config import *
+from game_objects.car import Car
+from game_objects.road import Road
+from game_objects.obstacle import ObstacleManager
+from game_objects.snapshot import WORLD_STATE_DTYPE, snapshot_world, restore_world
+
+# Action indices for CarEnv.step
+STAY, LEFT, RIGHT = 0, 1, 2
+ACTION_DIRECTIONS = {STAY: 0, LEFT: -1, RIGHT: 1}
+
+NO_KEYS = collections.defaultdict(bool)  # Stands in for pygame.key.get_pressed()
+LANE_SCALE = max(NUM_LANES - 1, 1)  # Lane indices are observed in [0, 1]
+
+ENV_STATE_DTYPE = np.dtype([("world", WORLD_STATE_DTYPE), ("steps", np.int64)])
+
+class CarEnv:
+    """The game simulation as a reinforcement-learning environment.
+
+    Same tick as Game.update (car, road scroll, obstacles, collision) but
+    with no window: nothing in reset() or step() touches the display or
+    fonts. render() draws the current state with GameRenderer onto an
+    offscreen surface, built the first time it is called.
+
+    Actions are STAY, LEFT and RIGHT. The observation is a float32 vector:
+    car offset from the road center, angle, lane, target lane, lane change
+    flags, the free distance ahead in each lane, and the road center at
+    ENV_ROAD_SAMPLES points ahead of the car. With observe set, info also
+    carries "occupancy", a lanes x distance bins view of the obstacles;
+    it costs a fifth of a step, so it is off by default.
+    """
+    num_actions = len(ACTION_DIRECTIONS)
+    observation_size = 6 + NUM_LANES + ENV_ROAD_SAMPLES
+
+    def __init__(self, settings=None, max_steps=ENV_MAX_STEPS, ai_mode=False, observe=False):
+        self.settings = settings if settings is not None else {}
+        self.max_steps = max_steps
+        self.ai_mode = ai_mode  # Let AIDriver steer; actions are then ignored
+        self.observe = observe  # Build info["occupancy"] every step
+        self.renderer = None
+        self.surface = None
+        self.reset()
+
+    def reset(self, seed=None):
+        """Start a new episode and return its first observation.
+
+        The game objects draw from the module-level random generator, so a
+        seed makes the whole episode (road, spawns, traffic) reproducible.
+        """
+        if seed is not None:
+            random.seed(seed)
+        self.car = Car()
+        self.car.ai_mode = self.ai_mode
+        self.road = Road()
+        self.obstacles = ObstacleManager(self.settings)
+        self.obstacles.observe = self.observe
+        # Game objects reach shared state through .game, as they do in Game
+        self.car.game = self
+        self.road.game = self
+        self.distance = 0
+        self.score = 0
+        self.steps = 0
+        self.game_over = False
+        if self.renderer is not None:
+            self.renderer.reset()
+        return self._observe()
+
+    def step(self, action):
+        """Advance one tick; returns (observation, reward, done, info)"""
+        if self.game_over:
+            raise RuntimeError("step() called on a finished episode; call reset()")
+
+        if not self.ai_mode:
+            direction = ACTION_DIRECTIONS[action]
+            if direction:
+                self.car.request_lane_change(direction)
+        self.car.update(NO_KEYS, self.road)
+        self.road.scroll()
+        self.distance += SCROLL_SPEED
+        self.score = int(self.distance / 10)
+        self.obstacles.update(self.road)
+        self.steps += 1
+
+        crashed = self.obstacles.check_collision(self.car)
+        truncated = not crashed and self.steps >= self.max_steps
+        self.game_over = crashed or truncated
+
+        reward = ENV_ALIVE_REWARD
+        if self.car.off_road:
+            reward += ENV_OFF_ROAD_PENALTY
+        if crashed:
+            reward += ENV_CRASH_PENALTY
+
+        info = {
+            "distance": self.distance,
+            "score": self.score,
+            "crashed": crashed,
+            "truncated": truncated,
+            "off_road": self.car.off_road,
+        }
+        if self.observe:
+            # Lanes x distance bins view, see ObstacleManager.update_observation
+            info["occupancy"] = self.obstacles.observation
+        return self._observe(), reward, self.game_over, info
+
+    def snapshot(self, out=None):
+        """Episode state as a 0-d ENV_STATE_DTYPE array, written into out if given.
+
+        restore() of it and the same actions reproduce the same steps, so
+        a planner can try several continuations from one state.
+        """
+        state = np.zeros((), ENV_STATE_DTYPE) if out is None else out
+        snapshot_world(self, state["world"])
+        state["steps"] = self.steps
+        return state
+
+    def restore(self, state):
+        """Return to a snapshot() state; returns its observation"""
+        restore_world(self, state["world"])
+        self.steps = int(state["steps"])
+        return self._observe()
+
+    def _observe(self):
+        car, road = self.car, self.road
+        car_center_x = car.x + CAR_WIDTH / 2
+        car_center_y = car.y + CAR_HEIGHT / 2
+        road_center = road.get_road_center(car_center_y)
+
+        # Free distance ahead of the car's nose in each lane
+        free = [ENV_LOOK_AHEAD] * NUM_LANES
+        for obs in self.obstacles.obstacles:
+            gap = car.y - (obs.y + obs.height)
+            if -CAR_HEIGHT < gap < free[obs.lane]:
+                free[obs.lane] = max(gap, 0)
+
+        observation = [
+            (car_center_x - road_center) / (ROAD_WIDTH / 2),
+            car.angle / MAX_ROTATION,
+            car.lane / LANE_SCALE,
+            car.target_lane / LANE_SCALE,
+            float(car.is_changing_lanes),
+            car.lane_change_cooldown / LANE_CHANGE_COOLDOWN_MAX,
+        ]
+        observation.extend(gap / ENV_LOOK_AHEAD for gap in free)
+        for i in range(1, ENV_ROAD_SAMPLES + 1):
+            ahead = road.get_road_center(car_center_y - i * ENV_ROAD_SAMPLE_SPACING)
+            observation.append((ahead - road_center) / CURVE_AMPLITUDE)
+        return np.array(observation, dtype=np.float32)
+
+    def render(self):
+        """Draw the current state offscreen and return it as an (H, W, 3) array"""
+        import pygame
+        if self.renderer is None:
+            # Fonts and surfaces only; no window is opened
+            pygame.font.init()
+            from renderer import GameRenderer
+            self.surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.renderer = GameRenderer(self.surface, settings=self.settings)
+        self.renderer.render_game(self.road, self.car, self.obstacles)
+        return pygame.surfarray.array3d(self.surface).swapaxes(0, 1)
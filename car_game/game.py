@@ -11,6 +11,8 @@ class Game:
     def __init__(self, screen, clock):
         self.screen = screen
         self.clock = clock
+        # Built once: its sprites and surfaces outlive any single game
+        self.renderer = GameRenderer(self.screen)
         self.reset_game()
 
     def reset_game(self):
@@ -18,7 +20,9 @@ class Game:
         self.road = Road()
         self.scenery = SceneryManager()
         self.obstacles = ObstacleManager()
-        self.renderer = GameRenderer(screen)
+        self.renderer.reset()
+        self.car.game = self
+        self.road.game = self
         self.auto_scroll = True
         self.running = True
         self.game_over = False
@@ -35,15 +39,14 @@ class Game:
                     self.reset_game()
 
     def update(self):
-        if self.game_over:
-            return
+        if self.game_over or not self.auto_scroll:
+            return  # Paused, nothing moves
 
         keys = pygame.key.get_pressed()
         self.car.update(keys, self.road)
         
-        if self.auto_scroll:
-            self.road.scroll()
-            self.score += 1
+        self.road.scroll()
+        self.score += 1
         
         self.scenery.update(self.road)
         self.obstacles.update(self.road)
@@ -54,7 +57,7 @@ class Game:
 
     def render(self):
         self.screen.fill(GREEN)
-        self.renderer.render_game(self.scenery, self.road, self.car, self.obstacles)
+        self.renderer.render_game(self.road, self.car, self.obstacles, self.scenery)
         
         # Render score
         score_text = self.renderer.debug_font.render(f"Score: {self.score}", True, WHITE)
@@ -0,0 +1,43 @@
+import sqlite3
+import threading
+import time
+
+class LeaderboardStore:
+    """SQLite-backed run history with an index on score.
+
+    Top-N reads walk the score index, so they stay fast no matter how many
+    runs are stored. Each write is a single transaction, so a crash never
+    leaves a half-written run behind.
+    """
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        # Writes happen on BackgroundIO threads, reads on the main thread
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "id INTEGER PRIMARY KEY, name TEXT NOT NULL, score INTEGER NOT NULL, "
+                "distance INTEGER NOT NULL, created REAL NOT NULL)")
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC)")
+
+    def add_run(self, name, score, distance):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO runs (name, score, distance, created) VALUES (?, ?, ?, ?)",
+                (name, int(score), int(distance), time.time()))
+
+    def top(self, n):
+        """Best n runs as (name, score) pairs, highest first"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT name, score FROM runs ORDER BY score DESC LIMIT ?", (n,)).fetchall()
+
+    def best_score(self):
+        best = self.top(1)
+        return best[0][1] if best else 0
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
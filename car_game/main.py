@@ -1,27 +1,88 @@
+import asyncio
 import pygame
 import sys
+import time
 from config import *
 from game_objects.car import Car
 from game_objects.road import Road
 from game_objects.obstacle import ObstacleManager
+from game_objects.scenery import SceneryManager
+from game_objects.ai_driver import AIDriver
 from renderer import GameRenderer
+from texture_renderer import TextureDisplay, TextureRenderer
+from effects import BackgroundEffects
 from car_game.menu import Menu
+from car_game.background import BackgroundIO, FramePacer
+from car_game.leaderboard import LeaderboardStore
+from car_game.trace import TraceRecorder
+from car_game.sim_process import SimulationClient
+from car_game.scenario import Scenario
+from quality import QualityController
 
 class Game:
-    def __init__(self):
+    def __init__(self, backend=RENDER_BACKEND, render_scale=RENDER_SCALE, trace_path=None,
+                 split=False, scenario_path=None):
+        if split and scenario_path:
+            raise ValueError("scenarios play in this process; they can't be combined with split")
+        self.startup_time = time.perf_counter()
+        self.first_frame_ms = None
         pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Car Game")
+        self.display = TextureDisplay.create("Car Game") if backend == "texture" else None
+        if self.display is not None:
+            # Menu and HUD draw in software onto the overlay; the world uses textures
+            self.screen = self.display.overlay
+            render_scale = 1.0
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Car Game")
+        self.backend = "texture" if self.display is not None else "software"
         self.clock = pygame.time.Clock()
-        self.menu = Menu(self.screen)
+        self.io = BackgroundIO()
+        self.leaderboard = LeaderboardStore(LEADERBOARD_PATH)
+        self.high_score = self.leaderboard.best_score()
+        self.record_runs = True  # Benchmarks and headless runs switch this off
+        self.ai_params_path = AIDriver.load_params(required=False)  # Reported with startup
+        # Per-tick state trace for offline analysis, written off the frame loop
+        self.trace_path = trace_path
+        self.trace = TraceRecorder(trace_path) if trace_path and not split else None
+        # With split, the simulation runs in its own process and this one only
+        # renders its snapshots; the process starts with the first game
+        self.split = split
+        self.sim = None
+        # A scripted run replaces the random road and spawns; restarting replays it
+        self.scenario = Scenario(scenario_path) if scenario_path else None
+        if self.scenario is not None:
+            self.record_runs = False
+        # One set of background effects for both the menu and the game,
+        # drawn on a worker thread with the software backend; the texture
+        # backend reads their state directly every frame
+        self.effects = BackgroundEffects(self.screen, render_scale,
+                                         threaded=EFFECTS_THREADED and self.display is None)
+        self.menu = Menu(self.screen, self.leaderboard, self.effects)
+        # The renderer lives for the whole session; reset_game only clears its state
+        if self.display is not None:
+            self.renderer = TextureRenderer(self.screen, self.effects, self.display.renderer,
+                                            self.menu.settings)
+        else:
+            self.renderer = GameRenderer(self.screen, self.effects, self.menu.settings)
+        self.quality = QualityController([self.effects, self.renderer])
         self.state = "menu"  # menu, playing
+        # The menu and a paused game drop to IDLE_FPS after IDLE_DELAY
+        # without input, and wait on the event queue between frames
+        self.idle = False
+        self.last_input = time.perf_counter()
+        self.pending_events = []  # The event an idle wait woke up on
         self.reset_game()
 
     def reset_game(self):
+        if self.scenario is not None:
+            self.scenario.restart()  # Seeds the random generator before anything is built
         self.car = Car()
         self.road = Road()
-        self.obstacles = ObstacleManager()
-        self.renderer = GameRenderer(self.screen)
+        self.scenery = SceneryManager()
+        self.obstacles = ObstacleManager(self.menu.settings)
+        self.obstacles.recorder = self.trace
+        self.renderer.reset()
         
         # Add game references
         self.car.game = self
@@ -33,57 +94,122 @@ class Game:
         self.score = 0
         self.distance = 0
         self.speed_multiplier = 1.0
-        self.high_score = 0
+        if self.scenario is not None:
+            self.scenario.apply(self)
+        if self.sim is not None:
+            self.sim.reset(self.menu.settings)
+
+    def poll_events(self):
+        """This frame's input events; any event counts as activity"""
+        events = self.pending_events + pygame.event.get()
+        self.pending_events = []
+        if events:
+            self.last_input = time.perf_counter()
+        return events
 
     def handle_game_events(self):
-        for event in pygame.event.get():
+        for event in self.poll_events():
             if event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE and not self.game_over:
-                    self.auto_scroll = not self.auto_scroll
+                    if self.sim is not None:
+                        self.sim.send("pause")
+                    else:
+                        self.auto_scroll = not self.auto_scroll
                 elif event.key == pygame.K_r and self.game_over:
                     self.reset_game()
                 elif event.key == pygame.K_a:  # Toggle AI mode
-                    self.car.toggle_ai_mode()
+                    if self.sim is not None:
+                        self.sim.send("toggle_ai")
+                    else:
+                        self.car.toggle_ai_mode()
 
         return self.running
 
     def update(self):
-        if self.game_over:
+        if self.sim is not None:
+            self._sync_simulation()
             return
+        if self.game_over or not self.auto_scroll:
+            return  # Paused, the whole world waits: car, road and traffic
+        if self.scenario is not None:
+            self.scenario.update(self)
 
         keys = pygame.key.get_pressed()
         self.car.update(keys, self.road)
         
-        if self.auto_scroll:
-            self.road.scroll()
-            # Update distance and score
-            self.distance += SCROLL_SPEED
-            self.score = int(self.distance / 10)
-            
-            # Update high score if current score is higher
-            if self.score > self.high_score:
-                self.high_score = self.score
+        self.road.scroll()
+        # Update distance and score
+        self.distance += SCROLL_SPEED
+        self.score = int(self.distance / 10)
         
+        # Update high score if current score is higher
+        if self.score > self.high_score:
+            self.high_score = self.score
+        self.scenery.update(self.road)
+
+        if self.trace is not None:
+            self.trace.record_car(self.car, self.road)
         self.obstacles.update(self.road)
 
         # Check for collisions
-        if self.obstacles.check_collision(self.car):
+        crashed = self.obstacles.check_collision(self.car)
+        if crashed:
             self.game_over = True
+            self._save_run()
+        if self.scenario is not None and (crashed or self.scenario.finished):
+            self.game_over = True
+            self.scenario.report(self.scenario.outcome(self, crashed))
+
+    def start_simulation(self):
+        """Start the simulation process for split mode"""
+        self.sim = SimulationClient(self.menu.settings, self.trace_path)
+
+    def _sync_simulation(self):
+        # Input goes to the simulation; the world comes back as a snapshot
+        keys = pygame.key.get_pressed()
+        self.sim.send_keys(keys[pygame.K_LEFT], keys[pygame.K_RIGHT])
+        snapshot = self.sim.sync()
+        if snapshot is None:
+            return
+        self.car, self.road, self.obstacles = self.sim.car, self.sim.road, self.sim.obstacles
+        self.auto_scroll = bool(snapshot["auto_scroll"])
+        self.distance = int(snapshot["distance"])
+        self.score = int(snapshot["score"])
+        if self.score > self.high_score:
+            self.high_score = self.score
+        # Scenery is only drawn, so it stays in this process
+        self.scenery.update(self.road)
+        if snapshot["game_over"] and not self.game_over:
+            self.game_over = True
+            self._save_run()
+
+    def _save_run(self):
+        if not self.record_runs:
+            return
+        # The write and the menu refresh happen on a background thread
+        def save(score, distance):
+            self.leaderboard.add_run(PLAYER_NAME, score, distance)
+            self.menu.refresh_leaderboard()
+
+        # A full queue would lose the run, so save it here instead
+        if not self.io.submit(save, self.score, self.distance):
+            save(self.score, self.distance)
 
     def render(self):
-        self.screen.fill(GREEN)
-        self.renderer.render_game(self.road, self.car, self.obstacles)
+        self.renderer.render_game(self.road, self.car, self.obstacles, self.scenery)
         
         # Render score and high score
         score_text = self.renderer.debug_font.render(f"Distance: {int(self.distance)}m", True, WHITE)
         high_score_text = self.renderer.debug_font.render(f"High Score: {self.high_score}", True, WHITE)
         points_text = self.renderer.debug_font.render(f"Points: {self.score}", True, WHITE)
+        quality_text = self.renderer.debug_font.render(f"Quality: {self.quality.tier['name']}", True, WHITE)
         
         self.screen.blit(score_text, (10, 70))
         self.screen.blit(high_score_text, (10, 100))
         self.screen.blit(points_text, (10, 130))
+        self.screen.blit(quality_text, (10, 160))
 
         if self.game_over:
             # Show game over message with final score
@@ -98,24 +224,103 @@ class Game:
             self.screen.blit(game_over_text, text_rect)
             self.screen.blit(restart_text, restart_rect)
 
-    def run(self):
-        while True:
-            if self.state == "menu":
-                action = self.menu.handle_events()
-                if action == "quit":
-                    break
-                elif action == "start_game":
-                    self.state = "playing"
-                self.menu.render()
-            
-            elif self.state == "playing":
-                if not self.handle_game_events():
-                    break
-                self.update()
-                self.render()
-            
+    def step(self):
+        """Run one frame; returns False when the game should quit"""
+        frame_start = time.perf_counter()
+        if self.state == "menu":
+            action = self.menu.handle_events(self.poll_events())
+            if action == "quit":
+                return False
+            elif action == "start_game":
+                self.state = "playing"
+                if self.split and self.sim is None:
+                    self.start_simulation()
+            self.menu.render()
+
+        elif self.state == "playing":
+            if not self.handle_game_events():
+                return False
+            self.update()
+            self.render()
+
+        self.present()
+        self._check_idle()
+        # Work time only: pacing sleeps happen outside step()
+        frame_ms = (time.perf_counter() - frame_start) * 1000
+        self.quality.record(frame_ms)
+        if self.trace is not None:
+            self.trace.end_tick(frame_ms)
+        if self.first_frame_ms is None:
+            self._report_startup()
+        return True
+
+    def _check_idle(self):
+        # Nothing moves in the menu or a paused game unless there is input
+        waiting = self.state == "menu" or (not self.auto_scroll and not self.game_over)
+        idle = waiting and time.perf_counter() - self.last_input > IDLE_DELAY
+        if idle != self.idle:
+            self.idle = idle
+            self.effects.set_fps(min(IDLE_FPS, EFFECTS_FPS) if idle else EFFECTS_FPS)
+
+    def idle_wait(self):
+        """Sleep until input arrives or the next idle frame is due"""
+        event = pygame.event.wait(1000 // IDLE_FPS)
+        if event.type != pygame.NOEVENT:
+            self.pending_events.append(event)  # Handled by the next step()
+
+    async def idle_wait_async(self):
+        """idle_wait() for run_async: polls the queue rather than blocking the loop"""
+        deadline = time.monotonic() + 1.0 / IDLE_FPS
+        while time.monotonic() < deadline and not pygame.event.peek():
+            await asyncio.sleep(1.0 / FPS)
+
+    def present(self):
+        if self.display is not None:
+            self.display.present()
+        else:
             pygame.display.flip()
-            self.clock.tick(FPS)
 
+    def _report_startup(self):
+        self.first_frame_ms = (time.perf_counter() - self.startup_time) * 1000
+        status = "OK" if self.first_frame_ms <= STARTUP_TARGET_MS else "over target"
+        print(f"Startup: first frame in {self.first_frame_ms:.0f} ms "
+              f"(target {STARTUP_TARGET_MS} ms, {status})")
+        if self.ai_params_path is not None:
+            print(f"AI parameters loaded from {self.ai_params_path}")
+
+    def run(self):
+        while self.step():
+            if self.idle:
+                self.idle_wait()
+            else:
+                self.clock.tick(FPS)
+
+        self.quit()
+
+    async def run_async(self):
+        """Frame loop as a coroutine, paced by the monotonic clock.
+
+        Other tasks on the event loop get to run while we wait for the
+        next frame; blocking I/O belongs on self.io.
+        """
+        pacer = FramePacer(FPS)
+        while self.step():
+            if self.idle:
+                await self.idle_wait_async()
+            else:
+                await asyncio.sleep(pacer.delay())
+
+        self.quit()
+
+    def quit(self):
+        if self.sim is not None:
+            self.sim.close()
+        self.effects.shutdown()
+        self.io.shutdown()
+        if self.trace is not None:
+            self.trace.close()
+        if self.scenario is not None:
+            self.scenario.close()
+        self.leaderboard.close()
         pygame.quit()
-        sys.exit() 
\ No newline at end of file
+        sys.exit()
@@ -1,7 +1,7 @@
 import pygame
-import random
 from config import *
-from effects import DigitalRain, CyberGrid, DataParticles
+from effects import BackgroundEffects, visual_random
+from assets import get_font, render_text
 
 class Button:
     def __init__(self, text, pos, size=(200, 50), color=NEON_BLUE):
@@ -12,41 +12,57 @@ class Button:
         self.is_hovered = False
         self.glitch_offset = 0
         self.glitch_timer = 0
+        self._bodies = {}  # (hovered, font, translucent) -> pre-rendered glow, body and label
         
     def draw(self, screen, font):
         # Create glitch effect
         self.glitch_timer = (self.glitch_timer + 1) % 30
         if self.glitch_timer == 0:
-            self.glitch_offset = random.randint(-2, 2)
+            self.glitch_offset = visual_random.randint(-2, 2)
         
-        # Draw button with cyber effect
-        color = self.hover_color if self.is_hovered else self.color
+        body = self._body(screen, font, self.is_hovered)
+        margin = max(GLOW_INTENSITY - 1, 0)
+        screen.blit(body, (self.rect.x - margin, self.rect.y - margin))
+        if not self.is_hovered:
+            return
+        
+        # Draw the label with glitch copies; each label and color is rendered once
+        text_surface = render_text(font, self.text, WHITE)
+        text_rect = text_surface.get_rect(center=self.rect.center)
+        glitch_colors = [CYBER_PINK, NEON_BLUE, NEON_GREEN]
+        for i, color in enumerate(glitch_colors):
+            glitch_surface = render_text(font, self.text, color)
+            offset = self.glitch_offset * (i + 1)
+            screen.blit(glitch_surface, 
+                      (text_rect.x + offset, text_rect.y))
+        screen.blit(text_surface, text_rect)
+
+    def _body(self, screen, font, hovered):
+        # Glow, button and, when not hovered, label, drawn once per hover
+        # state. The glow's alpha only shows on a screen that keeps alpha,
+        # such as the texture backend's overlay.
+        translucent = bool(screen.get_flags() & pygame.SRCALPHA)
+        key = (hovered, font, translucent)
+        body = self._bodies.get(key)
+        if body is not None:
+            return body
+        color = self.hover_color if hovered else self.color
+        margin = max(GLOW_INTENSITY - 1, 0)
+        body = pygame.Surface((self.rect.width + margin * 2, self.rect.height + margin * 2), pygame.SRCALPHA)
+        rect = pygame.Rect(margin, margin, self.rect.width, self.rect.height)
         
         # Draw multiple layers for glow effect
         for i in range(GLOW_INTENSITY):
-            alpha = 100 - i * 20
-            pygame.draw.rect(screen, (*color[:3], alpha),
-                           pygame.Rect(self.rect.x - i, self.rect.y - i,
-                                     self.rect.width + i*2, self.rect.height + i*2),
-                           border_radius=2)
+            alpha = 100 - i * 20 if translucent else 255
+            pygame.draw.rect(body, (*color[:3], alpha), rect.inflate(i * 2, i * 2), border_radius=2)
         
         # Draw main button
-        pygame.draw.rect(screen, color, self.rect, border_radius=2)
-        
-        # Draw text with glitch effect
-        text_surface = font.render(self.text, True, WHITE)
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        
-        # Draw glitch copies
-        if self.is_hovered:
-            glitch_colors = [CYBER_PINK, NEON_BLUE, NEON_GREEN]
-            for i, color in enumerate(glitch_colors):
-                glitch_surface = font.render(self.text, True, color)
-                offset = self.glitch_offset * (i + 1)
-                screen.blit(glitch_surface, 
-                          (text_rect.x + offset, text_rect.y))
-        
-        screen.blit(text_surface, text_rect)
+        pygame.draw.rect(body, color, rect, border_radius=2)
+        if not hovered:
+            text_surface = render_text(font, self.text, WHITE)
+            body.blit(text_surface, text_surface.get_rect(center=rect.center))
+        self._bodies[key] = body
+        return body
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEMOTION:
@@ -56,13 +72,12 @@ class Button:
         return False
 
 class Menu:
-    def __init__(self, screen):
+    def __init__(self, screen, leaderboard_store=None, effects=None):
         self.screen = screen
-        self.digital_rain = DigitalRain(screen)
-        self.cyber_grid = CyberGrid(screen)
-        self.particles = DataParticles(screen)
-        self.font = pygame.font.SysFont('arial', 40)
-        self.title_font = pygame.font.SysFont('arial', 80)
+        self.leaderboard_store = leaderboard_store
+        self.effects = effects if effects is not None else BackgroundEffects(screen)
+        self.font = get_font('arial', 40)
+        self.title_font = get_font('arial', 80)
         self.state = "main"
         self.settings = {
             "difficulty": 1,
@@ -102,17 +117,16 @@ class Menu:
         ]
 
     def _load_leaderboard(self):
-        # TODO: Load from file
-        return [
-            ("Player1", 1000),
-            ("Player2", 800),
-            ("Player3", 600),
-            ("Player4", 400),
-            ("Player5", 200)
-        ]
+        if self.leaderboard_store is None:
+            return []
+        return self.leaderboard_store.top(LEADERBOARD_SIZE)
+
+    def refresh_leaderboard(self):
+        # Safe to call from a background thread: the list is swapped in whole
+        self.leaderboard = self._load_leaderboard()
 
-    def handle_events(self):
-        for event in pygame.event.get():
+    def handle_events(self, events=None):
+        for event in pygame.event.get() if events is None else events:
             if event.type == pygame.QUIT:
                 return "quit"
             
@@ -148,11 +162,9 @@ class Menu:
         return None
 
     def render(self):
-        # Draw background effects
-        self.screen.fill(DARK_MATRIX)
-        self.digital_rain.update_and_draw()
-        self.cyber_grid.draw()
-        self.particles.update_and_draw()
+        # Draw background effects at the internal resolution, then the UI natively
+        self.effects.draw()
+        self.effects.target.present()
 
         if self.state == "main":
             self._render_main_menu()
@@ -165,18 +177,18 @@ class Menu:
         # Animate title with glitch effect
         self.frame_count = (self.frame_count + 1) % 60
         if self.frame_count == 0:
-            self.title_glitch = random.randint(-3, 3)
+            self.title_glitch = visual_random.randint(-3, 3)
 
         # Draw glitched title
         title_colors = [CYBER_PINK, NEON_BLUE, NEON_GREEN]
         for i, color in enumerate(title_colors):
-            title = self.title_font.render("CYBER DRIVE", True, color)
+            title = render_text(self.title_font, "CYBER DRIVE", color)
             offset = self.title_glitch * (i + 1)
             title_rect = title.get_rect(center=(SCREEN_WIDTH//2 + offset, 100))
             self.screen.blit(title, title_rect)
 
         # Draw main title
-        title = self.title_font.render("CYBER DRIVE", True, WHITE)
+        title = render_text(self.title_font, "CYBER DRIVE", WHITE)
         title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 100))
         self.screen.blit(title, title_rect)
         
@@ -186,7 +198,7 @@ class Menu:
 
     def _render_settings(self):
         # Draw title
-        title = self.title_font.render("Settings", True, WHITE)
+        title = render_text(self.title_font, "Settings", WHITE)
         title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 100))
         self.screen.blit(title, title_rect)
         
@@ -207,14 +219,17 @@ class Menu:
 
     def _render_leaderboard(self):
         # Draw title
-        title = self.title_font.render("Leaderboard", True, WHITE)
+        title = render_text(self.title_font, "Leaderboard", WHITE)
         title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 100))
         self.screen.blit(title, title_rect)
         
         # Draw scores
         for i, (name, score) in enumerate(self.leaderboard):
-            text = self.font.render(f"{i+1}. {name}: {score}", True, WHITE)
+            text = render_text(self.font, f"{i+1}. {name}: {score}", WHITE)
             self.screen.blit(text, (SCREEN_WIDTH//2 - 100, 200 + i * 50))
+        if not self.leaderboard:
+            text = render_text(self.font, "No runs yet", WHITE)
+            self.screen.blit(text, text.get_rect(center=(SCREEN_WIDTH//2, 250)))
         
         # Draw back button
         for button in self.leaderboard_buttons:
@@ -0,0 +1,188 @@
+"""Scripted, repeatable runs for load tests.
+
+A scenario is a JSON Lines file. The first line is a header object:
+
+    {"name": "jam", "seed": 7, "ticks": 3600, "traffic_density": 0,
+     "curves": [{"amplitude": 60, "wavelength": 2000}],
+     "expect": {"crashed": false, "min_distance": 9000}}
+
+seed seeds the random generator before the road and obstacles are built,
+so the road noise, random spawns and traffic decisions repeat. ticks is
+the length of the run. curves, if given, replace the generated road (see
+Road.load_curves). traffic_density sets the random spawn density at the
+start; 0 turns random spawns off. expect lists outcome checks:
+crashed, min_distance and max_distance.
+
+Every further line is one event, triggered by a tick or a distance:
+
+    {"tick": 120, "spawn": "traffic", "lane": 2}
+    {"tick": 120, "spawn": "roadblock", "lane": 0, "y": -200}
+    {"distance": 3000, "traffic_density": 2.5}
+
+Events fire in file order, each one once its trigger is reached. Like a
+random spawn, a spawn that would close the last open lane is left out.
+The file is read one event ahead of the game, so a scenario can be far
+longer than would fit in memory.
+
+Run one headless with the AI driving:
+
+    python -m car_game.scenario scenarios/jam.jsonl
+
+or in the window with python car_game.py --scenario FILE.
+"""
+import json
+import os
+import random
+import sys
+from config import *
+from game_objects.obstacle import TrafficCar, Trash, Roadblock
+
+SPAWN_KINDS = {"traffic": TrafficCar, "trash": Trash, "roadblock": Roadblock}
+TRIGGERS = ("tick", "distance")
+ACTIONS = ("spawn", "traffic_density")
+
+def write_scenario(path, header, events):
+    """Write a scenario file; events may be any iterable, such as a generator"""
+    with open(path, "w") as f:
+        f.write(json.dumps(header) + "\n")
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+class Scenario:
+    """A scenario file being played into a game.
+
+    The game is anything with road, obstacles and distance attributes:
+    Game or CarEnv. restart() before building its objects, apply() after,
+    then update() at the start of every tick.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.restart()
+
+    def restart(self):
+        """Rewind to the first event and seed the random generator"""
+        if self.file is not None:
+            self.file.close()
+        self.file = open(self.path)
+        self.line_number = 0
+        self.header = self._read()
+        if self.header is None:
+            raise ValueError(f"{self.path}: empty scenario")
+        if "ticks" not in self.header:
+            raise ValueError(f"{self.path}:1: the header needs a 'ticks' length")
+        self.name = self.header.get("name", os.path.splitext(os.path.basename(self.path))[0])
+        self.ticks = int(self.header["ticks"])
+        self.expect = self.header.get("expect", {})
+        self.tick = 0
+        self.pending = self._read_event()
+        random.seed(self.header.get("seed"))
+
+    def apply(self, game):
+        """Load the road curves and starting spawn settings into a new game"""
+        if "curves" in self.header:
+            game.road.load_curves(self.header["curves"])
+        # A copy, so density events don't change the menu's settings
+        scheduler = game.obstacles.scheduler
+        self.settings = dict(scheduler.settings)
+        self.settings["traffic_density"] = self.header.get("traffic_density", 1.0)
+        scheduler.settings = self.settings
+
+    @property
+    def finished(self):
+        return self.tick >= self.ticks
+
+    def update(self, game):
+        """Fire the events that are due; call once per tick"""
+        while self.pending is not None and self._due(self.pending, game):
+            self._fire(self.pending, game)
+            self.pending = self._read_event()
+        self.tick += 1
+
+    def _due(self, event, game):
+        if "tick" in event:
+            return self.tick >= event["tick"]
+        return game.distance >= event["distance"]
+
+    def _fire(self, event, game):
+        if "spawn" in event:
+            game.obstacles.place(SPAWN_KINDS[event["spawn"]], event["lane"],
+                                 event.get("y", SPAWN_Y), game.road)
+        if "traffic_density" in event:
+            self.settings["traffic_density"] = event["traffic_density"]
+
+    def _read(self):
+        # Next non-blank line as JSON, or None at the end of the file
+        for line in self.file:
+            self.line_number += 1
+            if not line.strip():
+                continue
+            try:
+                return json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{self.path}:{self.line_number}: {e}") from None
+        return None
+
+    def _read_event(self):
+        event = self._read()
+        if event is None:
+            return None
+        where = f"{self.path}:{self.line_number}"
+        if sum(trigger in event for trigger in TRIGGERS) != 1:
+            raise ValueError(f"{where}: an event needs exactly one of {TRIGGERS}")
+        if not any(action in event for action in ACTIONS):
+            raise ValueError(f"{where}: an event needs one of {ACTIONS}")
+        if "spawn" in event:
+            if event["spawn"] not in SPAWN_KINDS:
+                raise ValueError(f"{where}: unknown spawn {event['spawn']!r}, expected one of {tuple(SPAWN_KINDS)}")
+            if not 0 <= event.get("lane", -1) < NUM_LANES:
+                raise ValueError(f"{where}: spawn needs a lane from 0 to {NUM_LANES - 1}")
+        return event
+
+    def outcome(self, game, crashed):
+        return {"name": self.name, "ticks": self.tick, "distance": game.distance,
+                "score": game.score, "crashed": crashed}
+
+    def check(self, outcome):
+        """Differences between an outcome and the expected one, as messages"""
+        failures = []
+        if "crashed" in self.expect and outcome["crashed"] != self.expect["crashed"]:
+            failures.append(f"expected crashed={self.expect['crashed']}, got {outcome['crashed']} "
+                            f"at tick {outcome['ticks']}")
+        if "min_distance" in self.expect and outcome["distance"] < self.expect["min_distance"]:
+            failures.append(f"distance {outcome['distance']} below {self.expect['min_distance']}")
+        if "max_distance" in self.expect and outcome["distance"] > self.expect["max_distance"]:
+            failures.append(f"distance {outcome['distance']} above {self.expect['max_distance']}")
+        return failures
+
+    def report(self, outcome):
+        """Print the outcome and its checks; returns True if they passed"""
+        failures = self.check(outcome)
+        status = "PASS" if not failures else "FAIL: " + "; ".join(failures)
+        print(f"Scenario {outcome['name']}: {outcome['ticks']} ticks, distance {outcome['distance']}, "
+              f"crashed {outcome['crashed']} - {status}")
+        return not failures
+
+    def close(self):
+        self.file.close()
+
+def run_headless(path, settings=None):
+    """Play a scenario with the AI driving and no window; returns the outcome"""
+    from car_game.env import CarEnv, STAY
+    scenario = Scenario(path)
+    env = CarEnv(settings, max_steps=scenario.ticks, ai_mode=True)
+    scenario.restart()
+    env.reset()
+    scenario.apply(env)
+    done = False
+    while not done:
+        scenario.update(env)
+        _, _, done, info = env.step(STAY)
+    outcome = scenario.outcome(env, info["crashed"])
+    outcome["passed"] = scenario.report(outcome)
+    scenario.close()
+    return outcome
+
+if __name__ == "__main__":
+    results = [run_headless(path) for path in sys.argv[1:]]
+    sys.exit(0 if all(result["passed"] for result in results) else 1)
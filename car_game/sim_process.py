@@ -0,0 +1,227 @@
+import collections
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+import numpy as np
+import pygame
+from config import *
+from game_objects.car import Car, CAR_STATE_DTYPE
+from game_objects.road import Road, ROAD_STATE_DTYPE
+from game_objects.obstacle import ObstacleManager, OBSTACLE_MANAGER_STATE_DTYPE
+from game_objects.ai_driver import AIDriver
+from car_game.background import FramePacer
+from car_game.trace import TraceRecorder
+
+WORLD_DTYPE = np.dtype([
+    ("seq", np.uint64),  # Odd while the slot is being written
+    ("tick", np.uint64),
+    ("game_id", np.uint32),  # Bumped by every reset; a new game also means a new road
+    ("distance", np.int64),
+    ("score", np.int64),
+    ("game_over", np.bool_),
+    ("auto_scroll", np.bool_),
+    ("car", CAR_STATE_DTYPE),
+    ("road", ROAD_STATE_DTYPE),
+    ("obstacles", OBSTACLE_MANAGER_STATE_DTYPE),
+])
+# Two world slots; "latest" is the index of the last one completed
+BUFFER_DTYPE = np.dtype([("latest", np.int64), ("slots", WORLD_DTYPE, (2,))])
+
+class WorldBuffer:
+    """Double-buffered world snapshots in shared memory.
+
+    The simulation writes each tick into the slot that isn't the latest,
+    then flips "latest" to it. Each slot carries a sequence number that is
+    odd while it is written, so a reader that was overtaken (the writer
+    came round to its slot again mid-copy) sees the number change and
+    copies again instead of rendering a torn snapshot.
+    """
+    def __init__(self, name=None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=BUFFER_DTYPE.itemsize)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.owner = name is None
+        self.buffer = np.ndarray((), dtype=BUFFER_DTYPE, buffer=self.shm.buf)
+        if self.owner:
+            self.buffer.fill(0)
+        self.slots = self.buffer["slots"]
+        self.game_ids = [None, None]  # Game whose road each slot holds (writer side)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish(self, sim):
+        index = 1 - int(self.buffer["latest"])
+        slot = self.slots[index, ...]
+        slot["seq"] += 1
+        slot["tick"] = sim.tick
+        slot["game_id"] = sim.game_id
+        slot["distance"] = sim.distance
+        slot["score"] = sim.score
+        slot["game_over"] = sim.game_over
+        slot["auto_scroll"] = sim.auto_scroll
+        sim.car.snapshot(slot["car"])
+        # The road only changes with the game, so each slot copies it once per game
+        sim.road.snapshot(slot["road"], geometry=self.game_ids[index] != sim.game_id)
+        self.game_ids[index] = sim.game_id
+        sim.obstacles.snapshot(slot["obstacles"])
+        slot["seq"] += 1
+        self.buffer["latest"] = index
+
+    def read(self):
+        """Copy of the latest complete snapshot"""
+        while True:
+            slot = self.slots[int(self.buffer["latest"])]
+            seq = int(slot["seq"])
+            if seq % 2:
+                continue
+            snapshot = slot.copy()
+            if int(slot["seq"]) == seq:
+                return snapshot
+
+    def close(self):
+        del self.buffer, self.slots
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+class Simulation:
+    """Game.update without the window: car, road, obstacles and collisions.
+
+    Runs inside the simulation process. Held arrow keys arrive as commands
+    and stand in for pygame.key.get_pressed().
+    """
+    def __init__(self, settings, trace=None):
+        self.trace = trace
+        self.keys = collections.defaultdict(bool)
+        self.tick = 0
+        self.game_id = 0
+        self.reset(settings)
+
+    def reset(self, settings):
+        self.car = Car()
+        self.road = Road()
+        self.obstacles = ObstacleManager(settings)
+        self.obstacles.recorder = self.trace
+        self.car.game = self
+        self.road.game = self
+        self.game_id += 1
+        self.auto_scroll = True
+        self.game_over = False
+        self.score = 0
+        self.distance = 0
+
+    def handle(self, command, *args):
+        if command == "keys":
+            self.keys[pygame.K_LEFT], self.keys[pygame.K_RIGHT] = args
+        elif command == "pause" and not self.game_over:
+            self.auto_scroll = not self.auto_scroll
+        elif command == "toggle_ai":
+            self.car.toggle_ai_mode()
+        elif command == "reset":
+            self.reset(*args)
+
+    def update(self):
+        if self.game_over or not self.auto_scroll:
+            return False  # Paused, nothing moves
+        self.car.update(self.keys, self.road)
+        self.road.scroll()
+        self.distance += SCROLL_SPEED
+        self.score = int(self.distance / 10)
+        if self.trace is not None:
+            self.trace.record_car(self.car, self.road)
+        self.obstacles.update(self.road)
+        if self.obstacles.check_collision(self.car):
+            self.game_over = True
+        self.tick += 1
+        return True
+
+def run_simulation(buffer_name, commands, settings, trace_path=None):
+    """Entry point of the simulation process: tick at FPS until told to quit"""
+    # A fresh interpreter: the player's AI parameters have to be loaded again
+    AIDriver.load_params(required=False)
+    world = WorldBuffer(buffer_name)
+    trace = TraceRecorder(trace_path) if trace_path else None
+    sim = Simulation(settings, trace)
+    pacer = FramePacer(FPS)
+    try:
+        while True:
+            try:
+                while True:
+                    command = commands.get_nowait()
+                    if command[0] == "quit":
+                        return
+                    sim.handle(*command)
+            except queue.Empty:
+                pass
+
+            start = time.perf_counter()
+            ticked = sim.update()
+            world.publish(sim)
+            if ticked and trace is not None:
+                trace.end_tick((time.perf_counter() - start) * 1000)
+            time.sleep(pacer.delay())
+    finally:
+        if trace is not None:
+            trace.close()
+        world.close()
+
+class SimulationClient:
+    """Render-process side of the split: starts the simulation process,
+    sends it input and turns its snapshots back into game objects.
+
+    The Car, Road and obstacles it exposes are plain copies for drawing;
+    changing them has no effect on the simulation.
+    """
+    def __init__(self, settings, trace_path=None):
+        # spawn, not fork: the child must not inherit this process's SDL state
+        context = multiprocessing.get_context("spawn")
+        self.world = WorldBuffer()
+        self.commands = context.Queue()
+        self.process = context.Process(target=run_simulation, name="simulation", daemon=True,
+                                       args=(self.world.name, self.commands, dict(settings), trace_path))
+        self.process.start()
+        self.game_id = 1  # Snapshots from earlier games are ignored
+        self.keys = (False, False)
+        self.car = Car()
+        self.road = Road()
+        self.road_game_id = None
+        self.obstacles = ObstacleManager(settings)
+
+    def send(self, command, *args):
+        self.commands.put((command, *args))
+
+    def send_keys(self, left, right):
+        if (left, right) != self.keys:
+            self.keys = (left, right)
+            self.send("keys", left, right)
+
+    def reset(self, settings):
+        self.game_id += 1
+        self.send("reset", dict(settings))
+
+    def sync(self):
+        """Update car, road and obstacles from the latest snapshot.
+
+        Returns the snapshot, or None while the simulation hasn't published
+        a tick of the current game yet.
+        """
+        snapshot = self.world.read()
+        if snapshot["game_id"] != self.game_id:
+            return None
+
+        self.road.restore(snapshot["road"], geometry=self.road_game_id != self.game_id)
+        self.road_game_id = self.game_id
+        self.car.restore(snapshot["car"])
+        self.obstacles.restore(snapshot["obstacles"])
+        return snapshot
+
+    def close(self):
+        self.send("quit")
+        self.process.join(SIM_JOIN_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.world.close()
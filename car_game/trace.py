@@ -0,0 +1,157 @@
+import json
+import os
+import queue
+import threading
+import numpy as np
+from config import *
+
+# One column file per field, named <field>.<dtype> inside the trace directory
+TRACE_FIELDS = {
+    "car_x": np.float32,
+    "car_lane": np.int8,
+    "car_angle": np.float32,
+    "off_road": np.bool_,
+    "road_offset": np.int64,
+    "obstacle_count": np.int16,
+    "collision": np.bool_,
+    "frame_ms": np.float32,
+}
+
+def _column_path(directory, name):
+    return os.path.join(directory, f"{name}.{np.dtype(TRACE_FIELDS[name]).str[1:]}")
+
+def load_trace(directory):
+    """Columns of a trace as read-only numpy.memmap arrays, trimmed to the ticks written"""
+    with open(os.path.join(directory, "meta.json")) as f:
+        count = json.load(f)["ticks"]
+    return {name: np.memmap(_column_path(directory, name), dtype=dtype, mode="r")[:count]
+            for name, dtype in TRACE_FIELDS.items()}
+
+class TraceRecorder:
+    """Per-tick game state written to memory-mapped column files.
+
+    The frame loop only fills the current row of an in-memory chunk
+    (record_car, record_obstacles, record_collision, end_tick). Full
+    chunks go to a writer thread that copies them into the memory maps,
+    doubling the files when they run out of room, and updates meta.json
+    with the number of ticks on disk. Chunk buffers are recycled, so
+    recording doesn't allocate in steady state.
+    """
+    def __init__(self, directory, chunk_ticks=TRACE_CHUNK_TICKS, capacity=TRACE_INITIAL_TICKS):
+        self.directory = directory
+        self.chunk_ticks = chunk_ticks
+        os.makedirs(directory, exist_ok=True)
+
+        self.capacity = capacity
+        self.ticks_written = 0
+        self.maps = {}
+        for name in TRACE_FIELDS:
+            self._map_column(name, capacity)
+        self._write_meta()
+
+        self.free_chunks = queue.Queue()
+        for _ in range(TRACE_CHUNK_BUFFERS):
+            self.free_chunks.put(self._new_chunk())
+        self.chunk = self.free_chunks.get()
+        self.row = 0
+        self.pending = False  # The current row has data and needs end_tick()
+
+        self.chunks = queue.Queue()
+        self.thread = threading.Thread(target=self._writer, name="trace-writer", daemon=True)
+        self.thread.start()
+
+    def _new_chunk(self):
+        return {name: np.zeros(self.chunk_ticks, dtype=dtype) for name, dtype in TRACE_FIELDS.items()}
+
+    def _map_column(self, name, ticks):
+        path = _column_path(self.directory, name)
+        size = ticks * np.dtype(TRACE_FIELDS[name]).itemsize
+        with open(path, "ab") as f:
+            f.truncate(size)
+        self.maps[name] = np.memmap(path, dtype=TRACE_FIELDS[name], mode="r+", shape=(ticks,))
+
+    def _write_meta(self):
+        meta = {
+            "ticks": self.ticks_written,
+            "columns": {name: os.path.basename(_column_path(self.directory, name))
+                        for name in TRACE_FIELDS},
+        }
+        path = os.path.join(self.directory, "meta.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(path + ".tmp", path)
+
+    # Hooks called from the frame loop
+
+    def record_car(self, car, road):
+        row, chunk = self.row, self.chunk
+        chunk["car_x"][row] = car.x
+        chunk["car_lane"][row] = car.lane
+        chunk["car_angle"][row] = car.angle
+        chunk["off_road"][row] = car.off_road
+        chunk["road_offset"][row] = road.offset
+        self.pending = True
+
+    def record_obstacles(self, count):
+        self.chunk["obstacle_count"][self.row] = count
+
+    def record_collision(self, collided):
+        self.chunk["collision"][self.row] = collided
+
+    def end_tick(self, frame_ms):
+        """Close the current row, if anything was recorded into it"""
+        if not self.pending:
+            return
+        self.chunk["frame_ms"][self.row] = frame_ms
+        self.pending = False
+        self.row += 1
+        if self.row == self.chunk_ticks:
+            self._submit()
+
+    def _submit(self):
+        self.chunks.put((self.chunk, self.row))
+        try:
+            self.chunk = self.free_chunks.get_nowait()
+        except queue.Empty:
+            # Writer is behind; a new buffer beats stalling the frame
+            self.chunk = self._new_chunk()
+        self.row = 0
+
+    # Writer thread
+
+    def _writer(self):
+        while True:
+            job = self.chunks.get()
+            if job is None:
+                return
+            chunk, rows = job
+            try:
+                self._write_chunk(chunk, rows)
+            except Exception as e:
+                print(f"Trace write failed: {e!r}")
+            self.free_chunks.put(chunk)
+
+    def _write_chunk(self, chunk, rows):
+        start = self.ticks_written
+        if start + rows > self.capacity:
+            self.capacity = max(self.capacity * 2, start + rows)
+            for name in TRACE_FIELDS:
+                self.maps[name].flush()
+                self._map_column(name, self.capacity)
+        for name, column in self.maps.items():
+            column[start:start + rows] = chunk[name][:rows]
+            column.flush()
+        self.ticks_written = start + rows
+        self._write_meta()
+
+    def close(self):
+        """Write the partial chunk, stop the writer and trim the files to size"""
+        if self.row:
+            self.chunks.put((self.chunk, self.row))
+        self.chunks.put(None)
+        self.thread.join()
+        for name in TRACE_FIELDS:
+            self.maps[name].flush()
+            del self.maps[name]
+            with open(_column_path(self.directory, name), "r+b") as f:
+                f.truncate(self.ticks_written * np.dtype(TRACE_FIELDS[name]).itemsize)
@@ -0,0 +1,197 @@
+"""Tune the player's AI parameters with headless runs.
+
+    python -m car_game.tuner --generations 30 --population 16 --episodes 24
+
+Every parameter in PARAM_SPACE is scaled to [0, 1], and candidates are
+searched with an evolution strategy. Each generation samples a
+population around the current mean. When a candidate beats the best so
+far, the best quarter is weighted into the new mean and the step size
+widens; otherwise the search narrows around the best so far. A
+candidate's score is the mean distance the AI
+drives in CarEnv episodes. Every candidate plays the same seeds, so
+scores compare across generations. The episodes are spread over a
+process pool.
+
+Progress is checkpointed after every generation, and a run picks up
+from its checkpoint when restarted. The result goes to AI_PARAMS_PATH
+with the training score and a check on held-out seeds against the
+defaults. Game loads that file at startup (AIDriver.load_params).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import numpy as np
+from config import *
+from game_objects.ai_driver import AIDriver, DEFAULT_PARAMS
+from car_game.env import CarEnv, STAY
+
+# (low, high, integer) for every tuned parameter
+PARAM_SPACE = {
+    "look_ahead": (100, 800, False),
+    "behind_window": (0, 200, False),
+    "decision_interval": (1, 20, True),
+    "immediate_distance": (20, 300, False),
+    "escape_threshold": (-50, 100, False),
+    "medium_distance": (50, 500, False),
+    "switch_margin": (0, 100, False),
+    "lane_bonus": (0, 60, False),
+}
+MIN_SIGMA, MAX_SIGMA = 0.02, 0.5  # Step size bounds, in unit-cube widths
+
+def to_params(vector):
+    """Parameter dict for a point of the unit cube"""
+    params = {}
+    for (name, (low, high, integer)), x in zip(PARAM_SPACE.items(), np.clip(vector, 0, 1)):
+        value = low + float(x) * (high - low)
+        params[name] = int(round(value)) if integer else round(value, 2)
+    return params
+
+def to_vector(params):
+    return np.array([(params[name] - low) / (high - low)
+                     for name, (low, high, _) in PARAM_SPACE.items()])
+
+def run_episode(job):
+    """Distance the AI drives in one seeded episode; runs in a pool worker"""
+    params, seed, max_steps = job
+    AIDriver.params = {**DEFAULT_PARAMS, **params}
+    env = CarEnv(ai_mode=True, max_steps=max_steps)
+    env.reset(seed=seed)
+    done = False
+    while not done:
+        _, _, done, info = env.step(STAY)
+    return info["distance"]
+
+class Tuner:
+    def __init__(self, pool, seeds, max_steps, population, checkpoint_path, sigma=0.2, search_seed=0):
+        self.pool = pool
+        self.seeds = list(seeds)
+        self.max_steps = max_steps
+        self.population = population
+        self.parents = max(population // 4, 1)
+        # Log-rank recombination weights, best candidate first
+        weights = np.log(self.parents + 0.5) - np.log(np.arange(1, self.parents + 1))
+        self.weights = weights / weights.sum()
+        self.checkpoint_path = checkpoint_path
+
+        self.rng = np.random.default_rng(search_seed)
+        self.generation = 0
+        self.mean = to_vector(DEFAULT_PARAMS)
+        self.sigma = sigma
+        self.best_vector = self.mean.copy()
+        self.best_score = None
+        self.history = []
+
+    def evaluate(self, vectors, seeds=None):
+        """Mean distance per candidate over seeds (the training seeds by default)"""
+        seeds = self.seeds if seeds is None else seeds
+        jobs = [(to_params(vector), seed, self.max_steps) for vector in vectors for seed in seeds]
+        distances = self.pool.map(run_episode, jobs)
+        return np.array(distances, dtype=float).reshape(len(vectors), len(seeds)).mean(axis=1)
+
+    def step(self):
+        """Run one generation; returns its best score"""
+        start = time.perf_counter()
+        if self.best_score is None:
+            self.best_score = float(self.evaluate([self.best_vector])[0])
+        samples = self.mean + self.sigma * self.rng.standard_normal((self.population, len(PARAM_SPACE)))
+        candidates = np.clip(samples, 0, 1)
+        scores = self.evaluate(candidates)
+
+        order = np.argsort(-scores, kind="stable")
+        best = order[0]
+        improved = scores[best] > self.best_score
+        if improved:
+            self.best_score = float(scores[best])
+            self.best_vector = candidates[best].copy()
+            self.mean = self.weights @ candidates[order[:self.parents]]
+        else:
+            # Nothing beat the best so far: search closer around it
+            self.mean = self.best_vector.copy()
+        # One-fifth-rule style step size: widen after progress, narrow without
+        self.sigma = float(np.clip(self.sigma * (1.2 if improved else 0.85), MIN_SIGMA, MAX_SIGMA))
+
+        self.generation += 1
+        self.history.append({"generation": self.generation, "best": float(scores[best]),
+                             "mean": float(scores.mean()), "sigma": self.sigma})
+        print(f"Generation {self.generation}: best {scores[best]:.0f}  mean {scores.mean():.0f}  "
+              f"best so far {self.best_score:.0f}  sigma {self.sigma:.3f}  "
+              f"({time.perf_counter() - start:.1f} s)")
+        self.save_checkpoint()
+        return float(scores[best])
+
+    def save_checkpoint(self):
+        state = {
+            "generation": self.generation,
+            "seeds": self.seeds,
+            "max_steps": self.max_steps,
+            "mean": self.mean.tolist(),
+            "sigma": self.sigma,
+            "best_vector": self.best_vector.tolist(),
+            "best_score": self.best_score,
+            "history": self.history,
+            "rng": self.rng.bit_generator.state,
+        }
+        with open(self.checkpoint_path + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
+
+    def load_checkpoint(self):
+        with open(self.checkpoint_path) as f:
+            state = json.load(f)
+        if state["seeds"] != self.seeds or state["max_steps"] != self.max_steps:
+            raise ValueError(f"{self.checkpoint_path} was made with other seeds or max_steps; "
+                             "use the same --episodes, --seed and --max-steps, or --fresh")
+        self.generation = state["generation"]
+        self.mean = np.array(state["mean"])
+        self.sigma = state["sigma"]
+        self.best_vector = np.array(state["best_vector"])
+        self.best_score = state["best_score"]
+        self.history = state["history"]
+        self.rng.bit_generator.state = state["rng"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--generations", type=int, default=30, help="total, including checkpointed ones")
+    parser.add_argument("--population", type=int, default=16)
+    parser.add_argument("--episodes", type=int, default=24, help="training seeds per candidate")
+    parser.add_argument("--validation-episodes", type=int, default=48)
+    parser.add_argument("--max-steps", type=int, default=3000, help="episode length cap in ticks")
+    parser.add_argument("--seed", type=int, default=0, help="first training seed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--checkpoint", default="tuner_checkpoint.json")
+    parser.add_argument("--fresh", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--output", default=AI_PARAMS_PATH)
+    args = parser.parse_args()
+
+    seeds = range(args.seed, args.seed + args.episodes)
+    # Held out: never used to pick candidates
+    validation_seeds = list(range(args.seed + args.episodes, args.seed + args.episodes + args.validation_episodes))
+    with multiprocessing.Pool(args.workers) as pool:
+        tuner = Tuner(pool, seeds, args.max_steps, args.population, args.checkpoint, search_seed=args.seed)
+        if os.path.exists(args.checkpoint) and not args.fresh:
+            tuner.load_checkpoint()
+            print(f"Resuming from {args.checkpoint} at generation {tuner.generation}")
+        while tuner.generation < args.generations:
+            tuner.step()
+
+        best = to_params(tuner.best_vector)
+        validation, baseline = tuner.evaluate([tuner.best_vector, to_vector(DEFAULT_PARAMS)], validation_seeds)
+
+    result = {
+        "params": best,
+        "score": tuner.best_score,
+        "validation": {"score": float(validation), "default_score": float(baseline),
+                       "episodes": len(validation_seeds)},
+        "generations": tuner.generation,
+        "episodes": len(tuner.seeds),
+        "max_steps": args.max_steps,
+    }
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Held-out mean distance: {validation:.0f} tuned vs {baseline:.0f} default")
+    print(f"Parameters written to {args.output}")
+
+if __name__ == "__main__":
+    main()
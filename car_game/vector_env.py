@@ -0,0 +1,515 @@
+import math
+import random
+import numpy as np
+from config import *
+from game_objects.road import Road
+from game_objects.ai_driver import DEFAULT_PARAMS
+from game_objects.traffic_flow import car_following_speeds, keep_a_lane_open, lane_intervals, closes_last_lane
+from car_game.env import CarEnv, ACTION_DIRECTIONS, LANE_SCALE
+
+CURVE_TYPES = {"sine": 0, "cosine": 1, "linear": 2}
+TRAFFIC, TRASH, ROADBLOCK = 0, 1, 2
+NOISE_POSITIONS = np.arange(NUM_NOISE_POINTS) * 200.0  # Road.init_noise_points spacing
+LANE_CENTERS = (np.arange(NUM_LANES) + 0.5) * LANE_WIDTH
+CAR_START_X = SCREEN_WIDTH // 2 - CAR_WIDTH // 2
+CAR_Y = SCREEN_HEIGHT - CAR_HEIGHT - 20
+
+# Per-obstacle columns, all shaped (num_envs, capacity)
+OBSTACLE_FIELDS = {
+    "active": bool, "kind": np.int8, "lane": np.int64, "target_lane": np.int64,
+    "x": np.float64, "y": np.float64, "width": np.float64, "height": np.float64,
+    "speed": np.float64, "changing": bool, "decision_cooldown": np.int64,
+    "rotation": np.float64,
+}
+OBSTACLE_SHAPES = {
+    TRAFFIC: (CAR_WIDTH, CAR_HEIGHT, -TRAFFIC_SPEED),
+    TRASH: (30, 30, 0),
+    ROADBLOCK: (LANE_WIDTH * 0.8, 40, 0),
+}
+
+class VectorCarEnv:
+    """N independent CarEnv games stepped together with NumPy.
+
+    Roads, cars, obstacles and spawn schedulers live in arrays indexed by
+    environment, so one step() advances every game with batched array
+    operations instead of N Python object graphs. Each environment draws
+    from its own random.Random, in the same order the scalar objects draw
+    from theirs, so environment i seeded with s follows CarEnv.reset(s)
+    tick for tick given the same actions.
+
+    Finished environments reset automatically; their last observation is
+    returned in info["final_observation"]. Only action-driven cars are
+    supported (no ai_mode). Road, AIDriver and SpawnScheduler behaviour
+    is mirrored here, so changes to those need the same change below.
+    """
+    num_actions = CarEnv.num_actions
+    observation_size = CarEnv.observation_size
+
+    def __init__(self, num_envs, settings=None, max_steps=ENV_MAX_STEPS, capacity=32):
+        self.num_envs = num_envs
+        self.settings = settings if settings is not None else {}
+        self.max_steps = max_steps
+        self.rngs = [random.Random() for _ in range(num_envs)]
+        n = num_envs
+
+        # Road
+        self.offset = np.zeros(n)
+        self.curve_amplitude = np.zeros((n, ROAD_SEGMENTS))
+        self.curve_wavelength = np.ones((n, ROAD_SEGMENTS))
+        self.curve_phase = np.zeros((n, ROAD_SEGMENTS))
+        self.curve_length = np.zeros((n, ROAD_SEGMENTS))
+        self.curve_start = np.zeros((n, ROAD_SEGMENTS))
+        self.curve_type = np.zeros((n, ROAD_SEGMENTS), dtype=np.int8)
+        self.total_length = np.ones(n)
+        self.noise_offsets = np.zeros((n, NUM_NOISE_POINTS))
+
+        # Player car
+        self.car_x = np.zeros(n)
+        self.car_lane = np.zeros(n, dtype=np.int64)
+        self.car_target_lane = np.zeros(n, dtype=np.int64)
+        self.car_angle = np.zeros(n)
+        self.car_changing = np.zeros(n, dtype=bool)
+        self.car_cooldown = np.zeros(n, dtype=np.int64)
+        self.off_road = np.zeros(n, dtype=bool)
+
+        # Obstacles and spawning
+        self.obstacles = {name: np.zeros((n, capacity), dtype=dtype)
+                          for name, dtype in OBSTACLE_FIELDS.items()}
+        self.frames_until_spawn = np.full(n, np.nan)  # NaN: not drawn yet
+        self.next_wave_distance = np.full(n, np.nan)
+
+        self.distance = np.zeros(n, dtype=np.int64)
+        self.steps = np.zeros(n, dtype=np.int64)
+
+    @property
+    def capacity(self):
+        return self.obstacles["active"].shape[1]
+
+    def reset(self, seeds=None):
+        """Reset every environment and return stacked observations.
+
+        seeds is an int (environment i gets seed + i), a sequence of one
+        seed per environment, or None to continue each generator.
+        """
+        if seeds is not None:
+            if isinstance(seeds, int):
+                seeds = [seeds + i for i in range(self.num_envs)]
+            for rng, seed in zip(self.rngs, seeds):
+                rng.seed(seed)
+        for i in range(self.num_envs):
+            self._reset_env(i)
+        return self._observe()
+
+    def _reset_env(self, i):
+        # Same draws as CarEnv.reset: Car and ObstacleManager take none, Road does
+        road = Road(self.rngs[i])
+        for s, curve in enumerate(road.curves):
+            self.curve_amplitude[i, s] = curve["amplitude"]
+            self.curve_wavelength[i, s] = curve["wavelength"]
+            self.curve_phase[i, s] = curve["phase_offset"]
+            self.curve_length[i, s] = curve["segment_length"]
+            self.curve_start[i, s] = curve["start_position"]
+            self.curve_type[i, s] = CURVE_TYPES[curve["curve_type"]]
+        self.total_length[i] = road.total_length
+        self.noise_offsets[i] = [offset for _, offset in road.noise_points]
+        self.offset[i] = 0
+
+        self.car_x[i] = CAR_START_X
+        self.car_lane[i] = MIDDLE_LANE
+        self.car_target_lane[i] = MIDDLE_LANE
+        self.car_angle[i] = 0
+        self.car_changing[i] = False
+        self.car_cooldown[i] = 0
+        self.off_road[i] = False
+
+        for column in self.obstacles.values():
+            column[i] = 0
+        self.frames_until_spawn[i] = np.nan
+        self.next_wave_distance[i] = np.nan
+        self.distance[i] = 0
+        self.steps[i] = 0
+
+    def road_center(self, y):
+        """Road.get_road_center for every environment; y is (N,) or (N, K)"""
+        y = np.asarray(y, dtype=np.float64)
+        flat = y.ndim == 1
+        if flat:
+            y = y[:, None]
+        road_pos = y + self.offset[:, None]
+        total = self.total_length[:, None]
+
+        # Which curve segment each position falls in (Road.get_current_curve)
+        normalized = np.mod(road_pos, total)
+        start = self.curve_start[:, None, :]
+        inside = ((normalized[..., None] >= start) &
+                  (normalized[..., None] < start + self.curve_length[:, None, :]))
+        found = inside.any(axis=2)
+        index = np.where(found, inside.argmax(axis=2), 0)
+
+        def pick(values):
+            return np.take_along_axis(values, index, axis=1)
+        amplitude = pick(self.curve_amplitude)
+        wavelength = pick(self.curve_wavelength)
+        curve_type = pick(self.curve_type)
+        segment_pos = np.where(found, normalized - pick(self.curve_start), 0.0)
+
+        angle = segment_pos / wavelength * 2 * math.pi + pick(self.curve_phase)
+        x = ((segment_pos / wavelength) % 1) * 4
+        wave = np.where(x < 1, x, np.where(x < 3, 2 - x, x - 4))
+        curve_offset = np.select(
+            [amplitude == 0, curve_type == 0, curve_type == 1],
+            [0.0, amplitude * np.sin(angle), amplitude * np.cos(angle)],
+            amplitude * wave)
+
+        # Road.interpolate_noise, including its wrap-around cases
+        count = NUM_NOISE_POINTS
+        after = np.searchsorted(NOISE_POSITIONS, road_pos, side="right")
+        prev_pos = np.where(after == 0, NOISE_POSITIONS[-1] - total,
+                            NOISE_POSITIONS[np.maximum(after - 1, 0)])
+        next_pos = np.where(after == count, NOISE_POSITIONS[0] + total,
+                            NOISE_POSITIONS[np.minimum(after, count - 1)])
+        prev_offset = np.take_along_axis(self.noise_offsets, (after - 1) % count, axis=1)
+        next_offset = np.take_along_axis(self.noise_offsets, after % count, axis=1)
+        same = next_pos == prev_pos
+        t = (road_pos - prev_pos) / np.where(same, 1.0, next_pos - prev_pos)
+        noise = np.where(same, next_offset, prev_offset + t * (next_offset - prev_offset))
+
+        center = BASE_ROAD_CENTER + curve_offset + noise * 0.3
+        return center[:, 0] if flat else center
+
+    def _lane_x(self, y, lane):
+        # Road.get_lane_positions(y)[lane]
+        return self.road_center(y) - ROAD_WIDTH / 2 + LANE_CENTERS[lane]
+
+    def step(self, actions):
+        """Advance every environment one tick.
+
+        Returns (observations, rewards, dones, info) with one row per
+        environment; info holds arrays for distance, score, crashed,
+        truncated, off_road and final_observation.
+        """
+        actions = np.asarray(actions)
+        self._update_car(actions)
+        self.offset -= SCROLL_SPEED
+        self.distance += SCROLL_SPEED
+        self._update_obstacles()
+        self._update_spawns()
+        self.steps += 1
+
+        crashed = self._check_collisions()
+        truncated = ~crashed & (self.steps >= self.max_steps)
+        dones = crashed | truncated
+
+        rewards = np.full(self.num_envs, ENV_ALIVE_REWARD)
+        rewards += np.where(self.off_road, ENV_OFF_ROAD_PENALTY, 0.0)
+        rewards += np.where(crashed, ENV_CRASH_PENALTY, 0.0)
+
+        observations = self._observe()
+        info = {
+            "distance": self.distance.copy(),
+            "score": self.distance // 10,
+            "crashed": crashed,
+            "truncated": truncated,
+            "off_road": self.off_road.copy(),
+            "final_observation": observations.copy(),
+        }
+        for i in np.flatnonzero(dones):
+            self._reset_env(i)
+        if dones.any():
+            observations[dones] = self._observe()[dones]
+        return observations, rewards, dones, info
+
+    def _update_car(self, actions):
+        # Car.request_lane_change, then Car._player_update
+        direction = np.array([ACTION_DIRECTIONS[a] for a in range(self.num_actions)])[actions]
+        new_lane = self.car_lane + direction
+        start = ((direction != 0) & ~self.car_changing & (self.car_cooldown <= 0) &
+                 (new_lane >= 0) & (new_lane < NUM_LANES))
+        self.car_target_lane = np.where(start, new_lane, self.car_target_lane)
+        self.car_changing |= start
+        self.car_cooldown = np.where(start, LANE_CHANGE_COOLDOWN_MAX, self.car_cooldown)
+        self.car_cooldown = np.where(self.car_cooldown > 0, self.car_cooldown - 1, self.car_cooldown)
+
+        # Car._update_position, then Car._update_lane_change at 1.5x speed
+        center_y = np.full(self.num_envs, CAR_Y + CAR_HEIGHT / 2)
+        lane_base = self.road_center(center_y) - ROAD_WIDTH / 2
+        for speed in (LANE_CHANGE_SPEED, LANE_CHANGE_SPEED * 1.5):
+            changing = self.car_changing
+            target_x = lane_base + LANE_CENTERS[self.car_target_lane]
+            car_center_x = self.car_x + CAR_WIDTH / 2
+            step = np.where(target_x > car_center_x, 1, -1) * np.minimum(speed, np.abs(target_x - car_center_x))
+            arrived = changing & (np.abs(car_center_x - target_x) < LANE_CHANGE_SPEED)
+            if speed == LANE_CHANGE_SPEED:
+                settled_x = lane_base + LANE_CENTERS[self.car_lane] - CAR_WIDTH / 2
+                self.car_x = np.where(changing, self.car_x + step, settled_x)
+            else:
+                self.car_x = np.where(changing, self.car_x + step, self.car_x)
+            self.car_x = np.where(arrived, target_x - CAR_WIDTH / 2, self.car_x)
+            self.car_lane = np.where(arrived, self.car_target_lane, self.car_lane)
+            self.car_changing = changing & ~arrived
+
+        target_x = lane_base + LANE_CENTERS[self.car_lane]
+        self.car_angle = -((target_x - self.car_x) / ROAD_WIDTH) * MAX_ROTATION
+
+        # Car._compute_off_road on the rotated footprint
+        rad = np.radians(self.car_angle)
+        cos_a, sin_a = np.cos(rad)[:, None], np.sin(rad)[:, None]
+        dx = np.array([-CAR_WIDTH / 2, CAR_WIDTH / 2, -CAR_WIDTH / 2, CAR_WIDTH / 2])
+        dy = np.array([-CAR_HEIGHT / 2, -CAR_HEIGHT / 2, CAR_HEIGHT / 2, CAR_HEIGHT / 2])
+        corner_x = (self.car_x + CAR_WIDTH / 2)[:, None] + dx * cos_a + dy * sin_a
+        corner_y = (CAR_Y + CAR_HEIGHT / 2) - dx * sin_a + dy * cos_a
+        corner_center = self.road_center(corner_y)
+        self.off_road = ((corner_x < corner_center - ROAD_WIDTH / 2) |
+                         (corner_x > corner_center + ROAD_WIDTH / 2)).any(axis=1)
+
+    def _update_obstacles(self):
+        ob = self.obstacles
+        active = ob["active"]
+        traffic = active & (ob["kind"] == TRAFFIC)
+
+        # ObstacleManager.update_traffic_speeds over every environment at once
+        env, slot = np.nonzero(active)
+        ob["speed"][env, slot] = car_following_speeds(
+            ob["lane"][env, slot], ob["target_lane"][env, slot], ob["changing"][env, slot],
+            ob["y"][env, slot], ob["height"][env, slot], ob["speed"][env, slot],
+            traffic[env, slot], group=env)
+
+        lane_base = self.road_center(ob["y"]) - ROAD_WIDTH / 2
+        half_width = ob["width"] / 2
+        y_before = ob["y"].copy()
+        changing_before = ob["changing"].copy()
+
+        # Where every obstacle ends up this tick before any new decisions;
+        # a decision never completes a lane change on the tick it is made
+        target_x = lane_base + LANE_CENTERS[ob["target_lane"]]
+        arrive_dist = np.abs(ob["x"] + half_width - target_x)
+        lane_after = np.where(traffic & ob["changing"] & (arrive_dist < LANE_CHANGE_SPEED * 0.5),
+                              ob["target_lane"], ob["lane"])
+        y_after = ob["y"] + (SCROLL_SPEED + ob["speed"])
+
+        ob["decision_cooldown"] -= traffic
+        deciding = traffic & (ob["decision_cooldown"] <= 0) & ~ob["changing"]
+        ob["decision_cooldown"] = np.where(deciding, TRAFFIC_DECISION_INTERVAL, ob["decision_cooldown"])
+        if deciding.any():
+            self._traffic_decisions(deciding, lane_after, y_after)
+
+        # TrafficCar.update movement and BaseObstacle.update
+        changing = traffic & ob["changing"]
+        target_x = lane_base + LANE_CENTERS[ob["target_lane"]]
+        center_x = ob["x"] + half_width
+        step = np.where(target_x > center_x, 1, -1) * np.minimum(LANE_CHANGE_SPEED * 0.5, np.abs(target_x - center_x))
+        arrived = changing & (np.abs(center_x - target_x) < LANE_CHANGE_SPEED * 0.5)
+        settled_x = lane_base + LANE_CENTERS[ob["lane"]] - half_width
+        x = np.where(changing, ob["x"] + step, settled_x)
+        ob["x"] = np.where(active, np.where(arrived, target_x - half_width, x), 0.0)
+        ob["lane"] = np.where(arrived, ob["target_lane"], ob["lane"])
+        ob["changing"] = changing & ~arrived
+        ob["y"] = np.where(active, y_after, 0.0)
+        self._hold_back(active, traffic, lane_base, half_width, y_before, changing_before)
+
+        # Drop obstacles below the screen, keeping list order
+        keep = active & (ob["y"] <= SCREEN_HEIGHT + 100)
+        if (keep != active).any():
+            order = np.argsort(~keep, axis=1, kind="stable")
+            for name, column in ob.items():
+                ob[name] = np.take_along_axis(column, order, axis=1)
+            ob["active"] = np.take_along_axis(keep, order, axis=1)
+
+    def _hold_back(self, active, traffic, lane_base, half_width, y_before, changing_before):
+        # ObstacleManager.hold_back, one environment at a time
+        ob = self.obstacles
+        started = traffic & ob["changing"] & ~changing_before
+        for i in np.flatnonzero(active.any(axis=1)):
+            n = int(active[i].sum())  # Active obstacles are packed at the front
+            y, cancelled = keep_a_lane_open(
+                ob["lane"][i, :n].tolist(), ob["target_lane"][i, :n].tolist(), ob["changing"][i, :n].tolist(),
+                started[i, :n].tolist(), y_before[i, :n].tolist(), ob["y"][i, :n].tolist(),
+                ob["height"][i, :n].tolist())
+            for slot in cancelled:
+                ob["target_lane"][i, slot] = ob["lane"][i, slot]
+                ob["changing"][i, slot] = False
+                ob["x"][i, slot] = lane_base[i, slot] + LANE_CENTERS[ob["lane"][i, slot]] - half_width[i, slot]
+            y = np.array(y)
+            moved = (y != ob["y"][i, :n]) & traffic[i, :n]
+            if moved.any():
+                ob["speed"][i, :n] = np.where(moved, y - y_before[i, :n] - SCROLL_SPEED, ob["speed"][i, :n])
+                ob["y"][i, :n] = y
+
+    def _traffic_decisions(self, deciding, lane_after, y_after):
+        # AIDriver.make_decision(look_ahead=TRAFFIC_LOOK_AHEAD) for every deciding
+        # traffic car, with the DEFAULT_PARAMS traffic decides with. Cars
+        # earlier in the obstacle list have already moved when a later one
+        # decides, so each decider sees a mix of old and new state.
+        params = DEFAULT_PARAMS
+        ob = self.obstacles
+        env, slot = np.nonzero(deciding)
+        capacity = self.capacity
+        earlier = np.arange(capacity)[None, :] < slot[:, None]
+
+        other_lane = np.where(earlier, lane_after[env], ob["lane"][env])
+        other_y = np.where(earlier, y_after[env], ob["y"][env])
+        valid = ob["active"][env] & (np.arange(capacity)[None, :] != slot[:, None])
+        # The player car comes last, as in TrafficCar.update
+        other_lane = np.concatenate([other_lane, self.car_lane[env, None]], axis=1)
+        other_y = np.concatenate([other_y, np.full((len(env), 1), float(CAR_Y))], axis=1)
+        valid = np.concatenate([valid, np.ones((len(env), 1), dtype=bool)], axis=1)
+
+        lane = ob["lane"][env, slot]
+        dist = ob["y"][env, slot][:, None] - other_y  # Positive ahead
+        relevant = (valid & (-params["behind_window"] < dist) & (dist < TRAFFIC_LOOK_AHEAD)
+                    & (np.abs(other_lane - lane[:, None]) <= 1))
+        threats = relevant & (other_lane == lane[:, None]) & (dist > 0)
+        has_threat = threats.any(axis=1)
+        threat_dist = np.where(threats, dist, np.inf).min(axis=1)
+
+        # Lane scores, subtracted in AIDriver's order (closest first) so the
+        # floating point results match
+        with np.errstate(divide="ignore"):
+            penalty = np.where(dist > 0, 100 / (dist / 50), 50 / (np.maximum(np.abs(dist), 1) / 50))
+        order = np.argsort(np.where(relevant, np.abs(dist), np.inf), axis=1, kind="stable")
+        penalty = np.take_along_axis(penalty, order, axis=1)
+        sorted_lane = np.take_along_axis(other_lane, order, axis=1)
+        sorted_relevant = np.take_along_axis(relevant, order, axis=1)
+        scores = np.empty((len(env), NUM_LANES))
+        for l in range(NUM_LANES):
+            terms = np.where(sorted_relevant & (sorted_lane == l), penalty, 0.0)
+            scores[:, l] = np.subtract.reduce(
+                np.concatenate([np.full((len(env), 1), 100.0), terms], axis=1), axis=1)
+        rows = np.arange(len(env))
+        scores[rows, lane] += params["lane_bonus"]
+
+        # Immediate danger: best safe neighbour, left on a tie
+        immediate = has_threat & (threat_dist < params["immediate_distance"])
+        left_score = scores[rows, np.maximum(lane - 1, 0)]
+        right_score = scores[rows, np.minimum(lane + 1, NUM_LANES - 1)]
+        left_ok = immediate & (lane > 0) & (left_score > params["escape_threshold"])
+        right_ok = immediate & (lane < NUM_LANES - 1) & (right_score > params["escape_threshold"])
+        decision = np.where(left_ok & right_ok, np.where(right_score > left_score, 1, -1),
+                            np.where(left_ok, -1, np.where(right_ok, 1, 0)))
+
+        # Medium range: only for a clearly better adjacent lane
+        medium = has_threat & ~immediate & (threat_dist < params["medium_distance"])
+        reachable = np.abs(np.arange(NUM_LANES)[None, :] - lane[:, None]) <= 1
+        best = np.where(reachable, scores, -np.inf).argmax(axis=1)
+        better = medium & (best != lane) & (scores[rows, best] > scores[rows, lane] + params["switch_margin"])
+        decision = np.where(better, np.sign(best - lane), decision)
+
+        # Nothing around: occasionally drift back to the middle lane
+        for k in np.flatnonzero(~relevant.any(axis=1) & (lane != MIDDLE_LANE)):
+            if self.rngs[env[k]].random() < 0.01:
+                decision[k] = -1 if lane[k] > MIDDLE_LANE else 1
+
+        new_lane = lane + decision
+        start = (decision != 0) & (new_lane >= 0) & (new_lane < NUM_LANES)
+        ob["target_lane"][env[start], slot[start]] = new_lane[start]
+        ob["changing"][env[start], slot[start]] = True
+
+    def _update_spawns(self):
+        # SpawnScheduler.update, with random draws only where a spawn is due
+        difficulty = self.settings.get("difficulty", 1)
+        density = self.settings.get("traffic_density", 1.0)
+        distance = self.distance.astype(np.float64)
+        ramp = np.minimum(SPAWN_MAX_RAMP, 1 + distance / SPAWN_RAMP_DISTANCE)
+        rate = SPAWN_BASE_RATE * DIFFICULTY_SPAWN_SCALE[difficulty] * density * ramp
+        if density <= 0:
+            self.frames_until_spawn[:] = np.nan
+            return
+        wave_interval = WAVE_INTERVAL / DIFFICULTY_SPAWN_SCALE[difficulty]
+
+        for i in np.flatnonzero(np.isnan(self.frames_until_spawn)):
+            self.frames_until_spawn[i] = self.rngs[i].expovariate(float(rate[i]))
+        unset = np.isnan(self.next_wave_distance)
+        self.next_wave_distance[unset] = distance[unset] + wave_interval
+
+        counts = np.zeros(self.num_envs, dtype=np.int64)
+        self.frames_until_spawn -= 1
+        for i in np.flatnonzero(self.frames_until_spawn <= 0):
+            rng, frames = self.rngs[i], self.frames_until_spawn[i]
+            while frames <= 0:
+                counts[i] += 1
+                frames += rng.expovariate(float(rate[i]))
+            self.frames_until_spawn[i] = frames
+
+        wave = distance >= self.next_wave_distance
+        self.next_wave_distance[wave] = distance[wave] + wave_interval
+        counts[wave] = np.maximum(counts[wave], NUM_LANES - 1)
+
+        for i in np.flatnonzero(counts):
+            self._spawn(i, counts[i])
+
+    def _spawn(self, i, count):
+        # ObstacleManager._spawn for environment i
+        ob = self.obstacles
+        active = ob["active"][i]
+        near = active & (ob["y"][i] < SPAWN_Y + SPAWN_CLEARANCE)
+        occupied = set(ob["lane"][i][near].tolist())
+        occupied.update(ob["target_lane"][i][near & ob["changing"][i]].tolist())
+        free_lanes = [lane for lane in range(NUM_LANES) if lane not in occupied]
+        count = min(count, len(free_lanes), NUM_LANES - 1 - len(occupied))
+
+        rng = self.rngs[i]
+        intervals = None
+        for lane in rng.sample(free_lanes, max(0, count)):
+            r = rng.randint(0, 99)  # ObstacleManager weights: 60 / 30 / 10
+            kind = TRAFFIC if r < 60 else TRASH if r < 90 else ROADBLOCK
+            rotation = rng.randint(0, 360) if kind == TRASH else 0
+            width, height, speed = OBSTACLE_SHAPES[kind]
+            if intervals is None:
+                n = int(ob["active"][i].sum())
+                intervals = lane_intervals(
+                    ob["lane"][i, :n].tolist(), ob["target_lane"][i, :n].tolist(),
+                    ob["changing"][i, :n].tolist(), ob["y"][i, :n].tolist(), ob["height"][i, :n].tolist())
+            start, end = SPAWN_Y - CAR_HEIGHT, SPAWN_Y + height
+            if closes_last_lane((lane,), start, end, intervals):
+                continue
+            intervals.append(((lane,), start, end))
+
+            slot = int(ob["active"][i].sum())
+            if slot == self.capacity:
+                self._grow()
+            values = {"active": True, "kind": kind, "lane": lane, "target_lane": lane,
+                      "x": 0.0, "y": SPAWN_Y, "width": width, "height": height,
+                      "speed": speed, "changing": False, "decision_cooldown": 0,
+                      "rotation": rotation}
+            for name, value in values.items():
+                ob[name][i, slot] = value
+
+    def _grow(self):
+        for name, column in self.obstacles.items():
+            self.obstacles[name] = np.concatenate([column, np.zeros_like(column)], axis=1)
+
+    def _check_collisions(self):
+        # BaseObstacle.collides_with_car against every active obstacle
+        ob = self.obstacles
+        car_x = self.car_x[:, None]
+        hit = (ob["active"] &
+               (car_x < ob["x"] + ob["width"]) & (car_x + CAR_WIDTH > ob["x"]) &
+               (CAR_Y < ob["y"] + ob["height"]) & (CAR_Y + CAR_HEIGHT > ob["y"]))
+        return hit.any(axis=1)
+
+    def _observe(self):
+        # CarEnv._observe, one row per environment
+        ob = self.obstacles
+        car_center_x = self.car_x + CAR_WIDTH / 2
+        car_center_y = CAR_Y + CAR_HEIGHT / 2
+        samples = car_center_y - np.arange(ENV_ROAD_SAMPLES + 1) * ENV_ROAD_SAMPLE_SPACING
+        centers = self.road_center(np.broadcast_to(samples, (self.num_envs, len(samples))))
+        road_center = centers[:, 0]
+
+        gap = CAR_Y - (ob["y"] + ob["height"])
+        nearby = ob["active"] & (gap > -CAR_HEIGHT) & (gap < ENV_LOOK_AHEAD)
+        free = np.empty((self.num_envs, NUM_LANES))
+        for lane in range(NUM_LANES):
+            in_lane = nearby & (ob["lane"] == lane)
+            free[:, lane] = np.maximum(np.where(in_lane, gap, ENV_LOOK_AHEAD).min(axis=1), 0)
+
+        observation = np.empty((self.num_envs, self.observation_size), dtype=np.float32)
+        observation[:, 0] = (car_center_x - road_center) / (ROAD_WIDTH / 2)
+        observation[:, 1] = self.car_angle / MAX_ROTATION
+        observation[:, 2] = self.car_lane / LANE_SCALE
+        observation[:, 3] = self.car_target_lane / LANE_SCALE
+        observation[:, 4] = self.car_changing
+        observation[:, 5] = self.car_cooldown / LANE_CHANGE_COOLDOWN_MAX
+        observation[:, 6:6 + NUM_LANES] = free / ENV_LOOK_AHEAD
+        observation[:, 6 + NUM_LANES:] = (centers[:, 1:] - road_center[:, None]) / CURVE_AMPLITUDE
+        return observation
@@ -4,6 +4,14 @@ import random
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 FPS = 60
+STARTUP_TARGET_MS = 200  # Budget from Game() to the first presented frame
+RENDER_BACKEND = "software"  # "software" (pygame.draw) or "texture" (SDL2 Renderer)
+RENDER_SCALE = 1.0  # Internal resolution for the world and background, e.g. 0.5 or 0.75
+RENDER_SMOOTH_UPSCALE = True  # smoothscale instead of nearest-neighbour scale
+EFFECTS_THREADED = True  # Software backend: draw rain, grid and particles on a worker thread
+EFFECTS_FPS = 30  # Background redraws per second on that thread
+IDLE_DELAY = 2.0  # Seconds without input before the menu or a paused game slows down
+IDLE_FPS = 10  # Frame and background rate while idle; any input restores FPS at once
 
 # Colors
 WHITE = (255, 255, 255)
@@ -17,8 +25,10 @@ BLUE = (0, 120, 255)
 PURPLE = (120, 0, 255)
 
 # Road parameters
-ROAD_WIDTH = 300
-LANE_WIDTH = ROAD_WIDTH / 3
+NUM_LANES = 3
+LANE_WIDTH = 100
+ROAD_WIDTH = LANE_WIDTH * NUM_LANES
+MIDDLE_LANE = NUM_LANES // 2  # Where the car starts and idle AI drivers drift back to
 BASE_ROAD_CENTER = SCREEN_WIDTH // 2
 CURVE_AMPLITUDE = 100
 CURVE_WAVELENGTH = 1200
@@ -26,6 +36,16 @@ ROAD_DETAIL = 20
 ROAD_SEGMENTS = 10
 SCROLL_SPEED = 3
 
+# Lane dashes: one sprite, placed along the lane curves
+LANE_DASH_LENGTH = 40
+LANE_DASH_GAP = 30
+LANE_DASH_ANGLE_STEP = 2  # degrees between cached rotations
+
+# Leaderboard parameters
+LEADERBOARD_PATH = "leaderboard.db"
+LEADERBOARD_SIZE = 5
+PLAYER_NAME = "Player"
+
 # Car parameters
 CAR_WIDTH = 40
 CAR_HEIGHT = 70
@@ -35,6 +55,54 @@ ROTATION_SPEED = 5
 LANE_CHANGE_SPEED = 4
 LANE_CHANGE_COOLDOWN_MAX = 15
 
+# Obstacle spawn parameters
+SPAWN_Y = -50
+SPAWN_BASE_RATE = 1 / 60  # Expected spawns per frame at Normal difficulty, 100% traffic
+DIFFICULTY_SPAWN_SCALE = [0.7, 1.0, 1.4]  # Easy, Normal, Hard
+SPAWN_RAMP_DISTANCE = 6000  # Distance over which the spawn rate doubles
+SPAWN_MAX_RAMP = 3.0
+WAVE_INTERVAL = 2400  # Distance between obstacle waves at Normal difficulty
+SPAWN_CLEARANCE = CAR_HEIGHT * 2  # Obstacles this close to the spawn line occupy their lane
+
+# Traffic car following (see game_objects/traffic_flow.py); speeds in pixels per tick
+TRAFFIC_SPEED = SCROLL_SPEED * 0.5  # Desired forward speed of traffic, relative to the road
+TRAFFIC_DECISION_INTERVAL = 15  # Ticks between a traffic car's AIDriver decisions
+TRAFFIC_LOOK_AHEAD = 200  # How far ahead traffic considers obstacles
+IDM_MAX_ACCEL = 0.05  # Pixels per tick squared
+IDM_COMFORT_DECEL = 0.1
+IDM_TIME_HEADWAY = 40  # Ticks of travel kept as a gap to the car ahead
+IDM_MIN_GAP = 20  # Gap to the car ahead when stopped
+IDM_DELTA = 4  # How sharply acceleration falls off near the desired speed (an integer)
+IDM_VECTORIZE_MIN = 48  # Obstacles from which car-following speeds are computed with NumPy
+
+# Tuned parameters for the player's AI, read at startup if present (see car_game/tuner.py)
+AI_PARAMS_PATH = "ai_params.json"
+
+# Reinforcement-learning environment (see car_game/env.py)
+ENV_MAX_STEPS = 10000  # Episodes are truncated after this many ticks
+ENV_LOOK_AHEAD = 400  # Free distance at which a lane counts as clear
+ENV_ROAD_SAMPLES = 4  # Road center samples ahead of the car in each observation
+ENV_ROAD_SAMPLE_SPACING = 100
+ENV_ALIVE_REWARD = 1.0
+ENV_OFF_ROAD_PENALTY = -0.5
+ENV_CRASH_PENALTY = -100.0
+
+# Lane occupancy observation (ObstacleManager.observation)
+OCCUPANCY_BINS = 8  # Distance bins ahead of the car
+OCCUPANCY_BIN_SIZE = SCROLL_SPEED * 16  # A multiple of SCROLL_SPEED
+OCCUPANCY_TTC_HORIZON = 120  # Ticks; time-to-collision is reported as a fraction of this
+
+# State trace recording (see car_game/trace.py)
+TRACE_CHUNK_TICKS = 4096  # Rows handed to the writer thread at a time
+TRACE_CHUNK_BUFFERS = 3
+TRACE_INITIAL_TICKS = FPS * 3600  # Column files start with room for an hour; they double when full
+
+# World snapshots (Car/Road/ObstacleManager.snapshot, game_objects/snapshot.py)
+SNAPSHOT_MAX_OBSTACLES = 512  # Obstacle slots in each snapshot record
+
+# Simulation in a separate process (see car_game/sim_process.py)
+SIM_JOIN_TIMEOUT = 2.0  # Seconds to wait for the simulation process on quit
+
 # Car colors
 CAR_BODY_COLOR = (255, 40, 0)
 CAR_WINDOW_COLOR = (100, 149, 237)
@@ -46,9 +114,15 @@ TREE_COLORS = [(0, 100, 0), (0, 120, 0), (0, 140, 0), (34, 139, 34), (0, 160, 0)
 ROCK_COLORS = [(169, 169, 169), (192, 192, 192), (211, 211, 211)]
 BUSH_COLORS = [(0, 100, 0), (50, 205, 50), (34, 139, 34)]
 
+# Objects generated per scenery chunk (see game_objects/scenery.py)
 NUM_TREES = 40
 NUM_ROCKS = 25
 NUM_BUSHES = 20
+SCENERY_CHUNK_HEIGHT = SCREEN_HEIGHT  # Road distance covered by one chunk and its tile
+SCENERY_TILE_PAD = 90  # Extra tile height above and below for objects crossing the chunk edge
+SCENERY_GRID = 10  # Objects sit on this grid along the road
+SCENERY_MARGIN = 40  # Minimum distance between an object and the road edge or screen side
+SCENERY_KEY_COLOR = (255, 0, 255)  # Transparent color of scenery tiles
 NUM_NOISE_POINTS = 20
 
 # Set random seed for consistent generation
@@ -62,6 +136,7 @@ MATRIX_GREEN = (0, 185, 20)
 DARK_MATRIX = (0, 40, 0)
 TERMINAL_GREEN = (20, 255, 20)
 GRID_COLOR = (0, 100, 0)
+SPRITE_COLORKEY = (255, 0, 255)  # Transparent color of opaque sprites
 
 # Digital rain characters
 MATRIX_CHARS = "ｱｲｳｴｵｶｷｸｹｺｻｼｽｾｿﾀﾁﾂﾃ1234567890"
@@ -73,4 +148,45 @@ GLOW_INTENSITY = 3
 SCAN_LINE_SPACING = 4
 SCAN_LINE_ALPHA = 30
 GRID_SIZE = 20
-PARTICLE_COUNT = 100 
\ No newline at end of file
+PARTICLE_COUNT = 100
+RAIN_DROP_COUNT = 50
+
+# NumPy post-processing (see post_process.py)
+POST_BLOOM = True
+POST_CHROMATIC_ABERRATION = True
+POST_VIGNETTE = True
+POST_PROCESS_BUDGET_MS = 4.0
+POST_DROP_FRAMES = 30  # Frames in a row over budget before an effect is dropped
+POST_RESTORE_FRAMES = 120  # Frames in a row with room to spare before it comes back
+POST_RESTORE_HEADROOM = 0.75  # Fraction of the budget a dropped effect must fit in
+BLOOM_DOWNSAMPLE = 4
+BLOOM_RADIUS = 2
+BLOOM_THRESHOLD = 200  # Brightest channel needed for a pixel to bloom
+BLOOM_STRENGTH = 0.6
+CHROMATIC_SHIFT = 2
+VIGNETTE_STRENGTH = 0.35
+
+# Night mode lighting (see lighting.py)
+NIGHT_AMBIENT = (60, 60, 90)  # Light map color where no light reaches
+HEADLIGHT_COLOR = (255, 235, 190)
+LIGHT_CONE_LENGTH = 220
+LIGHT_CONE_SPREAD = 22  # Half-angle of each headlight cone, degrees
+LIGHT_CONE_STEPS = 6  # Falloff bands baked into the light sprite
+LIGHT_ANGLE_STEP = 3  # Rotated light sprites are cached per this many degrees
+
+# Adaptive quality: tiers from best to cheapest
+QUALITY_TIERS = [
+    {"name": "High", "particles": PARTICLE_COUNT, "rain_drops": RAIN_DROP_COUNT,
+     "glow_layers": GLOW_INTENSITY, "antialias": True, "post_process": True},
+    {"name": "Medium", "particles": 60, "rain_drops": 35,
+     "glow_layers": 2, "antialias": True, "post_process": True},
+    {"name": "Low", "particles": 30, "rain_drops": 20,
+     "glow_layers": 1, "antialias": False, "post_process": False},
+    {"name": "Minimal", "particles": 0, "rain_drops": 10,
+     "glow_layers": 1, "antialias": False, "post_process": False},
+]
+FRAME_BUDGET_MS = 1000 / FPS
+QUALITY_WINDOW = 60  # Frames averaged before each decision
+QUALITY_DOWNGRADE_RATIO = 1.0  # Step down when the average exceeds the budget
+QUALITY_UPGRADE_RATIO = 0.6  # Step up only when well under budget
+QUALITY_COOLDOWN = 180  # Frames to wait after a change before deciding again 
\ No newline at end of file
@@ -1,81 +1,137 @@
+import contextlib
 import pygame
 import random
+import threading
+import time
 from config import *
+from assets import get_font
+from render_target import RenderTarget
+
+# Visual randomness has its own generator so drawing never shifts the
+# gameplay random stream that seeded runs and scenarios replay
+visual_random = random.Random()
 
 class DigitalRain:
-    def __init__(self, screen):
-        self.screen = screen
+    def __init__(self, target):
+        self.screen = target.surface
+        self.target = target
         self.drops = []
-        self.font = pygame.font.SysFont('arial', 14)
+        self.drop_count = RAIN_DROP_COUNT
+        self.antialias = True
+        self.font = get_font('arial', target.length(14))
+        self.setup_drops()
+
+    def reset(self):
+        self.drops.clear()
         self.setup_drops()
 
     def setup_drops(self):
-        for _ in range(50):
+        for _ in range(self.drop_count - len(self.drops)):
             self.drops.append({
-                'x': random.randint(0, SCREEN_WIDTH),
-                'y': random.randint(-SCREEN_HEIGHT, 0),
-                'speed': random.randint(5, 15),
-                'chars': [random.choice(MATRIX_CHARS) for _ in range(20)],
-                'length': random.randint(10, 30)
+                'x': visual_random.randint(0, SCREEN_WIDTH),
+                'y': visual_random.randint(-SCREEN_HEIGHT, 0),
+                'speed': visual_random.randint(5, 15),
+                'chars': [visual_random.choice(MATRIX_CHARS) for _ in range(20)],
+                'length': visual_random.randint(10, 30)
             })
 
+    def set_drop_count(self, count):
+        self.drop_count = count
+        del self.drops[count:]
+        self.setup_drops()
+
     def update_and_draw(self):
+        self.render()
+        self.update()
+
+    def render(self):
         for drop in self.drops:
             # Draw characters with fading effect
             for i, char in enumerate(drop['chars']):
                 y_pos = drop['y'] + i * 15
                 alpha = max(0, 255 - i * 15)
-                text = self.font.render(char, True, MATRIX_GREEN)
+                text = self.font.render(char, self.antialias, MATRIX_GREEN)
                 text.set_alpha(alpha)
-                self.screen.blit(text, (drop['x'], y_pos))
-            
+                self.screen.blit(text, self.target.point((drop['x'], y_pos)))
+
+    def update(self):
+        for drop in self.drops:
             # Update position
             drop['y'] += drop['speed']
             if drop['y'] > SCREEN_HEIGHT:
-                drop['y'] = random.randint(-200, -100)
-                drop['x'] = random.randint(0, SCREEN_WIDTH)
+                drop['y'] = visual_random.randint(-200, -100)
+                drop['x'] = visual_random.randint(0, SCREEN_WIDTH)
 
 class CyberGrid:
-    def __init__(self, screen):
-        self.screen = screen
+    def __init__(self, target):
+        self.screen = target.surface
+        self.target = target
+        self.offset = 0
+        self.grid_surface = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
+
+    def reset(self):
         self.offset = 0
-        self.grid_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
         
     def draw(self):
+        self.render()
+        self.update()
+
+    def update(self):
+        self.offset = (self.offset + 1) % GRID_SIZE
+
+    def render(self):
         self.grid_surface.fill((0, 0, 0, 0))
         
+        width, height = self.grid_surface.get_size()
+        scale = self.target.scale
+
         # Draw horizontal lines
         for y in range(0, SCREEN_HEIGHT + GRID_SIZE, GRID_SIZE):
-            y_pos = (y + self.offset) % SCREEN_HEIGHT
+            y_pos = (y + self.offset) % SCREEN_HEIGHT * scale
             pygame.draw.line(self.grid_surface, GRID_COLOR, (0, y_pos), 
-                           (SCREEN_WIDTH, y_pos), 1)
+                           (width, y_pos), 1)
             
         # Draw vertical lines
         for x in range(0, SCREEN_WIDTH + GRID_SIZE, GRID_SIZE):
-            pygame.draw.line(self.grid_surface, GRID_COLOR, (x, 0), 
-                           (x, SCREEN_HEIGHT), 1)
+            pygame.draw.line(self.grid_surface, GRID_COLOR, (x * scale, 0), 
+                           (x * scale, height), 1)
         
         self.screen.blit(self.grid_surface, (0, 0))
-        self.offset = (self.offset + 1) % GRID_SIZE
 
 class DataParticles:
-    def __init__(self, screen):
-        self.screen = screen
+    def __init__(self, target):
+        self.screen = target.surface
+        self.target = target
         self.particles = []
+        self.count = PARTICLE_COUNT
+        self.glow_layers = GLOW_INTENSITY
+        self.setup_particles()
+
+    def reset(self):
+        self.particles.clear()
+        self.setup_particles()
+
+    def set_count(self, count):
+        self.count = count
+        del self.particles[count:]
         self.setup_particles()
 
     def setup_particles(self):
-        for _ in range(PARTICLE_COUNT):
+        for _ in range(self.count - len(self.particles)):
             self.particles.append({
-                'pos': pygame.Vector2(random.randint(0, SCREEN_WIDTH),
-                                    random.randint(0, SCREEN_HEIGHT)),
-                'vel': pygame.Vector2(random.uniform(-2, 2),
-                                    random.uniform(-2, 2)),
-                'size': random.randint(2, 5),
-                'color': random.choice([NEON_GREEN, NEON_BLUE, CYBER_PINK])
+                'pos': pygame.Vector2(visual_random.randint(0, SCREEN_WIDTH),
+                                    visual_random.randint(0, SCREEN_HEIGHT)),
+                'vel': pygame.Vector2(visual_random.uniform(-2, 2),
+                                    visual_random.uniform(-2, 2)),
+                'size': visual_random.randint(2, 5),
+                'color': visual_random.choice([NEON_GREEN, NEON_BLUE, CYBER_PINK])
             })
 
     def update_and_draw(self):
+        self.update()
+        self.render()
+
+    def update(self):
         for p in self.particles:
             # Update position
             p['pos'] += p['vel']
@@ -83,11 +139,161 @@ class DataParticles:
             # Wrap around screen
             p['pos'].x = p['pos'].x % SCREEN_WIDTH
             p['pos'].y = p['pos'].y % SCREEN_HEIGHT
-            
+
+    def render(self):
+        for p in self.particles:
             # Draw particle with glow effect
-            for i in range(GLOW_INTENSITY):
-                size = p['size'] + i * 2
+            for i in range(self.glow_layers):
+                size = self.target.length(p['size'] + i * 2)
                 alpha = 255 // (i + 1)
                 surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
                 pygame.draw.circle(surf, (*p['color'], alpha), (size, size), size)
-                self.screen.blit(surf, p['pos'] - pygame.Vector2(size, size)) 
\ No newline at end of file
+                x, y = self.target.point(p['pos'])
+                self.screen.blit(surf, (x - size, y - size))
+
+class BackgroundCompositor:
+    """Draws the background effects on a worker thread.
+
+    The worker redraws rain, grid and particles into the back buffer at
+    its own rate, then swaps it with the front buffer. The frame loop only
+    blits the front buffer, so the effects cost it one blit; most of the
+    worker's time is spent in blits and fills, during which pygame releases
+    the GIL. Effect state is guarded by lock, the buffers by swap_lock.
+    """
+    def __init__(self, effects, fps=EFFECTS_FPS):
+        self.effects = effects
+        self.fps = fps
+        canvas = effects.target.surface
+        self.front = pygame.Surface(canvas.get_size(), 0, canvas)
+        self.back = pygame.Surface(canvas.get_size(), 0, canvas)
+        self.front.fill(DARK_MATRIX)
+        self.lock = threading.Lock()
+        self.swap_lock = threading.Lock()
+        self.frames = 0
+        self.stopping = threading.Event()
+        self.wakeup = threading.Event()  # Cuts the wait short on stop or a rate change
+        self.thread = threading.Thread(target=self._worker, name="background-effects", daemon=True)
+        self.thread.start()
+
+    def set_fps(self, fps):
+        """Change the redraw rate; takes effect at once"""
+        if fps != self.fps:
+            self.fps = fps
+            self.wakeup.set()
+
+    def _worker(self):
+        effects = self.effects
+        next_frame = time.monotonic()
+        while not self.stopping.is_set():
+            with self.lock:
+                for effect in (effects.digital_rain, effects.cyber_grid, effects.particles):
+                    effect.screen = self.back
+                self.back.fill(DARK_MATRIX)
+                effects.digital_rain.render()
+                effects.cyber_grid.render()
+                effects.particles.render()
+                # Effects advance FPS times per second whatever the redraw rate
+                for _ in range(max(1, round(FPS / self.fps))):
+                    effects.digital_rain.update()
+                    effects.cyber_grid.update()
+                    effects.particles.update()
+            with self.swap_lock:
+                self.front, self.back = self.back, self.front
+                self.frames += 1
+
+            frame_time = 1.0 / self.fps
+            next_frame += frame_time
+            now = time.monotonic()
+            if now - next_frame > frame_time:
+                next_frame = now  # Fell behind: resync rather than burst
+            if self.wakeup.wait(max(0.0, next_frame - now)):
+                self.wakeup.clear()
+                next_frame = time.monotonic()  # Rate changed: redraw now
+
+    def blit(self, surface):
+        with self.swap_lock:
+            surface.blit(self.front, (0, 0))
+
+    def stop(self):
+        self.stopping.set()
+        self.wakeup.set()
+        self.thread.join()
+
+class BackgroundEffects:
+    """Rain, grid and particles shared by the menu and the game renderer.
+
+    They draw onto a RenderTarget at the given internal scale, which the
+    menu and renderer then present to the window. The individual effects
+    are only built when first drawn. With threaded, draw() starts a
+    BackgroundCompositor and copies its latest frame instead of drawing.
+    """
+    def __init__(self, screen, scale=1.0, threaded=False):
+        self.target = RenderTarget(screen, scale)
+        self.screen = self.target.surface
+        self.digital_rain = None
+        self.cyber_grid = None
+        self.particles = None
+        self.quality = None
+        self.threaded = threaded
+        self.fps = EFFECTS_FPS  # Compositor redraw rate; lowered while the game is idle
+        self.compositor = None
+
+    def _build(self):
+        self.digital_rain = DigitalRain(self.target)
+        self.cyber_grid = CyberGrid(self.target)
+        self.particles = DataParticles(self.target)
+        if self.quality is not None:
+            self.apply_quality(self.quality)
+
+    def apply_quality(self, tier):
+        self.quality = tier
+        if self.digital_rain is None:
+            return  # Applied once the effects are built
+        with self._state_lock():
+            self.digital_rain.set_drop_count(tier["rain_drops"])
+            self.digital_rain.antialias = tier["antialias"]
+            self.particles.set_count(tier["particles"])
+            self.particles.glow_layers = tier["glow_layers"]
+
+    def reset(self):
+        # Nothing to clear until the effects have been built
+        if self.digital_rain is not None:
+            with self._state_lock():
+                self.digital_rain.reset()
+                self.cyber_grid.reset()
+                self.particles.reset()
+
+    def _state_lock(self):
+        # The compositor's worker owns the effects while it runs
+        return self.compositor.lock if self.compositor is not None else contextlib.nullcontext()
+
+    def set_fps(self, fps):
+        self.fps = fps
+        if self.compositor is not None:
+            self.compositor.set_fps(fps)
+
+    def shutdown(self):
+        if self.compositor is not None:
+            self.compositor.stop()
+            self.compositor = None
+
+    def update(self):
+        """Advance the effects without drawing them (for other backends)"""
+        if self.digital_rain is None:
+            self._build()
+        self.digital_rain.update()
+        self.cyber_grid.update()
+        self.particles.update()
+
+    def draw(self):
+        if self.digital_rain is None:
+            self._build()
+        if self.threaded:
+            if self.compositor is None:
+                self.compositor = BackgroundCompositor(self, self.fps)
+            self.compositor.blit(self.screen)
+            return
+        self.screen.fill(DARK_MATRIX)
+        self.digital_rain.update_and_draw()
+        self.cyber_grid.draw()
+        self.particles.update_and_draw()
@@ -1,14 +1,51 @@
+import json
+import os
 import random
+import numpy as np
+from config import *
+
+# Decision parameters. Traffic uses the defaults; the player's AI uses
+# AIDriver.params, which car_game/tuner.py searches over and
+# AIDriver.load_params reads back.
+DEFAULT_PARAMS = {
+    "look_ahead": 400,  # How far ahead the player's AI considers obstacles
+    "behind_window": 50,  # How far behind obstacles are still considered
+    "decision_interval": 5,  # Ticks between the player's AI decisions
+    "immediate_distance": 100,  # Threats closer than this call for an escape
+    "escape_threshold": 50,  # Lowest lane score worth escaping into
+    "medium_distance": 200,  # Threats closer than this allow a planned lane change
+    "switch_margin": 30,  # Score gain a planned lane change must make
+    "lane_bonus": 20,  # Preference for staying in the current lane
+}
 
 class AIDriver:
+    params = dict(DEFAULT_PARAMS)  # The player's AI
+
+    @classmethod
+    def load_params(cls, path=AI_PARAMS_PATH, required=True):
+        """Use the parameters from a tuner output file for the player's AI.
+
+        Returns the path loaded. With required=False a missing file leaves
+        the current parameters and returns None.
+        """
+        if not required and not os.path.exists(path):
+            return None
+        with open(path) as f:
+            params = json.load(f)["params"]
+        unknown = set(params) - set(DEFAULT_PARAMS)
+        if unknown:
+            raise ValueError(f"{path}: unknown AI parameters {sorted(unknown)}")
+        cls.params = {**DEFAULT_PARAMS, **params}
+        return path
+
     @staticmethod
-    def make_decision(car, obstacles, look_ahead=300):
+    def make_decision(car, obstacles, look_ahead=300, params=DEFAULT_PARAMS):
         # Filter and sort relevant obstacles
         relevant_obstacles = []
         for obs in obstacles:
-            distance = obs.y - car.y
+            distance = car.y - obs.y  # Positive ahead: the road comes down the screen
             # Consider obstacles ahead and slightly behind
-            if -50 < distance < look_ahead:
+            if -params["behind_window"] < distance < look_ahead:
                 # Consider all lanes for better awareness
                 lane_diff = abs(obs.lane - car.lane)
                 if lane_diff <= 1:  # Same or adjacent lanes
@@ -19,8 +56,8 @@ class AIDriver:
         
         # If no obstacles and not in middle lane, consider moving to middle
         if not relevant_obstacles:
-            if car.lane != 1 and not car.is_changing_lanes and random.random() < 0.01:  # 1% chance to move to middle
-                return -1 if car.lane > 1 else 1
+            if car.lane != MIDDLE_LANE and not car.is_changing_lanes and random.random() < 0.01:  # 1% chance to move to middle
+                return -1 if car.lane > MIDDLE_LANE else 1
             return None
             
         # Check for threats in current lane
@@ -33,27 +70,31 @@ class AIDriver:
             closest_threat, threat_dist = same_lane_threats[0]
             
             # Calculate safety scores for each lane
-            lane_scores = {0: 100, 1: 100, 2: 100}  # Base scores
+            lane_scores = np.full(NUM_LANES, 100.0)  # Base scores
             
-            # Reduce scores based on obstacles
-            for obs, dist in relevant_obstacles:
-                if dist > 0:  # Forward obstacles reduce score more
-                    lane_scores[obs.lane] -= 100 / (dist / 50)
-                else:  # Rear obstacles reduce score less
-                    lane_scores[obs.lane] -= 50 / (abs(dist) / 50)
+            # Reduce scores based on obstacles: forward obstacles reduce score
+            # more, rear ones less (side-by-side counts as 1px)
+            lanes = np.array([obs.lane for obs, _ in relevant_obstacles])
+            dists = np.array([dist for _, dist in relevant_obstacles], dtype=float)
+            forward = dists > 0
+            penalties = np.empty(len(dists))
+            penalties[forward] = 100 / (dists[forward] / 50)
+            penalties[~forward] = 50 / (np.maximum(np.abs(dists[~forward]), 1) / 50)
+            # Unbuffered, so lanes with several obstacles subtract in list order
+            np.subtract.at(lane_scores, lanes, penalties)
             
             # Bonus for current lane to reduce unnecessary changes
-            lane_scores[car.lane] += 20
+            lane_scores[car.lane] += params["lane_bonus"]
             
             # If immediate danger
-            if threat_dist < 100:
+            if threat_dist < params["immediate_distance"]:
                 # Find best escape route
                 possible_moves = []
                 if car.lane > 0:  # Can move left
-                    if lane_scores[car.lane - 1] > 50:  # Reasonable safety threshold
+                    if lane_scores[car.lane - 1] > params["escape_threshold"]:  # Reasonable safety threshold
                         possible_moves.append(-1)
-                if car.lane < 2:  # Can move right
-                    if lane_scores[car.lane + 1] > 50:
+                if car.lane < NUM_LANES - 1:  # Can move right
+                    if lane_scores[car.lane + 1] > params["escape_threshold"]:
                         possible_moves.append(1)
                 
                 if possible_moves:
@@ -62,11 +103,11 @@ class AIDriver:
                              key=lambda move: lane_scores[car.lane + move])
             
             # For medium-range threats, be more strategic
-            elif threat_dist < 200:
+            elif threat_dist < params["medium_distance"]:
                 # Only change if significantly better option exists
-                best_lane = max(range(3), 
-                              key=lambda l: lane_scores[l] if abs(l - car.lane) <= 1 else -float('inf'))
-                if best_lane != car.lane and lane_scores[best_lane] > lane_scores[car.lane] + 30:
+                best_lane = max(range(max(car.lane - 1, 0), min(car.lane + 2, NUM_LANES)),
+                                key=lambda l: lane_scores[l])
+                if best_lane != car.lane and lane_scores[best_lane] > lane_scores[car.lane] + params["switch_margin"]:
                     return 1 if best_lane > car.lane else -1
         
         return None 
\ No newline at end of file
@@ -1,22 +1,38 @@
+import math
+import numpy as np
 import pygame
 from config import *
 from .ai_driver import AIDriver
 
+# Car.snapshot() record: every attribute that changes while driving
+CAR_STATE_DTYPE = np.dtype([
+    ("x", np.float64), ("y", np.float64), ("angle", np.float64), ("target_angle", np.float64),
+    ("lane", np.int8), ("target_lane", np.int8),
+    ("is_changing_lanes", np.bool_), ("ai_mode", np.bool_), ("off_road", np.bool_),
+    ("lane_change_cooldown", np.int32), ("decision_cooldown", np.int32),
+    ("decision_interval", np.int32), ("moving_direction", np.int32),
+])
+
 class Car:
+    _surface = None  # Sprite shared by every Car, built on first use
+
     def __init__(self):
         self.x = SCREEN_WIDTH // 2 - CAR_WIDTH // 2
         self.y = SCREEN_HEIGHT - CAR_HEIGHT - 20
-        self.lane = 1
+        self.lane = MIDDLE_LANE
         self.angle = 0
         self.target_angle = 0
-        self.target_lane = 1
+        self.target_lane = MIDDLE_LANE
         self.is_changing_lanes = False
         self.lane_change_cooldown = 0
         self.moving_direction = 0
-        self.surface = self._create_car_surface()
+        if Car._surface is None:
+            Car._surface = self._create_car_surface()
+        self.surface = Car._surface
         self.ai_mode = True  # Start in AI mode
         self.decision_cooldown = 0
         self.decision_interval = 10  # Frames between AI decisions
+        self.off_road = False  # Refreshed once per tick in update()
 
     def _create_car_surface(self):
         """Create a detailed car surface"""
@@ -91,16 +107,14 @@ class Car:
                 self.is_changing_lanes = True
                 self.lane_change_cooldown = LANE_CHANGE_COOLDOWN_MAX
         if (keys[pygame.K_RIGHT] or keys[pygame.K_d]) and not self.is_changing_lanes and self.lane_change_cooldown == 0:
-            if self.lane < 2:
+            if self.lane < NUM_LANES - 1:
                 self.target_lane = self.lane + 1
                 self.is_changing_lanes = True
                 self.lane_change_cooldown = LANE_CHANGE_COOLDOWN_MAX
 
     def _update_position(self, road):
-        lane_positions = road.get_lane_positions(self.y + CAR_HEIGHT / 2)
-        
         if self.is_changing_lanes:
-            target_x = lane_positions[self.target_lane]
+            target_x = road.get_lane_center(self.y + CAR_HEIGHT / 2, self.target_lane)
             car_center_x = self.x + CAR_WIDTH / 2
             
             direction = 1 if target_x > car_center_x else -1
@@ -113,7 +127,7 @@ class Car:
                 self.lane = self.target_lane
                 self.is_changing_lanes = False
         else:
-            target_x = lane_positions[self.lane]
+            target_x = road.get_lane_center(self.y + CAR_HEIGHT / 2, self.lane)
             self.x = target_x - CAR_WIDTH / 2
 
     def _update_rotation(self):
@@ -122,40 +136,66 @@ class Car:
         elif self.angle > self.target_angle:
             self.angle = max(self.angle - ROTATION_SPEED, self.target_angle)
 
-    def is_off_road(self, road):
-        corners = [
-            (self.x, self.y),  # Top left
-            (self.x + CAR_WIDTH, self.y),  # Top right
-            (self.x, self.y + CAR_HEIGHT),  # Bottom left
-            (self.x + CAR_WIDTH, self.y + CAR_HEIGHT)  # Bottom right
-        ]
-        
-        for corner_x, corner_y in corners:
-            left_edge, right_edge = road.get_road_edges(corner_y)
+    def get_corners(self):
+        """Corners of the car footprint rotated by self.angle around its center"""
+        center_x = self.x + CAR_WIDTH / 2
+        center_y = self.y + CAR_HEIGHT / 2
+        # pygame.transform.rotate turns counter-clockwise on screen (y points down)
+        rad = math.radians(self.angle)
+        cos_a, sin_a = math.cos(rad), math.sin(rad)
+        half_w, half_h = CAR_WIDTH / 2, CAR_HEIGHT / 2
+
+        corners = []
+        for dx, dy in ((-half_w, -half_h), (half_w, -half_h),
+                       (-half_w, half_h), (half_w, half_h)):
+            corners.append((center_x + dx * cos_a + dy * sin_a,
+                            center_y - dx * sin_a + dy * cos_a))
+        return corners
+
+    def _compute_off_road(self, road):
+        corners = self.get_corners()
+        # One batched edge lookup covering the car's y span
+        edges = road.get_road_edges_batch([corner_y for _, corner_y in corners])
+
+        for (corner_x, _), (left_edge, right_edge) in zip(corners, edges):
             if corner_x < left_edge or corner_x > right_edge:
                 return True
         return False
 
+    def is_off_road(self, road=None):
+        # Cached result from the last update(); kept for existing callers
+        return self.off_road
+
     def update(self, keys, road):
         if self.ai_mode:
             self._ai_update(road)
         else:
             self._player_update(keys, road)
 
+        self.off_road = self._compute_off_road(road)
+
+    def request_lane_change(self, direction):
+        """Start a lane change left (-1) or right (1); False if the car can't right now"""
+        # Only one change at a time, and not during the cooldown
+        if self.is_changing_lanes or self.lane_change_cooldown > 0:
+            return False
+        new_lane = self.lane + direction
+        if not 0 <= new_lane < NUM_LANES:
+            return False
+        self.target_lane = new_lane
+        self.is_changing_lanes = True
+        self.lane_change_cooldown = LANE_CHANGE_COOLDOWN_MAX
+        return True
+
     def _player_update(self, keys, road):
         if self.lane_change_cooldown > 0:
             self.lane_change_cooldown -= 1
 
         # Only handle input if not already changing lanes
-        if not self.is_changing_lanes and self.lane_change_cooldown == 0:
-            if keys[pygame.K_LEFT] and self.lane > 0:
-                self.target_lane = self.lane - 1
-                self.is_changing_lanes = True
-                self.lane_change_cooldown = LANE_CHANGE_COOLDOWN_MAX
-            elif keys[pygame.K_RIGHT] and self.lane < 2:
-                self.target_lane = self.lane + 1
-                self.is_changing_lanes = True
-                self.lane_change_cooldown = LANE_CHANGE_COOLDOWN_MAX
+        if keys[pygame.K_LEFT] and self.lane > 0:
+            self.request_lane_change(-1)
+        elif keys[pygame.K_RIGHT] and self.lane < NUM_LANES - 1:
+            self.request_lane_change(1)
 
         # Update position and rotation
         self._update_position(road)
@@ -166,7 +206,7 @@ class Car:
             self._update_lane_change(road)
 
         # Update car angle based on road
-        target_x = road.get_lane_positions(self.y + CAR_HEIGHT/2)[self.lane]
+        target_x = road.get_lane_center(self.y + CAR_HEIGHT/2, self.lane)
         self.angle = -((target_x - self.x) / ROAD_WIDTH) * MAX_ROTATION
 
     def _ai_update(self, road):
@@ -176,24 +216,15 @@ class Car:
         # AI decision making - more frequent checks for player car
         self.decision_cooldown -= 1
         if self.decision_cooldown <= 0:  # Removed the is_changing_lanes check to allow emergency maneuvers
-            self.decision_cooldown = 5  # More frequent decisions for player car
-            # Get all obstacles
-            all_obstacles = []
+            self.decision_cooldown = AIDriver.params["decision_interval"]  # More frequent decisions for player car
+            # Get all obstacles; traffic cars are among them already
+            all_obstacles = list(self.game.obstacles.obstacles)
             
-            # Add regular obstacles
-            for obs in self.game.obstacles.obstacles:
-                if hasattr(obs, 'lane'):  # Make sure obstacle has required attributes
-                    all_obstacles.append(obs)
-            
-            # Add traffic cars
-            for car in self.game.obstacles.get_all_cars():
-                if car != self and car not in all_obstacles:
-                    all_obstacles.append(car)
-            
-            decision = AIDriver.make_decision(self, all_obstacles, look_ahead=400)  # Longer look ahead for player
+            decision = AIDriver.make_decision(self, all_obstacles, look_ahead=AIDriver.params["look_ahead"],
+                                              params=AIDriver.params)  # Longer look ahead for player
             if decision is not None:
                 new_lane = self.lane + decision
-                if 0 <= new_lane <= 2:  # Verify lane is valid
+                if 0 <= new_lane < NUM_LANES:  # Verify lane is valid
                     self.target_lane = new_lane
                     self.is_changing_lanes = True
                     self.lane_change_cooldown = LANE_CHANGE_COOLDOWN_MAX // 2  # Faster cooldown for player
@@ -207,12 +238,11 @@ class Car:
             self._update_lane_change(road)
 
         # Update car angle based on road
-        target_x = road.get_lane_positions(self.y + CAR_HEIGHT/2)[self.lane]
+        target_x = road.get_lane_center(self.y + CAR_HEIGHT/2, self.lane)
         self.angle = -((target_x - self.x) / ROAD_WIDTH) * MAX_ROTATION
 
     def _update_lane_change(self, road):
-        lane_positions = road.get_lane_positions(self.y + CAR_HEIGHT / 2)
-        target_x = lane_positions[self.target_lane]
+        target_x = road.get_lane_center(self.y + CAR_HEIGHT / 2, self.target_lane)
         
         # Smoother lane changes
         car_center_x = self.x + CAR_WIDTH / 2
@@ -226,5 +256,16 @@ class Car:
             self.lane = self.target_lane
             self.is_changing_lanes = False
 
+    _STATE_FIELDS = CAR_STATE_DTYPE.names
+
+    def snapshot(self, out=None):
+        """State as a 0-d CAR_STATE_DTYPE array, written into out if given"""
+        state = np.zeros((), CAR_STATE_DTYPE) if out is None else out
+        state[()] = tuple(getattr(self, name) for name in self._STATE_FIELDS)
+        return state
+
+    def restore(self, state):
+        self.__dict__.update(zip(self._STATE_FIELDS, state.item()))
+
     def toggle_ai_mode(self):
         self.ai_mode = not self.ai_mode 
\ No newline at end of file
@@ -1,7 +1,41 @@
+import math
 import random
+import numpy as np
 import pygame
 from config import *
 from .ai_driver import AIDriver
+from .road import RoadAheadSampler
+from .traffic_flow import (car_following_speeds, car_following_speeds_list, keep_a_lane_open, lane_slack,
+                           lane_intervals, closes_last_lane)
+
+# Channels of ObstacleManager.observation, each (lanes, OCCUPANCY_BINS)
+OCC_TRAFFIC, OCC_TRASH, OCC_ROADBLOCK = 0, 1, 2  # 1 where that obstacle type is
+OCC_SPEED = 3  # Closing speed towards the car, in units of SCROLL_SPEED
+OCC_TTC = 4  # Time to collision / OCCUPANCY_TTC_HORIZON, 1 when nothing is coming
+OCC_LANE_OFFSET = 5  # Lane center relative to the car's center, in road widths
+OCCUPANCY_CHANNELS = 6
+
+# One obstacle in an ObstacleManager.snapshot(); kind indexes OBSTACLE_KINDS.
+# Fields an obstacle type doesn't have are stored as zeros.
+OBSTACLE_STATE_DTYPE = np.dtype([
+    ("kind", np.int8), ("lane", np.int8), ("target_lane", np.int8), ("is_changing_lanes", np.bool_),
+    ("x", np.float64), ("y", np.float64), ("width", np.float64), ("height", np.float64),
+    ("speed", np.float64), ("rotation", np.float64), ("color", np.uint8, (3,)),
+    ("decision_cooldown", np.int32), ("decision_interval", np.int32),
+    ("lane_change_cooldown", np.int32),
+])
+# Per-obstacle input to car_following_speeds; follows marks traffic cars
+FLOW_STATE_DTYPE = np.dtype([
+    ("lane", np.int64), ("target_lane", np.int64), ("changing", np.bool_),
+    ("y", np.float64), ("height", np.float64), ("speed", np.float64), ("follows", np.bool_),
+])
+# ObstacleManager.snapshot() record; NaN stands for a scheduler value not set yet
+OBSTACLE_MANAGER_STATE_DTYPE = np.dtype([
+    ("count", np.int32),
+    ("frames_until_spawn", np.float64),
+    ("next_wave_distance", np.float64),
+    ("obstacles", OBSTACLE_STATE_DTYPE, (SNAPSHOT_MAX_OBSTACLES,)),
+])
 
 class BaseObstacle:
     def __init__(self, lane, y):
@@ -13,8 +47,7 @@ class BaseObstacle:
         self.speed = 0  # For moving obstacles like traffic
 
     def update(self, road):
-        lane_positions = road.get_lane_positions(self.y)
-        self.x = lane_positions[self.lane] - self.width / 2
+        self.x = road.get_lane_center(self.y, self.lane) - self.width / 2
         self.y += SCROLL_SPEED + self.speed
 
     def collides_with_car(self, car):
@@ -29,11 +62,11 @@ class TrafficCar(BaseObstacle):
         self.width = CAR_WIDTH
         self.height = CAR_HEIGHT
         self.color = MATRIX_GREEN
-        self.speed = -SCROLL_SPEED * 0.5
+        self.speed = -TRAFFIC_SPEED  # Set each tick by ObstacleManager.update_traffic_speeds
         self.target_lane = lane
         self.is_changing_lanes = False
         self.decision_cooldown = 0
-        self.decision_interval = 15
+        self.decision_interval = TRAFFIC_DECISION_INTERVAL
         self.lane_change_cooldown = 0
 
     def update(self, road):
@@ -44,31 +77,20 @@ class TrafficCar(BaseObstacle):
         self.decision_cooldown -= 1
         if self.decision_cooldown <= 0 and not self.is_changing_lanes:
             self.decision_cooldown = self.decision_interval
-            # Get all obstacles including other cars
-            all_obstacles = []
-            for obs in self.game.obstacles.obstacles:
-                if hasattr(obs, 'lane'):
-                    all_obstacles.append(obs)
-            # Add player car
-            if hasattr(self.game, 'car'):
-                all_obstacles.append(self.game.car)
-            
-            # Remove self from obstacles
-            all_obstacles = [obs for obs in all_obstacles if obs != self]
+            # All other obstacles and the player car, collected once per tick
+            all_obstacles = [obs for obs in self.game.obstacles.traffic_view if obs is not self]
             
-            decision = AIDriver.make_decision(self, all_obstacles, look_ahead=200)
+            decision = AIDriver.make_decision(self, all_obstacles, look_ahead=TRAFFIC_LOOK_AHEAD)
             if decision is not None:
                 new_lane = self.lane + decision
-                if 0 <= new_lane <= 2:  # Verify lane is valid
+                if 0 <= new_lane < NUM_LANES:  # Verify lane is valid
                     self.target_lane = new_lane
                     self.is_changing_lanes = True
                     self.lane_change_cooldown = LANE_CHANGE_COOLDOWN_MAX
 
         # Update position
-        lane_positions = road.get_lane_positions(self.y)
-        
         if self.is_changing_lanes:
-            target_x = lane_positions[self.target_lane]
+            target_x = road.get_lane_center(self.y, self.target_lane)
             car_center_x = self.x + self.width / 2
             
             direction = 1 if target_x > car_center_x else -1
@@ -81,7 +103,7 @@ class TrafficCar(BaseObstacle):
                 self.lane = self.target_lane
                 self.is_changing_lanes = False
         else:
-            target_x = lane_positions[self.lane]
+            target_x = road.get_lane_center(self.y, self.lane)
             self.x = target_x - self.width / 2
 
         # Move forward
@@ -102,17 +124,91 @@ class Roadblock(BaseObstacle):
         self.height = 40
         self.color = (255, 140, 0)  # Orange for roadblocks
 
+OBSTACLE_KINDS = (TrafficCar, Trash, Roadblock)
+
+class SpawnScheduler:
+    """Decides when obstacles spawn, driven by the menu settings and distance.
+
+    Single spawns follow a Poisson process whose rate grows with difficulty,
+    traffic density and distance traveled. Every WAVE_INTERVAL of distance a
+    wave fills all lanes but one.
+    """
+    def __init__(self, settings=None, num_lanes=NUM_LANES):
+        self.settings = settings if settings is not None else {}
+        self.num_lanes = num_lanes
+        self.reset()
+
+    def reset(self):
+        self.frames_until_spawn = None
+        self.next_wave_distance = None
+
+    def spawn_rate(self, distance):
+        # Expected spawns per frame
+        difficulty = self.settings.get("difficulty", 1)
+        density = self.settings.get("traffic_density", 1.0)
+        ramp = min(SPAWN_MAX_RAMP, 1 + distance / SPAWN_RAMP_DISTANCE)
+        return SPAWN_BASE_RATE * DIFFICULTY_SPAWN_SCALE[difficulty] * density * ramp
+
+    def wave_interval(self):
+        difficulty = self.settings.get("difficulty", 1)
+        return WAVE_INTERVAL / DIFFICULTY_SPAWN_SCALE[difficulty]
+
+    def update(self, distance):
+        """Advance one frame and return how many obstacles to spawn"""
+        rate = self.spawn_rate(distance)
+        if rate <= 0:
+            # No traffic: wait for the settings to change
+            self.frames_until_spawn = None
+            return 0
+
+        if self.frames_until_spawn is None:
+            self.frames_until_spawn = random.expovariate(rate)
+        if self.next_wave_distance is None:
+            self.next_wave_distance = distance + self.wave_interval()
+
+        count = 0
+        self.frames_until_spawn -= 1
+        while self.frames_until_spawn <= 0:
+            count += 1
+            self.frames_until_spawn += random.expovariate(rate)
+
+        if distance >= self.next_wave_distance:
+            self.next_wave_distance = distance + self.wave_interval()
+            count = max(count, self.num_lanes - 1)
+
+        return count
+
 class ObstacleManager:
-    def __init__(self):
+    def __init__(self, settings=None):
         self.obstacles = []
-        self.spawn_timer = 0
-        self.spawn_delay = 60
+        self.num_lanes = NUM_LANES
+        self.scheduler = SpawnScheduler(settings, self.num_lanes)
         self.obstacle_types = [
             (TrafficCar, 60),    # (type, weight)
             (Trash, 30),
             (Roadblock, 10)
         ]
         self.total_weight = sum(weight for _, weight in self.obstacle_types)
+        self.recorder = None  # Optional TraceRecorder
+        self.traffic_view = []  # What traffic cars decide against this tick, see update()
+        # lane_slack() as of the last full hold_back, less what traffic has
+        # driven since; -inf forces a full check after a spawn or restore
+        self.slack = -math.inf
+        self.fastest = 0  # Highest forward speed of this tick's traffic
+
+        # Observation buffers are allocated once and rewritten every tick,
+        # but only while observe is set: the game itself never reads them
+        self.observe = False
+        self.observation = np.zeros((OCCUPANCY_CHANNELS, self.num_lanes, OCCUPANCY_BINS), dtype=np.float32)
+        self.road_ahead = RoadAheadSampler(OCCUPANCY_BINS * OCCUPANCY_BIN_SIZE)
+        self._flat_observation = self.observation.reshape(-1)
+        self._cleared_observation = np.zeros_like(self.observation[:OCC_LANE_OFFSET])
+        self._cleared_observation[OCC_TTC] = 1
+        self._bin_steps = np.array([self.road_ahead.steps((b + 0.5) * OCCUPANCY_BIN_SIZE)
+                                    for b in range(OCCUPANCY_BINS)])
+        self._bin_centers = np.zeros(OCCUPANCY_BINS)
+        self._lane_shifts = np.array([[LANE_WIDTH * (lane + 0.5) - ROAD_WIDTH / 2]
+                                      for lane in range(self.num_lanes)])
 
     def _choose_obstacle_type(self):
         r = random.randint(0, self.total_weight - 1)
@@ -123,44 +219,263 @@ class ObstacleManager:
         return TrafficCar
 
     def update(self, road):
-        # Update and remove off-screen obstacles
-        for obstacle in self.obstacles[:]:
+        # Obstacles first, then the player car: the order AIDriver weighs them in
+        car = getattr(road.game, "car", None)
+        self.traffic_view = self.obstacles + [car] if car is not None else self.obstacles
+
+        self.update_traffic_speeds()
+
+        y_before = [obs.y for obs in self.obstacles]
+        was_changing = [getattr(obs, "is_changing_lanes", False) for obs in self.obstacles]
+        for obstacle in self.obstacles:
             if isinstance(obstacle, TrafficCar) and not hasattr(obstacle, 'game'):
                 obstacle.game = road.game  # Ensure traffic cars have game reference
             obstacle.update(road)
-            if obstacle.y > SCREEN_HEIGHT + 100:
-                self.obstacles.remove(obstacle)
+        self.hold_back(road, y_before, was_changing)
+        self.obstacles = [obs for obs in self.obstacles if obs.y <= SCREEN_HEIGHT + 100]
 
-        # Spawn new obstacles
-        self.spawn_timer += 1
-        if self.spawn_timer >= self.spawn_delay:
-            self.spawn_timer = 0
-            
-            lane = random.randint(0, 2)
-            obstacle_type = self._choose_obstacle_type()
-            
-            # Check spacing for traffic cars
-            if obstacle_type == TrafficCar:
-                for obs in self.obstacles:
-                    if isinstance(obs, TrafficCar) and abs(obs.y - (-50)) < CAR_HEIGHT * 2:
-                        return
-
-            # Spawn at the top of the screen
-            new_obstacle = obstacle_type(lane, -50)
+        # Road offset decreases as the road scrolls
+        count = self.scheduler.update(-road.offset)
+        if count:
+            self._spawn(count, road)
+        if self.recorder is not None:
+            self.recorder.record_obstacles(len(self.obstacles))
+
+        if self.observe and car is not None:
+            self.update_observation(road, car)
+
+    def update_traffic_speeds(self):
+        """Set every traffic car's speed from the car ahead of it, all at once"""
+        obstacles = self.obstacles
+        if not obstacles:
+            return
+        if len(obstacles) < IDM_VECTORIZE_MIN:
+            lane, target_lane, changing, y, height, speed, follows = [], [], [], [], [], [], []
+            for obs in obstacles:
+                lane.append(obs.lane)
+                y.append(obs.y)
+                height.append(obs.height)
+                speed.append(obs.speed)
+                if isinstance(obs, TrafficCar):
+                    target_lane.append(obs.target_lane)
+                    changing.append(obs.is_changing_lanes)
+                    follows.append(True)
+                else:
+                    target_lane.append(obs.lane)
+                    changing.append(False)
+                    follows.append(False)
+            speeds = car_following_speeds_list(lane, target_lane, changing, y, height, speed, follows)
+        else:
+            state = np.array([(obs.lane, getattr(obs, "target_lane", obs.lane),
+                               getattr(obs, "is_changing_lanes", False), obs.y, obs.height, obs.speed,
+                               isinstance(obs, TrafficCar))
+                              for obs in obstacles], dtype=FLOW_STATE_DTYPE)
+            speeds = car_following_speeds(state["lane"], state["target_lane"], state["changing"],
+                                          state["y"], state["height"], state["speed"],
+                                          state["follows"]).tolist()
+        for obs, speed in zip(obstacles, speeds):
+            obs.speed = speed
+        self.fastest = -min(speeds)
+
+    def hold_back(self, road, y_before, was_changing):
+        """Brake traffic and undo new lane changes that would leave no lane
+        open, see keep_a_lane_open"""
+        obstacles = self.obstacles
+        if not obstacles:
+            return
+        # Against the road only traffic moves, and no faster than self.fastest,
+        # so until that uses up the slack only a new lane change can close a row
+        self.slack -= self.fastest
+        if self.slack > 0 and not any(getattr(obs, "is_changing_lanes", False) and not before
+                                           for obs, before in zip(obstacles, was_changing)):
+            return
+        lane, target_lane, changing, started, y_after, height = [], [], [], [], [], []
+        for obs, before in zip(obstacles, was_changing):
+            lane.append(obs.lane)
+            y_after.append(obs.y)
+            height.append(obs.height)
+            if isinstance(obs, TrafficCar):
+                target_lane.append(obs.target_lane)
+                changing.append(obs.is_changing_lanes)
+                started.append(obs.is_changing_lanes and not before)
+            else:
+                target_lane.append(obs.lane)
+                changing.append(False)
+                started.append(False)
+        y, cancelled = keep_a_lane_open(lane, target_lane, changing, started, y_before, y_after, height)
+        # Cancelled lane changes still count as covering their target lane,
+        # which can only understate the slack
+        self.slack = lane_slack(lane, target_lane, changing, y, height, self.num_lanes)
+        for i in cancelled:
+            obs = obstacles[i]
+            obs.target_lane = obs.lane
+            obs.is_changing_lanes = False
+            obs.x = road.get_lane_center(y_before[i], obs.lane) - obs.width / 2
+        for obs, before, after in zip(obstacles, y_before, y):
+            if after != obs.y and isinstance(obs, TrafficCar):
+                obs.speed = after - before - SCROLL_SPEED
+                obs.y = after
+
+    def update_observation(self, road, car):
+        """Refresh self.observation, the lanes x distance bins view ahead of car.
+
+        Bin b covers gaps of [b, b + 1) * OCCUPANCY_BIN_SIZE between the
+        car's nose and an obstacle's rear; obstacles alongside the car fall
+        in bin 0. Traffic changing lanes occupies both lanes. The buffer is
+        reused, so copy it to keep a tick's view.
+        """
+        observation = self.observation
+        observation[:OCC_LANE_OFFSET] = self._cleared_observation
+        reach = OCCUPANCY_BINS * OCCUPANCY_BIN_SIZE
+        type_channels = {TrafficCar: OCC_TRAFFIC, Trash: OCC_TRASH, Roadblock: OCC_ROADBLOCK}
+        plane = self.num_lanes * OCCUPANCY_BINS
+
+        # Collect the cells in Python, then write them with one indexed
+        # assignment into the flattened buffer
+        hits = []  # Flat indices of type channel cells
+        cells = {}  # lane * OCCUPANCY_BINS + bin -> [closing speed, ttc]
+        for obs in self.obstacles:
+            gap = car.y - (obs.y + obs.height)
+            if not -CAR_HEIGHT < gap < reach:
+                continue
+            gap = max(gap, 0)
+            bin_index = int(gap // OCCUPANCY_BIN_SIZE)
+            closing = SCROLL_SPEED + obs.speed
+            ttc = min(1.0, gap / closing / OCCUPANCY_TTC_HORIZON) if closing > 0 else 1.0
+            channel = type_channels[type(obs)]
+            lanes = (obs.lane, obs.target_lane) if isinstance(obs, TrafficCar) and obs.is_changing_lanes else (obs.lane,)
+            for lane in lanes:
+                cell = lane * OCCUPANCY_BINS + bin_index
+                hits.append(channel * plane + cell)
+                speed_ttc = cells.setdefault(cell, [0.0, 1.0])
+                speed_ttc[0] = max(speed_ttc[0], closing / SCROLL_SPEED)
+                speed_ttc[1] = min(speed_ttc[1], ttc)
+        if hits:
+            indices = hits + [OCC_SPEED * plane + cell for cell in cells] + [OCC_TTC * plane + cell for cell in cells]
+            values = [1.0] * len(hits) + [speed for speed, _ in cells.values()] + [ttc for _, ttc in cells.values()]
+            self._flat_observation[indices] = values
+
+        # Road geometry at each bin's center, one new road sample per tick
+        self.road_ahead.update(road, car.y)
+        self.road_ahead.centers(self._bin_steps, out=self._bin_centers)
+        lane_offset = observation[OCC_LANE_OFFSET]
+        np.add(self._bin_centers, self._lane_shifts, out=lane_offset)
+        lane_offset -= car.x + CAR_WIDTH / 2
+        lane_offset /= ROAD_WIDTH
+
+    def _occupied_spawn_lanes(self):
+        # Lanes with an obstacle close enough to the spawn line to block it
+        occupied = set()
+        for obs in self.obstacles:
+            if obs.y < SPAWN_Y + SPAWN_CLEARANCE:
+                occupied.add(obs.lane)
+                if isinstance(obs, TrafficCar) and obs.is_changing_lanes:
+                    occupied.add(obs.target_lane)
+        return occupied
+
+    def _spawn(self, count, road):
+        occupied = self._occupied_spawn_lanes()
+        free_lanes = [lane for lane in range(self.num_lanes) if lane not in occupied]
+
+        # Always leave at least one lane open so the row stays passable
+        count = min(count, len(free_lanes), self.num_lanes - 1 - len(occupied))
+        intervals = None
+        for lane in random.sample(free_lanes, max(0, count)):
+            new_obstacle = self._choose_obstacle_type()(lane, SPAWN_Y)
+            # ...and don't close the last lane further down either
+            if intervals is None:
+                intervals = self._lane_intervals()
+            start, end = SPAWN_Y - CAR_HEIGHT, SPAWN_Y + new_obstacle.height
+            if closes_last_lane((lane,), start, end, intervals, self.num_lanes):
+                continue
+            intervals.append(((lane,), start, end))
             if isinstance(new_obstacle, TrafficCar):
                 new_obstacle.game = road.game  # Give traffic cars access to game state
             self.obstacles.append(new_obstacle)
+            self.slack = -math.inf
+
+    def _lane_intervals(self):
+        obstacles = self.obstacles
+        return lane_intervals(
+            [obs.lane for obs in obstacles], [getattr(obs, "target_lane", obs.lane) for obs in obstacles],
+            [getattr(obs, "is_changing_lanes", False) for obs in obstacles],
+            [obs.y for obs in obstacles], [obs.height for obs in obstacles])
+
+    def place(self, obstacle_type, lane, y, road):
+        """Add one obstacle of obstacle_type, outside the random spawn schedule.
+
+        Like a random spawn, it is left out if it would close the last open
+        lane; returns the obstacle, or None then.
+        """
+        if not 0 <= lane < self.num_lanes:
+            raise ValueError(f"lane {lane} out of range for {self.num_lanes} lanes")
+        obstacle = obstacle_type(lane, y)
+        if closes_last_lane((lane,), y - CAR_HEIGHT, y + obstacle.height, self._lane_intervals(), self.num_lanes):
+            return None
+        if isinstance(obstacle, TrafficCar):
+            obstacle.game = road.game
+        self.obstacles.append(obstacle)
+        self.slack = -math.inf
+        return obstacle
+
+    def snapshot(self, out=None):
+        """Obstacles and spawn schedule as a 0-d OBSTACLE_MANAGER_STATE_DTYPE array,
+        written into out if given"""
+        if len(self.obstacles) > SNAPSHOT_MAX_OBSTACLES:
+            raise ValueError(f"{len(self.obstacles)} obstacles don't fit in a snapshot "
+                             f"(SNAPSHOT_MAX_OBSTACLES is {SNAPSHOT_MAX_OBSTACLES})")
+        state = np.zeros((), OBSTACLE_MANAGER_STATE_DTYPE) if out is None else out
+        scheduler = self.scheduler
+        state["count"] = len(self.obstacles)
+        state["frames_until_spawn"] = np.nan if scheduler.frames_until_spawn is None else scheduler.frames_until_spawn
+        state["next_wave_distance"] = np.nan if scheduler.next_wave_distance is None else scheduler.next_wave_distance
+        if self.obstacles:
+            state["obstacles"][:len(self.obstacles)] = [
+                (OBSTACLE_KINDS.index(type(obs)), obs.lane, getattr(obs, "target_lane", obs.lane),
+                 getattr(obs, "is_changing_lanes", False), obs.x, obs.y, obs.width, obs.height,
+                 obs.speed, getattr(obs, "rotation", 0), obs.color,
+                 getattr(obs, "decision_cooldown", 0), getattr(obs, "decision_interval", 0),
+                 getattr(obs, "lane_change_cooldown", 0))
+                for obs in self.obstacles]
+        return state
+
+    def restore(self, state):
+        frames, wave = state["frames_until_spawn"].item(), state["next_wave_distance"].item()
+        self.scheduler.frames_until_spawn = None if frames != frames else frames
+        self.scheduler.next_wave_distance = None if wave != wave else wave
+
+        obstacles = []
+        for (kind, lane, target_lane, changing, x, y, width, height, speed, rotation, color,
+             decision_cooldown, decision_interval, lane_change_cooldown) in \
+                state["obstacles"][:int(state["count"])].tolist():
+            obstacle_type = OBSTACLE_KINDS[kind]
+            # Built without __init__, which would draw from the random generator
+            obstacle = obstacle_type.__new__(obstacle_type)
+            obstacle.__dict__.update(lane=lane, x=x, y=y, width=width, height=height,
+                                     speed=speed, color=tuple(color))
+            if obstacle_type is TrafficCar:
+                obstacle.__dict__.update(target_lane=target_lane, is_changing_lanes=changing,
+                                         decision_cooldown=decision_cooldown,
+                                         decision_interval=decision_interval,
+                                         lane_change_cooldown=lane_change_cooldown)
+            elif obstacle_type is Trash:
+                obstacle.rotation = rotation
+            obstacles.append(obstacle)
+        self.obstacles = obstacles
+        self.slack = -math.inf
+        # Road samples are cached against the road's offset; resample next update
+        self.road_ahead.road = None
 
     def get_all_cars(self):
         # Return traffic cars (excluding player car to avoid circular reference)
         return [obs for obs in self.obstacles if isinstance(obs, TrafficCar)]
 
     def check_collision(self, car):
-        for obstacle in self.obstacles:
-            if obstacle.collides_with_car(car):
-                return True
-        return False
+        collided = any(obstacle.collides_with_car(car) for obstacle in self.obstacles)
+        if self.recorder is not None:
+            self.recorder.record_collision(collided)
+        return collided
 
     def reset(self):
         self.obstacles.clear()
-        self.spawn_timer = 0 
\ No newline at end of file
+        self.scheduler.reset() 
\ No newline at end of file
@@ -1,9 +1,24 @@
 import math
 import random
+import numpy as np
 from config import *
 
+CURVE_TYPES = ("sine", "cosine", "linear")
+CURVE_STATE_DTYPE = np.dtype([
+    ("amplitude", np.float64), ("wavelength", np.float64), ("phase_offset", np.float64),
+    ("segment_length", np.float64), ("start_position", np.float64), ("curve_type", np.int8),
+])
+# Road.snapshot() record: the scroll position and the generated geometry
+ROAD_STATE_DTYPE = np.dtype([
+    ("offset", np.int64),
+    ("total_length", np.float64),
+    ("curves", CURVE_STATE_DTYPE, (ROAD_SEGMENTS,)),
+    ("noise_points", np.float64, (NUM_NOISE_POINTS, 2)),
+])
+
 class Road:
-    def __init__(self):
+    def __init__(self, rng=random):
+        self.rng = rng  # Any random.Random; the module generator by default
         self.offset = 0
         self.curves = []
         self.noise_points = []
@@ -16,7 +31,7 @@ class Road:
         
         for i in range(NUM_NOISE_POINTS):
             pos = i * distance_between_points
-            offset = random.uniform(-CURVE_AMPLITUDE * 0.7, CURVE_AMPLITUDE * 0.7)
+            offset = self.rng.uniform(-CURVE_AMPLITUDE * 0.7, CURVE_AMPLITUDE * 0.7)
             self.noise_points.append((pos, offset))
 
     def init_road_curves(self):
@@ -25,16 +40,16 @@ class Road:
         
         pos = 0
         for i in range(ROAD_SEGMENTS):
-            curve_direction = random.uniform(-1.0, 1.0)
+            curve_direction = self.rng.uniform(-1.0, 1.0)
             
-            if random.random() < 0.2:  # 20% chance of straight section
+            if self.rng.random() < 0.2:  # 20% chance of straight section
                 amplitude = 0
             else:
-                amplitude = random.uniform(CURVE_AMPLITUDE * 0.2, CURVE_AMPLITUDE * 0.8) * curve_direction
+                amplitude = self.rng.uniform(CURVE_AMPLITUDE * 0.2, CURVE_AMPLITUDE * 0.8) * curve_direction
             
-            wavelength = random.uniform(CURVE_WAVELENGTH * 0.8, CURVE_WAVELENGTH * 1.2)
-            phase_offset = random.uniform(0, 2 * math.pi)
-            segment_length = wavelength * random.uniform(0.7, 1.3)
+            wavelength = self.rng.uniform(CURVE_WAVELENGTH * 0.8, CURVE_WAVELENGTH * 1.2)
+            phase_offset = self.rng.uniform(0, 2 * math.pi)
+            segment_length = wavelength * self.rng.uniform(0.7, 1.3)
             
             self.curves.append({
                 "amplitude": amplitude,
@@ -42,14 +57,46 @@ class Road:
                 "phase_offset": phase_offset,
                 "segment_length": segment_length,
                 "start_position": pos,
-                "curve_type": random.choice(["sine", "cosine", "linear"])
+                "curve_type": self.rng.choice(CURVE_TYPES)
             })
             
             pos += segment_length
 
+        # Cached so per-frame lookups don't re-sum the segment lengths
+        self.total_length = pos
+
+    def load_curves(self, curves):
+        """Replace the generated curves with given ones, e.g. from a scenario.
+
+        Each curve is a dict with amplitude and wavelength, and optionally
+        segment_length (default one wavelength), phase_offset (default 0)
+        and curve_type (default "sine"). The road loops through them,
+        repeated to fill ROAD_SEGMENTS.
+        """
+        if not 0 < len(curves) <= ROAD_SEGMENTS:
+            raise ValueError(f"a road needs 1 to {ROAD_SEGMENTS} curves, got {len(curves)}")
+        self.curves = []
+        pos = 0
+        for i in range(ROAD_SEGMENTS):
+            curve = curves[i % len(curves)]
+            curve_type = curve.get("curve_type", "sine")
+            if curve_type not in CURVE_TYPES:
+                raise ValueError(f"unknown curve_type {curve_type!r}, expected one of {CURVE_TYPES}")
+            wavelength = float(curve["wavelength"])
+            segment_length = float(curve.get("segment_length", wavelength))
+            self.curves.append({
+                "amplitude": float(curve["amplitude"]),
+                "wavelength": wavelength,
+                "phase_offset": float(curve.get("phase_offset", 0)),
+                "segment_length": segment_length,
+                "start_position": pos,
+                "curve_type": curve_type,
+            })
+            pos += segment_length
+        self.total_length = pos
+
     def get_current_curve(self, pos):
-        total_length = sum(curve["segment_length"] for curve in self.curves)
-        normalized_pos = pos % total_length
+        normalized_pos = pos % self.total_length
         
         for curve in self.curves:
             if normalized_pos >= curve["start_position"] and \
@@ -58,70 +105,182 @@ class Road:
         
         return self.curves[0], 0
 
-    def interpolate_noise(self, pos):
-        prev_point = None
-        next_point = None
-        
+    def _noise_interval(self, pos):
+        """Noise points either side of pos, and the span of positions they cover.
+
+        Returns (prev_point, next_point, low, high); every position in
+        [low, high) interpolates between the same two points.
+        """
         for i, (noise_pos, offset) in enumerate(self.noise_points):
             if noise_pos > pos:
                 next_point = (noise_pos, offset)
                 if i > 0:
                     prev_point = self.noise_points[i-1]
-                else:
-                    prev_point = self.noise_points[-1]
-                    prev_point = (prev_point[0] - sum(curve["segment_length"] for curve in self.curves), prev_point[1])
-                break
-        
-        if next_point is None:
-            next_point = self.noise_points[0]
-            next_point = (next_point[0] + sum(curve["segment_length"] for curve in self.curves), next_point[1])
-            prev_point = self.noise_points[-1]
-        
+                    return prev_point, next_point, prev_point[0], noise_pos
+                prev_point = self.noise_points[-1]
+                prev_point = (prev_point[0] - self.total_length, prev_point[1])
+                return prev_point, next_point, -math.inf, noise_pos
+
+        next_point = self.noise_points[0]
+        next_point = (next_point[0] + self.total_length, next_point[1])
+        prev_point = self.noise_points[-1]
+        return prev_point, next_point, prev_point[0], math.inf
+
+    @staticmethod
+    def _lerp_noise(prev_point, next_point, pos):
         if next_point[0] == prev_point[0]:
             return next_point[1]
-        
+
         t = (pos - prev_point[0]) / (next_point[0] - prev_point[0])
         return prev_point[1] + t * (next_point[1] - prev_point[1])
 
+    def interpolate_noise(self, pos):
+        prev_point, next_point, _, _ = self._noise_interval(pos)
+        return self._lerp_noise(prev_point, next_point, pos)
+
+    @staticmethod
+    def _curve_offset(curve, segment_pos):
+        if curve["amplitude"] == 0:
+            return 0
+        if curve["curve_type"] == "sine":
+            return curve["amplitude"] * math.sin(
+                (segment_pos / curve["wavelength"] * 2 * math.pi) + curve["phase_offset"]
+            )
+        if curve["curve_type"] == "cosine":
+            return curve["amplitude"] * math.cos(
+                (segment_pos / curve["wavelength"] * 2 * math.pi) + curve["phase_offset"]
+            )
+        # Linear
+        x = ((segment_pos / curve["wavelength"]) % 1) * 4
+        if x < 1:
+            wave = x
+        elif x < 3:
+            wave = 2 - x
+        else:
+            wave = x - 4
+        return curve["amplitude"] * wave
+
     def get_road_center(self, y_pos):
         road_pos = y_pos + self.offset
         curve, segment_pos = self.get_current_curve(road_pos)
-        
-        if curve["amplitude"] == 0:
-            curve_offset = 0
-        else:
-            if curve["curve_type"] == "sine":
-                curve_offset = curve["amplitude"] * math.sin(
-                    (segment_pos / curve["wavelength"] * 2 * math.pi) + curve["phase_offset"]
-                )
-            elif curve["curve_type"] == "cosine":
-                curve_offset = curve["amplitude"] * math.cos(
-                    (segment_pos / curve["wavelength"] * 2 * math.pi) + curve["phase_offset"]
-                )
-            else:  # Linear
-                x = ((segment_pos / curve["wavelength"]) % 1) * 4
-                if x < 1:
-                    wave = x
-                elif x < 3:
-                    wave = 2 - x
-                else:
-                    wave = x - 4
-                curve_offset = curve["amplitude"] * wave
-        
         noise = self.interpolate_noise(road_pos) * 0.3
-        return BASE_ROAD_CENTER + curve_offset + noise
+        return BASE_ROAD_CENTER + self._curve_offset(curve, segment_pos) + noise
 
     def get_road_edges(self, y_pos):
         center = self.get_road_center(y_pos)
         return center - ROAD_WIDTH / 2, center + ROAD_WIDTH / 2
 
+    def get_road_edges_batch(self, y_positions):
+        """Return (left, right) edges for several y positions in one query.
+
+        The curve segment and noise interval found for one position are
+        reused for the next while it falls inside them, so close positions
+        (a car's corners, a chunk of scenery) cost one lookup of each.
+        Results are the same as get_road_edges.
+        """
+        half_width = ROAD_WIDTH / 2
+        total_length = self.total_length
+        curve = None
+        curve_start = curve_end = 0
+        noise_low = noise_high = 0
+        edges = []
+        for y_pos in y_positions:
+            road_pos = y_pos + self.offset
+            normalized_pos = road_pos % total_length
+            if not curve_start <= normalized_pos < curve_end:
+                curve, segment_pos = self.get_current_curve(road_pos)
+                curve_start = curve["start_position"]
+                curve_end = curve_start + curve["segment_length"]
+            if not noise_low <= road_pos < noise_high:
+                prev_point, next_point, noise_low, noise_high = self._noise_interval(road_pos)
+
+            if curve_start <= normalized_pos < curve_end:
+                segment_pos = normalized_pos - curve_start
+            # else: get_current_curve's no-match fallback, segment_pos from it
+            noise = self._lerp_noise(prev_point, next_point, road_pos) * 0.3
+            center = BASE_ROAD_CENTER + self._curve_offset(curve, segment_pos) + noise
+            edges.append((center - half_width, center + half_width))
+        return edges
+
     def get_lane_positions(self, y_pos):
+        """Lane centers from left to right"""
         left_edge, _ = self.get_road_edges(y_pos)
-        return [
-            left_edge + LANE_WIDTH / 2,      # Left lane center
-            left_edge + LANE_WIDTH * 1.5,    # Middle lane center
-            left_edge + LANE_WIDTH * 2.5,    # Right lane center
-        ]
+        return [left_edge + LANE_WIDTH * (lane + 0.5) for lane in range(NUM_LANES)]
+
+    def get_lane_center(self, y_pos, lane):
+        # One lane of get_lane_positions, without computing the others
+        return self.get_road_center(y_pos) - ROAD_WIDTH / 2 + LANE_WIDTH * (lane + 0.5)
 
     def scroll(self):
-        self.offset -= SCROLL_SPEED 
\ No newline at end of file
+        self.offset -= SCROLL_SPEED 
+
+    def snapshot(self, out=None, geometry=True):
+        """State as a 0-d ROAD_STATE_DTYPE array, written into out if given.
+
+        The geometry never changes after the road is generated, so when
+        out already holds this road's geometry, geometry=False copies only
+        the offset.
+        """
+        state = np.zeros((), ROAD_STATE_DTYPE) if out is None else out
+        state["offset"] = self.offset
+        if geometry:
+            state["total_length"] = self.total_length
+            state["curves"] = [(c["amplitude"], c["wavelength"], c["phase_offset"], c["segment_length"],
+                                c["start_position"], CURVE_TYPES.index(c["curve_type"]))
+                               for c in self.curves]
+            state["noise_points"] = self.noise_points
+        return state
+
+    def restore(self, state, geometry=True):
+        self.offset = int(state["offset"])
+        if geometry:
+            self.total_length = float(state["total_length"])
+            self.curves = [{
+                "amplitude": amplitude, "wavelength": wavelength, "phase_offset": phase_offset,
+                "segment_length": segment_length, "start_position": start_position,
+                "curve_type": CURVE_TYPES[curve_type],
+            } for amplitude, wavelength, phase_offset, segment_length, start_position, curve_type
+                in state["curves"].tolist()]
+            self.noise_points = [tuple(point) for point in state["noise_points"].tolist()]
+
+class RoadAheadSampler:
+    """Road centers at fixed steps ahead of a y position, kept up to date
+    incrementally.
+
+    Samples are SCROLL_SPEED apart, so after a normal scroll each sample
+    takes the value of the one ahead of it and only the farthest sample
+    is computed. Any other change (new road, pause, different y) refills
+    the whole ring.
+    """
+    def __init__(self, reach, step=SCROLL_SPEED):
+        self.step = step
+        self.samples = np.zeros(int(reach // step) + 1)  # Ring buffer, nearest first from head
+        self.head = 0
+        self.road = None
+        self.y = None
+        self.offset = None
+
+    def update(self, road, y):
+        count = len(self.samples)
+        moved = None if road is not self.road or y != self.y else self.offset - road.offset
+        if moved == self.step:
+            # Old nearest slot becomes the new farthest
+            self.samples[self.head] = road.get_road_center(y - (count - 1) * self.step)
+            self.head = (self.head + 1) % count
+        elif moved != 0:
+            for k in range(count):
+                self.samples[k] = road.get_road_center(y - k * self.step)
+            self.head = 0
+        self.road, self.y, self.offset = road, y, road.offset
+
+    def steps(self, distance):
+        """Samples from y to the given distance ahead of it"""
+        return min(round(distance / self.step), len(self.samples) - 1)
+
+    def center(self, distance):
+        """Road center the given distance ahead of y"""
+        return float(self.samples[(self.head + self.steps(distance)) % len(self.samples)])
+
+    def centers(self, steps, out=None):
+        """Road centers at an array of steps() ahead of y"""
+        return self.samples.take(steps + self.head, mode="wrap", out=out)
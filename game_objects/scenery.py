@@ -0,0 +1,60 @@
+import math
+import random
+from config import *
+
+class SceneryManager:
+    """Roadside trees, rocks and bushes generated in chunks along the road.
+
+    The road is split into chunks of SCENERY_CHUNK_HEIGHT in road position
+    (screen y + Road.offset). Each chunk's objects come from a generator
+    seeded by the chunk index, so a chunk is generated only when it comes
+    near the screen and is dropped once it has scrolled past the bottom.
+    Object 'y' values are road positions; subtract road.offset for screen y.
+    """
+    def __init__(self, seed=None):
+        # A private generator: scenery must not disturb the gameplay random stream
+        self.seed = seed if seed is not None else random.Random().getrandbits(32)
+        self.chunks = {}  # chunk index -> list of objects
+
+    @staticmethod
+    def chunk_range(offset):
+        """Indices of the chunks overlapping the screen, nearest the top first"""
+        first = math.floor((offset - SCENERY_TILE_PAD) / SCENERY_CHUNK_HEIGHT)
+        last = math.floor((offset + SCREEN_HEIGHT + SCENERY_TILE_PAD) / SCENERY_CHUNK_HEIGHT)
+        return range(first, last + 1)
+
+    def update(self, road):
+        visible = self.chunk_range(road.offset)
+        # One chunk ahead of the screen so it can be prepared before it shows
+        for index in range(visible.start - 1, visible.stop):
+            if index not in self.chunks:
+                self.chunks[index] = self._generate_chunk(index, road)
+        for index in [i for i in self.chunks if i >= visible.stop]:
+            del self.chunks[index]
+
+    def _generate_chunk(self, index, road):
+        rng = random.Random(f"{self.seed}:{index}")
+        start = index * SCENERY_CHUNK_HEIGHT
+        placements = []
+        for kind, count in (("tree", NUM_TREES), ("rock", NUM_ROCKS), ("bush", NUM_BUSHES)):
+            for _ in range(count):
+                # Road positions on a coarse grid so the edge lookups below batch well
+                pos = start + rng.randrange(0, SCENERY_CHUNK_HEIGHT, SCENERY_GRID)
+                placements.append((kind, pos, rng.random() < 0.5, rng.random()))
+
+        edges = road.get_road_edges_batch([pos - road.offset for _, pos, _, _ in placements])
+        objects = []
+        for (kind, pos, left_side, t), (left_edge, right_edge) in zip(placements, edges):
+            if left_side:
+                low, high = SCENERY_MARGIN, left_edge - SCENERY_MARGIN
+            else:
+                low, high = right_edge + SCENERY_MARGIN, SCREEN_WIDTH - SCENERY_MARGIN
+            if high > low:
+                objects.append({'type': kind, 'x': low + t * (high - low), 'y': pos})
+        # Draw order: farther objects first so nearer ones overlap them
+        objects.sort(key=lambda obj: obj['y'])
+        return objects
+
+    @property
+    def scenery_objects(self):
+        return [obj for index in sorted(self.chunks) for obj in self.chunks[index]]
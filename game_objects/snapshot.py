@@ -0,0 +1,65 @@
+"""Whole-world snapshots: road, car, obstacles and the random generator.
+
+A snapshot is a 0-d NumPy record, so it copies with .copy(), goes to a
+flat buffer with .tobytes() and comes back with
+np.frombuffer(buffer, WORLD_STATE_DTYPE).reshape(()). Restoring one and
+stepping on gives exactly the ticks that followed the snapshot, which is
+what rollouts, rewinds and replay seeking need.
+"""
+import array
+import random
+import numpy as np
+from .car import CAR_STATE_DTYPE
+from .road import ROAD_STATE_DTYPE
+from .obstacle import OBSTACLE_MANAGER_STATE_DTYPE
+
+# random.getstate() of a Mersenne Twister: 624 words plus the position
+RNG_STATE_DTYPE = np.dtype([
+    ("key", np.uint32, (625,)),
+    ("gauss_next", np.float64),  # NaN when no spare gauss() value is held
+])
+
+WORLD_STATE_DTYPE = np.dtype([
+    ("road", ROAD_STATE_DTYPE),
+    ("car", CAR_STATE_DTYPE),
+    ("obstacles", OBSTACLE_MANAGER_STATE_DTYPE),
+    ("rng", RNG_STATE_DTYPE),
+    ("distance", np.int64),
+    ("score", np.int64),
+    ("game_over", np.bool_),
+])
+
+def snapshot_rng(rng=random, out=None):
+    state = np.zeros((), RNG_STATE_DTYPE) if out is None else out
+    _, key, gauss_next = rng.getstate()
+    # array() converts the 625 ints in C, about twice as fast as NumPy from a tuple
+    state["key"] = np.frombuffer(array.array("I", key), np.uint32)
+    state["gauss_next"] = np.nan if gauss_next is None else gauss_next
+    return state
+
+def restore_rng(state, rng=random):
+    gauss_next = state["gauss_next"].item()
+    rng.setstate((3, tuple(state["key"].tolist()), None if gauss_next != gauss_next else gauss_next))
+
+def snapshot_world(world, out=None, rng=random):
+    """Snapshot of world (a Game or CarEnv: road, car, obstacles, distance,
+    score, game_over) and the generator the game objects draw from"""
+    state = np.zeros((), WORLD_STATE_DTYPE) if out is None else out
+    world.road.snapshot(state["road"])
+    world.car.snapshot(state["car"])
+    world.obstacles.snapshot(state["obstacles"])
+    snapshot_rng(rng, state["rng"])
+    state["distance"] = world.distance
+    state["score"] = world.score
+    state["game_over"] = world.game_over
+    return state
+
+def restore_world(world, state, rng=random):
+    """Put world back to a snapshot_world() state, in place"""
+    world.road.restore(state["road"])
+    world.car.restore(state["car"])
+    world.obstacles.restore(state["obstacles"])
+    restore_rng(state["rng"], rng)
+    world.distance = int(state["distance"])
+    world.score = int(state["score"])
+    world.game_over = bool(state["game_over"])
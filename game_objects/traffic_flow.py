@@ -0,0 +1,235 @@
+import bisect
+import math
+import numpy as np
+from config import *
+
+# Shared by both car-following paths below
+IDM_BRAKE_SCALE = 2 * math.sqrt(IDM_MAX_ACCEL * IDM_COMFORT_DECEL)
+
+def _ipow(x, n):
+    # x ** n by repeated multiplication. NumPy's vectorised pow and
+    # Python's float pow can round differently in the last bit, and the
+    # two car-following paths have to agree exactly.
+    result = x
+    for _ in range(n - 1):
+        result = result * x
+    return result
+
+def car_following_speeds(lane, target_lane, changing, y, height, speed, follows, group=None):
+    """New speeds after one tick of the Intelligent Driver Model.
+
+    Takes one entry per obstacle, as flat arrays. Speeds use the
+    obstacles' convention: added to SCROLL_SPEED each tick, so traffic
+    driving forward has a negative speed. Only entries where follows is
+    set accelerate. Everything else is a leader only and keeps speed 0;
+    traffic queues behind trash and roadblocks until AIDriver changes
+    lanes. A car changing lanes sits in both its lane and its target lane.
+    It brakes for the nearer leader of the two and is a leader in both.
+
+    Leaders are found by sorting the occupants of each lane by y, where
+    smaller y is further ahead. group keeps separate games apart; pass an
+    environment index per entry when several games share the arrays.
+    car_following_speeds_list gives the same results for one game's
+    worth of obstacles without the NumPy overhead.
+    """
+    count = len(y)
+    if group is None:
+        group = np.zeros(count, dtype=np.int64)
+    # One occupancy entry per lane used: every obstacle, then the second
+    # lane of each car changing lanes
+    entry = np.concatenate([np.arange(count), np.flatnonzero(changing)])
+    entry_lane = np.concatenate([lane, target_lane[changing]])
+    order = np.lexsort((y[entry], entry_lane, group[entry]))
+    entry, entry_lane = entry[order], entry_lane[order]
+
+    # Each entry's leader is the one sorted just before it in the same lane
+    follower, leader = entry[1:], entry[:-1]
+    same_lane = (entry_lane[1:] == entry_lane[:-1]) & (group[follower] == group[leader])
+    pairs = same_lane & follows[follower]
+    follower, leader = follower[pairs], leader[pairs]
+
+    velocity = -speed  # Forward speed relative to the road
+    v = velocity[follower]
+    gap = np.maximum(y[follower] - (y[leader] + height[leader]), 1.0)
+    closing = v - velocity[leader]
+    desired_gap = IDM_MIN_GAP + np.maximum(0.0, v * IDM_TIME_HEADWAY + v * closing / IDM_BRAKE_SCALE)
+    ratio = desired_gap / gap
+    braking = np.zeros(count)
+    np.maximum.at(braking, follower, IDM_MAX_ACCEL * (ratio * ratio))
+
+    accel = IDM_MAX_ACCEL * (1 - _ipow(velocity / TRAFFIC_SPEED, IDM_DELTA)) - braking
+    return np.where(follows, -np.maximum(velocity + accel, 0.0), 0.0)
+
+def car_following_speeds_list(lane, target_lane, changing, y, height, speed, follows):
+    """car_following_speeds for a single game, on plain lists.
+
+    Below a few dozen obstacles a Python scan for leaders is several times
+    faster than building arrays, and it rounds exactly as the NumPy version
+    does, so CarEnv and VectorCarEnv stay in step. Returns a list.
+    """
+    count = len(y)
+    # (lane, y, entry, obstacle) per lane occupied, entries numbered as in
+    # car_following_speeds so ties in y sort the same way np.lexsort does
+    occupancy = [(lane[i], y[i], i, i) for i in range(count)]
+    for i in range(count):
+        if changing[i]:
+            occupancy.append((target_lane[i], y[i], len(occupancy), i))
+    occupancy.sort()
+
+    braking = [0.0] * count
+    ahead_lane = leader = None
+    for entry_lane, _, _, follower in occupancy:
+        if entry_lane == ahead_lane and follows[follower]:
+            v = -speed[follower]
+            gap = max(y[follower] - (y[leader] + height[leader]), 1.0)
+            closing = v - -speed[leader]
+            desired_gap = IDM_MIN_GAP + max(0.0, v * IDM_TIME_HEADWAY + v * closing / IDM_BRAKE_SCALE)
+            ratio = desired_gap / gap
+            braking[follower] = max(braking[follower], IDM_MAX_ACCEL * (ratio * ratio))
+        ahead_lane, leader = entry_lane, follower
+
+    speeds = []
+    for i in range(count):
+        if not follows[i]:
+            speeds.append(0.0)
+            continue
+        velocity = -speed[i]
+        accel = IDM_MAX_ACCEL * (1 - _ipow(velocity / TRAFFIC_SPEED, IDM_DELTA)) - braking[i]
+        speeds.append(-max(velocity + accel, 0.0))
+    return speeds
+
+def lane_intervals(lane, target_lane, changing, y, height):
+    """The stretch of road each obstacle blocks, as (lanes, start, end).
+
+    A car parked at a y strictly between start and end would hit the
+    obstacle if it were in one of lanes. A car changing lanes blocks both.
+    """
+    return [((l, t) if c else (l,), top - CAR_HEIGHT, top + h)
+            for l, t, c, top, h in zip(lane, target_lane, changing, y, height)]
+
+def blocked_stretches(intervals, lanes):
+    """Maximal (start, end) stretches where every lane in lanes is blocked, in order"""
+    lanes = set(lanes)
+    if not lanes:
+        yield -math.inf, math.inf
+        return
+    events = []
+    for covers, start, end in intervals:
+        for l in covers:
+            if l in lanes:
+                events.append((start, 1, l))
+                events.append((end, -1, l))
+    # Intervals are open: one ending where another starts leaves no overlap,
+    # so at the same y ends (-1) sort before starts
+    events.sort()
+    counts = dict.fromkeys(lanes, 0)
+    full = len(lanes)
+    covered = 0
+    start = None
+    for y, delta, l in events:
+        count = counts[l]
+        counts[l] = count + delta
+        if delta > 0:
+            if not count:
+                covered += 1
+                if covered == full:
+                    start = y
+        elif count == 1:
+            if covered == full:
+                yield start, y
+            covered -= 1
+
+def closes_last_lane(lanes, start, end, intervals, num_lanes=NUM_LANES):
+    """Would blocking lanes from start to end leave no lane open anywhere?"""
+    others = [l for l in range(num_lanes) if l not in lanes]
+    return any(s < end and e > start for s, e in blocked_stretches(intervals, others))
+
+def lane_slack(lane, target_lane, changing, y, height, num_lanes=NUM_LANES):
+    """How far obstacles still have to close in before some row could be
+    blocked in every lane; negative once one may be.
+
+    A blocked row lies inside each lane's span from its first obstacle's
+    interval to its last one's, so this is the gap between the latest
+    first and the earliest last. Cheaper than blocked_stretches and
+    usually positive: the spans rarely all meet.
+    """
+    first, last = [math.inf] * num_lanes, [-math.inf] * num_lanes
+    for l, t, c, top, h in zip(lane, target_lane, changing, y, height):
+        if top - CAR_HEIGHT < first[l]:
+            first[l] = top - CAR_HEIGHT
+        if top + h > last[l]:
+            last[l] = top + h
+        if c:
+            first[t] = min(first[t], top - CAR_HEIGHT)
+            last[t] = max(last[t], top + h)
+    return max(first) - min(last)
+
+def keep_a_lane_open(lane, target_lane, changing, started, y_before, y_after, height,
+                     num_lanes=NUM_LANES):
+    """Hold back this tick's moves and new lane changes that would block every lane.
+
+    Takes one entry per obstacle, as sequences: lanes and heights after
+    the tick's updates, started for lane changes begun this tick, and y
+    before and after the obstacles moved.
+    Returns the y every obstacle may keep and the indices of lane changes
+    to cancel.
+
+    Traffic drives at different speeds and changes lanes, so gaps can
+    close anywhere on screen, not just at the spawn line. Against the
+    road, trash and roadblocks stand still and traffic drives forward,
+    up the screen. Obstacles are settled from the top of the screen down,
+    starting from where the road alone would have carried them: each one
+    starts a lane change only if a lane stays open alongside it, then
+    drives forward as far as it can without closing the last open lane
+    ahead of it. Only traffic ever drives, so only traffic is held back:
+    it brakes behind the row it would have closed, never below a standstill.
+    Spawns keep the lane open for everything else.
+    """
+    count = len(y_after)
+    if not any(started) and all(before + SCROLL_SPEED == after
+                                for before, after in zip(y_before, y_after)):
+        return list(y_after), []  # Nothing moved against the road
+    if lane_slack(lane, target_lane, changing, y_after, height, num_lanes) >= 0:
+        return list(y_after), []
+    intervals = lane_intervals(lane, target_lane, changing, y_after, height)
+    if next(blocked_stretches(intervals, range(num_lanes)), None) is None:
+        return list(y_after), []
+    lanes = [covers for covers, _, _ in intervals]
+
+    # Until settled, an obstacle is where the road carried it, without a
+    # new lane change
+    y = [before + SCROLL_SPEED for before in y_before]
+    current = [(l,) if s else covers for l, s, covers in zip(lane, started, lanes)]
+    by_y = sorted(range(count), key=y.__getitem__)
+    sorted_y = [y[i] for i in by_y]
+    reach = max(rest - after for rest, after in zip(y, y_after)) + CAR_HEIGHT
+    tallest = max(height)
+    cancelled = []
+    for i in by_y:
+        if not started[i] and y_after[i] == y[i]:
+            continue  # Stands still against the road, as trash and roadblocks do
+        start, end = y[i] - CAR_HEIGHT, y[i] + height[i]
+        new_start = y_after[i] - CAR_HEIGHT
+        # Everything that can overlap [new_start, end] once it has moved
+        nearby = by_y[bisect.bisect_right(sorted_y, new_start - tallest):
+                      bisect.bisect_left(sorted_y, end + reach)]
+        others = [(current[j], y[j] - CAR_HEIGHT, y[j] + height[j]) for j in nearby if j != i]
+
+        covers = lanes[i]
+        if started[i] and closes_last_lane(covers, start, end, others, num_lanes):
+            covers = current[i]
+            cancelled.append(i)
+        if new_start < start:
+            closed = [l for l in range(num_lanes) if l not in covers]
+            for _, e in blocked_stretches(others, closed):
+                if e > start:
+                    break
+                new_start = max(new_start, e)
+        if new_start == y_after[i] - CAR_HEIGHT:
+            y[i] = y_after[i]
+        else:
+            y[i] = new_start + CAR_HEIGHT
+            while y[i] - CAR_HEIGHT < new_start:  # Don't round back into the stretch
+                y[i] = math.nextafter(y[i], math.inf)
+        current[i] = covers
+    return y, cancelled
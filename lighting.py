@@ -0,0 +1,92 @@
+import math
+import pygame
+from config import *
+
+class LightMap:
+    """Night lighting built from cached light sprites.
+
+    Each light is a pre-rendered sprite (a pair of headlight cones plus a
+    halo around the car) rotated once per LIGHT_ANGLE_STEP and cached.
+    Per frame the light map is filled with the ambient color, every light
+    is added to it in a single blits() call, and the canvas is multiplied
+    by the result. No per-pixel work happens in Python, so the cost grows
+    only with the blits, not with how the lights overlap.
+    """
+    def __init__(self, target):
+        self.target = target
+        self.surface = pygame.Surface(target.surface.get_size())
+        self.base_sprite = target.scale_sprite(self._create_headlight_sprite())
+        # Car center relative to the unrotated sprite's center, in canvas pixels
+        self.anchor_offset = target.length(LIGHT_CONE_LENGTH + CAR_HEIGHT / 2) - self.base_sprite.get_height() / 2
+        self.sprites = {}
+
+    def _create_headlight_sprite(self):
+        # Car points up; its front edge sits at y = LIGHT_CONE_LENGTH
+        length = LIGHT_CONE_LENGTH
+        halo = CAR_HEIGHT * 0.75
+        spread = length * math.tan(math.radians(LIGHT_CONE_SPREAD))
+        lamp_x = CAR_WIDTH / 3
+        width = int(2 * (lamp_x + spread)) + 2
+        height = int(length + CAR_HEIGHT / 2 + halo) + 2
+        center_x = width / 2
+        center_y = length + CAR_HEIGHT / 2
+
+        sprite = pygame.Surface((width, height))
+        sprite.fill(BLACK)
+        layer = pygame.Surface((width, height))
+        steps = LIGHT_CONE_STEPS
+        step_color = [c // steps for c in HEADLIGHT_COLOR]
+
+        # Nested cones, shorter and narrower each step, so light falls off
+        # with distance and towards the edges
+        for i in range(steps):
+            reach = length * (1 - i / steps)
+            narrow = spread * (1 - i / (steps * 2)) * (reach / length)
+            layer.fill(BLACK)
+            for side in (-1, 1):
+                lamp = (center_x + side * lamp_x, length)
+                pygame.draw.polygon(layer, step_color, [
+                    lamp,
+                    (lamp[0] - narrow, length - reach),
+                    (lamp[0] + narrow, length - reach),
+                ])
+            sprite.blit(layer, (0, 0), special_flags=pygame.BLEND_ADD)
+
+        # Soft halo so the cars themselves stay visible
+        for i in range(steps):
+            layer.fill(BLACK)
+            pygame.draw.circle(layer, [c // (steps * 2) for c in HEADLIGHT_COLOR],
+                               (center_x, center_y), halo * (1 - i / steps))
+            sprite.blit(layer, (0, 0), special_flags=pygame.BLEND_ADD)
+        return sprite
+
+    def sprite(self, angle):
+        """Rotated light sprite for angle, quantized to LIGHT_ANGLE_STEP"""
+        bucket = round(angle / LIGHT_ANGLE_STEP) * LIGHT_ANGLE_STEP
+        sprite = self.sprites.get(bucket)
+        if sprite is None:
+            # Corners uncovered by the rotation are filled with the (black) top-left pixel
+            sprite = pygame.transform.rotate(self.base_sprite, bucket)
+            self.sprites[bucket] = sprite
+        return bucket, sprite
+
+    def placements(self, lights):
+        """(bucket, sprite, topleft) on the canvas for each (center, angle) light"""
+        placements = []
+        for center, angle in lights:
+            bucket, sprite = self.sprite(angle)
+            # Rotate the sprite-center-to-car-center offset the same way the sprite was
+            rad = math.radians(bucket)
+            dy = self.anchor_offset
+            x, y = self.target.point(center)
+            sprite_center_x = x - dy * math.sin(rad)
+            sprite_center_y = y - dy * math.cos(rad)
+            placements.append((bucket, sprite, (sprite_center_x - sprite.get_width() / 2,
+                                                sprite_center_y - sprite.get_height() / 2)))
+        return placements
+
+    def apply(self, canvas, lights):
+        self.surface.fill(NIGHT_AMBIENT)
+        self.surface.blits([(sprite, topleft, None, pygame.BLEND_ADD)
+                            for _, sprite, topleft in self.placements(lights)], False)
+        canvas.blit(self.surface, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
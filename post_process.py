@@ -0,0 +1,163 @@
+import sys
+import time
+import numpy as np
+import pygame
+from config import *
+
+def _frame_view(surface):
+    """Writable (height, width, 4) byte view of a 32-bit surface's pixels.
+
+    This is the memory surfarray.pixels3d exposes, without copying, but
+    kept in storage order: pixels3d indexes (x, y) with the channel axis
+    running backwards through memory, which makes every NumPy pass over
+    it several times slower.
+    """
+    width, height = surface.get_size()
+    return pygame.surfarray.pixels2d(surface).T.view(np.uint8).reshape(height, width, 4)
+
+def _byte_index(shift):
+    return shift // 8 if sys.byteorder == "little" else 3 - shift // 8
+
+class PostProcessor:
+    """NumPy post-processing applied in place to the frame's pixels.
+
+    Effects run in a fixed order (bloom, chromatic aberration, vignette) and
+    each one can be switched off. Every effect keeps a running estimate of
+    its cost. An effect that would push the frame past budget_ms for
+    POST_DROP_FRAMES frames in a row is dropped, and comes back only after
+    it has fit within POST_RESTORE_HEADROOM of the budget for
+    POST_RESTORE_FRAMES frames in a row, so effects don't flicker on and
+    off around the budget.
+    """
+    def __init__(self, surface, budget_ms=POST_PROCESS_BUDGET_MS):
+        self.budget_ms = budget_ms
+        self.enabled = {
+            "bloom": POST_BLOOM,
+            "chromatic_aberration": POST_CHROMATIC_ABERRATION,
+            "vignette": POST_VIGNETTE,
+        }
+        self.cost_ms = {name: 0.0 for name in self.enabled}
+        self.skipped = {name: 0 for name in self.enabled}
+        self.dropped = {name: False for name in self.enabled}
+        self.streak = {name: 0 for name in self.enabled}  # Frames in a row towards dropping or restoring
+
+        red, green, blue, _ = surface.get_shifts()
+        self.red = _byte_index(red)
+        self.blue = _byte_index(blue)
+        self.colors = [self.red, _byte_index(green), self.blue]
+        self.spare = ({0, 1, 2, 3} - set(self.colors)).pop()  # Alpha or padding byte
+
+        # Scratch buffers are allocated once; the frame itself is never copied
+        width, height = surface.get_size()
+        d = BLOOM_DOWNSAMPLE
+        self.wide = np.empty((height, width, 4), dtype=np.uint16)
+        self.bloom = np.empty((-(-height // d), -(-width // d), 4), dtype=np.uint16)
+        self.bloom_tmp = np.empty_like(self.bloom)
+        self.bloom_u8 = np.empty(self.bloom.shape, dtype=np.uint8)
+        # Full-resolution glow, padded up to a whole number of d x d blocks
+        small_h, small_w = self.bloom.shape[:2]
+        self.bloom_up = np.empty((small_h * d, small_w * d, 4), dtype=np.uint8)
+        self.headroom = np.empty((height, width, 4), dtype=np.uint8)
+        self.vignette = self._create_vignette(width, height)
+
+    def _create_vignette(self, width, height):
+        # Per-pixel brightness factor in 1/256ths, 256 in the middle
+        xs = (np.arange(width) - width / 2) / (width / 2)
+        ys = (np.arange(height) - height / 2) / (height / 2)
+        distance = np.sqrt(ys[:, None] ** 2 + xs[None, :] ** 2) / np.sqrt(2)
+        factor = 1 - VIGNETTE_STRENGTH * distance ** 2
+        vignette = np.empty((height, width, 4), dtype=np.uint16)
+        vignette[...] = (factor * 256)[:, :, None]
+        vignette[:, :, self.spare] = 256  # Leave alpha untouched
+        return vignette
+
+    def set_enabled(self, name, enabled):
+        self.enabled[name] = enabled
+        self.dropped[name] = False
+        self.streak[name] = 0
+
+    def apply(self, surface):
+        start = time.perf_counter()
+        frame = _frame_view(surface)
+        try:
+            for name, effect in (("bloom", self._bloom),
+                                 ("chromatic_aberration", self._chromatic_aberration),
+                                 ("vignette", self._vignette)):
+                if not self.enabled[name]:
+                    continue
+                effect_start = time.perf_counter()
+                projected_ms = (effect_start - start) * 1000 + self.cost_ms[name]
+                if self.dropped[name]:
+                    fits = projected_ms <= self.budget_ms * POST_RESTORE_HEADROOM
+                    self.streak[name] = self.streak[name] + 1 if fits else 0
+                    if self.streak[name] < POST_RESTORE_FRAMES:
+                        self.skipped[name] += 1
+                        continue
+                    self.dropped[name] = False
+                    self.streak[name] = 0
+                elif projected_ms > self.budget_ms:
+                    self.streak[name] += 1
+                    if self.streak[name] >= POST_DROP_FRAMES:
+                        self.dropped[name] = True
+                        self.streak[name] = 0
+                        self.skipped[name] += 1
+                        continue
+                else:
+                    self.streak[name] = 0
+                effect(frame)
+                cost = (time.perf_counter() - effect_start) * 1000
+                self.cost_ms[name] = cost if not self.cost_ms[name] else self.cost_ms[name] * 0.8 + cost * 0.2
+        finally:
+            # Releases the surface lock
+            del frame
+
+    def _chromatic_aberration(self, frame):
+        # Red shifts left, blue shifts right
+        k = CHROMATIC_SHIFT
+        frame[:, :-k, self.red] = frame[:, k:, self.red]
+        frame[:, k:, self.blue] = frame[:, :-k, self.blue]
+
+    def _bloom(self, frame):
+        d = BLOOM_DOWNSAMPLE
+        r = BLOOM_RADIUS
+        bloom, tmp = self.bloom, self.bloom_tmp
+
+        # Keep only the bright (neon) pixels of a downsampled copy
+        small = frame[::d, ::d]
+        bloom[...] = small
+        bright = small[:, :, self.colors].max(axis=2) >= BLOOM_THRESHOLD
+        bloom *= bright[:, :, None]
+        bloom[:, :, self.spare] = 0
+
+        # Separable box blur: columns, then rows
+        tmp[...] = bloom
+        for offset in range(1, r + 1):
+            tmp[offset:] += bloom[:-offset]
+            tmp[:-offset] += bloom[offset:]
+        bloom[...] = tmp
+        for offset in range(1, r + 1):
+            bloom[:, offset:] += tmp[:, :-offset]
+            bloom[:, :-offset] += tmp[:, offset:]
+        bloom //= int((2 * r + 1) ** 2 / BLOOM_STRENGTH)
+        glow = self.bloom_u8
+        glow[...] = bloom
+
+        # Nearest-neighbour upsample, one 32-bit pixel at a time
+        small_h, small_w = glow.shape[:2]
+        up = self.bloom_up
+        up.view(np.uint32).reshape(small_h, d, small_w, d)[...] = \
+            glow.view(np.uint32).reshape(small_h, 1, small_w, 1)
+
+        # Saturating add in uint8: min(frame, 255 - glow) + glow
+        height, width = frame.shape[:2]
+        up = up[:height, :width]
+        headroom = self.headroom
+        np.subtract(255, up, out=headroom)
+        np.minimum(frame, headroom, out=frame)
+        frame += up
+
+    def _vignette(self, frame):
+        wide = self.wide
+        np.multiply(frame, self.vignette, out=wide)
+        wide >>= 8
+        frame[...] = wide
@@ -0,0 +1,60 @@
+from collections import deque
+from config import *
+
+class QualityController:
+    """Steps through QUALITY_TIERS to keep the rolling frame time in budget.
+
+    Downgrades happen when the average over QUALITY_WINDOW frames exceeds
+    the budget; upgrades need the average well under it. After any change
+    the window restarts and QUALITY_COOLDOWN frames must pass, so a tier
+    that sits near the budget doesn't flap back and forth.
+    """
+    def __init__(self, targets, budget_ms=FRAME_BUDGET_MS, tiers=QUALITY_TIERS):
+        self.targets = targets
+        self.budget_ms = budget_ms
+        self.tiers = tiers
+        self.tier_index = 0
+        self.frame_times = deque(maxlen=QUALITY_WINDOW)
+        self.cooldown = 0
+        self.adaptive = True  # Benchmarks turn this off to hold a fixed tier
+        self._apply()
+
+    @property
+    def tier(self):
+        return self.tiers[self.tier_index]
+
+    def _apply(self):
+        for target in self.targets:
+            target.apply_quality(self.tier)
+
+    def record(self, frame_ms):
+        """Feed one frame's work time; returns True if the tier changed"""
+        if not self.adaptive:
+            return False
+        self.frame_times.append(frame_ms)
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return False
+        if len(self.frame_times) < self.frame_times.maxlen:
+            return False
+
+        average = sum(self.frame_times) / len(self.frame_times)
+        if average > self.budget_ms * QUALITY_DOWNGRADE_RATIO:
+            step = 1
+        elif average < self.budget_ms * QUALITY_UPGRADE_RATIO:
+            step = -1
+        else:
+            return False
+
+        new_index = min(max(self.tier_index + step, 0), len(self.tiers) - 1)
+        if new_index == self.tier_index:
+            return False
+
+        old_name = self.tier["name"]
+        self.tier_index = new_index
+        self._apply()
+        self.frame_times.clear()
+        self.cooldown = QUALITY_COOLDOWN
+        print(f"Quality: {old_name} -> {self.tier['name']} "
+              f"(avg frame {average:.1f} ms, budget {self.budget_ms:.1f} ms)")
+        return True
@@ -0,0 +1,53 @@
+import pygame
+from config import *
+
+class RenderTarget:
+    """Offscreen canvas at a fraction of the window resolution.
+
+    World drawing uses screen coordinates and goes through the helpers
+    below to land on the smaller canvas; present() upscales the canvas to
+    the window in a single blit. At scale 1.0 the canvas is the window
+    itself and present() does nothing.
+    """
+    def __init__(self, screen, scale=1.0):
+        self.screen = screen
+        self.scale = scale
+        if scale == 1.0:
+            self.surface = screen
+        else:
+            size = (round(SCREEN_WIDTH * scale), round(SCREEN_HEIGHT * scale))
+            self.surface = pygame.Surface(size, 0, screen)
+
+    @property
+    def is_native(self):
+        return self.surface is self.screen
+
+    def point(self, point):
+        return (point[0] * self.scale, point[1] * self.scale)
+
+    def points(self, points):
+        s = self.scale
+        return [(x * s, y * s) for x, y in points]
+
+    def rect(self, rect):
+        s = self.scale
+        return [rect[0] * s, rect[1] * s, rect[2] * s, rect[3] * s]
+
+    def length(self, value):
+        """Scaled line width or radius, never below one pixel"""
+        return max(1, round(value * self.scale))
+
+    def scale_sprite(self, sprite):
+        if self.scale == 1.0:
+            return sprite
+        width, height = sprite.get_size()
+        return pygame.transform.smoothscale(
+            sprite, (self.length(width), self.length(height)))
+
+    def present(self):
+        if self.is_native:
+            return
+        if RENDER_SMOOTH_UPSCALE:
+            pygame.transform.smoothscale(self.surface, self.screen.get_size(), self.screen)
+        else:
+            pygame.transform.scale(self.surface, self.screen.get_size(), self.screen)
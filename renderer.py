@@ -1,37 +1,75 @@
+import math
 import pygame
 from config import *
 from game_objects.obstacle import TrafficCar, Trash, Roadblock
-from effects import DigitalRain, CyberGrid, DataParticles
-import random
+from effects import BackgroundEffects, visual_random
+from assets import get_font
+from post_process import PostProcessor
+from lighting import LightMap
 
 class GameRenderer:
-    def __init__(self, screen):
+    def __init__(self, screen, effects=None, settings=None):
         self.screen = screen
-        self.digital_rain = DigitalRain(screen)
-        self.cyber_grid = CyberGrid(screen)
-        self.particles = DataParticles(screen)
+        self.effects = effects if effects is not None else BackgroundEffects(screen)
+        self.settings = settings if settings is not None else {}
+        self.light_map = None  # Built the first time night mode is on
+        self.scenery_tiles = {}  # chunk index -> [tile, objects drawn so far]
+        # World layers draw onto the effects' canvas; the HUD stays on the screen
+        self.target = self.effects.target
+        self.canvas = self.target.surface
         self.scanline_surface = self._create_scanlines()
-        self.debug_font = pygame.font.SysFont('arial', 30)
+        self.debug_font = get_font('arial', 30)
         self.glow_shader = self._create_glow_shader()
+        self.post_processor = None  # Built the first time the software path post-processes
+        self.glow_layers = GLOW_INTENSITY
+        self.antialias = True
+        self.post_process = True
+        # Car sprites are built once and only rotated per frame
+        self.car_sprite = self.target.scale_sprite(self._create_cyber_car_sprite())
+        self._create_car_glow_sprites()
+        self.traffic_sprite = self._create_traffic_sprite()
+        self.dash_sprite = self.target.scale_sprite(self._create_dash_sprite())
+        self.dash_sprites = {}
+        self.road_draw_calls = 0  # Draw calls issued for the road last frame
+
+    def apply_quality(self, tier):
+        self.antialias = tier["antialias"]
+        self.post_process = tier["post_process"]
+        if tier["glow_layers"] != self.glow_layers:
+            self.glow_layers = tier["glow_layers"]
+            self._create_car_glow_sprites()
+            self.traffic_sprite = self._create_traffic_sprite()
+
+    def _create_car_glow_sprites(self):
+        self.car_glow_sprites = {
+            False: self.target.scale_sprite(self._create_car_glow_sprite(NEON_BLUE)),
+            True: self.target.scale_sprite(self._create_car_glow_sprite(CYBER_PINK)),
+        }
+
+    def reset(self):
+        """Clear per-game state; surfaces and fonts are kept for the session"""
+        self.effects.reset()
+        self.scenery_tiles.clear()
 
     def _create_scanlines(self):
-        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        for y in range(0, SCREEN_HEIGHT, SCAN_LINE_SPACING):
+        width, height = self.canvas.get_size()
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        for y in range(0, height, max(2, self.target.length(SCAN_LINE_SPACING))):
             pygame.draw.line(surface, (0, 0, 0, SCAN_LINE_ALPHA), 
-                           (0, y), (SCREEN_WIDTH, y))
+                           (0, y), (width, y))
         return surface
 
     def _create_glow_shader(self):
-        shader = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        shader = pygame.Surface(self.canvas.get_size(), pygame.SRCALPHA)
         shader.fill((0, 20, 0, 10))
         return shader
 
-    def render_game(self, road, car, obstacles):
+    def render_game(self, road, car, obstacles, scenery=None):
         # Draw background effects
-        self.screen.fill(DARK_MATRIX)
-        self.digital_rain.update_and_draw()
-        self.cyber_grid.draw()
-        self.particles.update_and_draw()
+        self.effects.draw()
+
+        if scenery is not None:
+            self._render_cyber_scenery(scenery, road)
         
         # Draw road with cyber effect
         self._render_cyber_road(road)
@@ -41,29 +79,57 @@ class GameRenderer:
         
         # Draw car with energy field
         self._render_cyber_car(car, road)
+
+        if self.settings.get("night_mode"):
+            self._apply_lighting(car, obstacles)
+        
+        # Apply post-processing effects
+        if self.post_process:
+            self._apply_post_processing()
+
+        # Upscale the canvas to the window, then draw the HUD at native resolution
+        self.target.present()
         
         # Draw AI status indicator
         self._render_ai_status(car)
-        
-        # Apply post-processing effects
-        self._apply_post_processing()
 
-    def _render_cyber_road(self, road):
+    def _light_sources(self, car, obstacles):
+        """(center, angle) of every car with headlights"""
+        lights = [((car.x + CAR_WIDTH / 2, car.y + CAR_HEIGHT / 2), car.angle)]
+        for obstacle in obstacles.obstacles:
+            if isinstance(obstacle, TrafficCar):
+                lights.append(((obstacle.x + obstacle.width / 2, obstacle.y + obstacle.height / 2), 0))
+        return lights
+
+    def _get_light_map(self):
+        if self.light_map is None:
+            self.light_map = LightMap(self.target)
+        return self.light_map
+
+    def _get_post_processor(self):
+        if self.post_processor is None:
+            self.post_processor = PostProcessor(self.canvas)
+        return self.post_processor
+
+    def _apply_lighting(self, car, obstacles):
+        self._get_light_map().apply(self.canvas, self._light_sources(car, obstacles))
+
+    def _road_points(self, road):
+        """Edge and lane divider polylines in screen coordinates"""
         # Create smooth road using more points for smoother curves
         segment_height = SCREEN_HEIGHT // (ROAD_DETAIL * 2)
         
-        # Create points for the road edges
+        # Create points for the road edges and the NUM_LANES - 1 lane dividers
         left_points = []
         right_points = []
-        lane1_points = []
-        lane2_points = []
+        divider_points = [[] for _ in range(NUM_LANES - 1)]
         
         # Generate points along the road
         for i in range(ROAD_DETAIL * 2 + 1):
             y = i * segment_height
             left_edge, right_edge = road.get_road_edges(y)
-            lane1 = left_edge + LANE_WIDTH
-            lane2 = left_edge + LANE_WIDTH * 2
+            for lane, points in enumerate(divider_points, 1):
+                points.append((left_edge + LANE_WIDTH * lane, y))
             
             if i > 0:
                 prev_left = left_points[-1][0]
@@ -73,54 +139,137 @@ class GameRenderer:
             
             left_points.append((left_edge, y))
             right_points.append((right_edge, y))
-            lane1_points.append((lane1, y))
-            lane2_points.append((lane2, y))
+
+        return left_points, right_points, divider_points
+
+    def _render_cyber_road(self, road):
+        left_points, right_points, divider_points = self._road_points(road)
         
         # Draw cyber road
+        left_points = self.target.points(left_points)
+        right_points = self.target.points(right_points)
         road_polygon = left_points + right_points[::-1]
-        pygame.draw.polygon(self.screen, DARK_MATRIX, road_polygon)
-        
-        # Draw data stream effects along edges
-        for i in range(len(left_points) - 1):
-            # Left edge data stream
-            pygame.draw.line(self.screen, NEON_BLUE, left_points[i], left_points[i + 1], 3)
-            # Right edge data stream
-            pygame.draw.line(self.screen, NEON_BLUE, right_points[i], right_points[i + 1], 3)
+        pygame.draw.polygon(self.canvas, DARK_MATRIX, road_polygon)
+        
+        # Draw data stream effects along edges, one polyline per edge
+        edge_width = self.target.length(3)
+        pygame.draw.lines(self.canvas, NEON_BLUE, False, left_points, edge_width)
+        pygame.draw.lines(self.canvas, NEON_BLUE, False, right_points, edge_width)
+        self.road_draw_calls = 3
+        if self.antialias:
+            # Smooth the outer side of the edges
+            pygame.draw.aalines(self.canvas, NEON_BLUE, False, [(x - 1, y) for x, y in left_points])
+            pygame.draw.aalines(self.canvas, NEON_BLUE, False, [(x + 1, y) for x, y in right_points])
+            self.road_draw_calls += 2
         
         # Draw lane markings with cyber effect
-        self._draw_cyber_lane_markings(lane1_points, road.offset)
-        self._draw_cyber_lane_markings(lane2_points, road.offset)
+        self._draw_cyber_lane_markings(divider_points, road.offset)
+        self.road_draw_calls += 1
 
-    def _draw_cyber_lane_markings(self, points, road_offset):
-        dash_length = 40
-        gap_length = 30
-        full_cycle = dash_length + gap_length
+    def _create_dash_sprite(self):
+        # Neon core with a faint glow on either side, pointing down the lane
+        sprite = pygame.Surface((6, LANE_DASH_LENGTH), pygame.SRCALPHA)
+        sprite.fill((*NEON_GREEN, 50))
+        sprite.fill(NEON_GREEN, (1, 0, 4, LANE_DASH_LENGTH))
+        return sprite
+
+    def _dash_sprite(self, angle):
+        """Rotated dash sprite for angle, quantized to LANE_DASH_ANGLE_STEP"""
+        bucket = round(angle / LANE_DASH_ANGLE_STEP) * LANE_DASH_ANGLE_STEP
+        sprite = self.dash_sprites.get(bucket)
+        if sprite is None:
+            sprite = pygame.transform.rotate(self.dash_sprite, bucket)
+            self.dash_sprites[bucket] = sprite
+        return sprite
+
+    def _dash_placements(self, points, road_offset):
+        """(center, angle) of each lane dash along a lane polyline, in screen coordinates"""
+        full_cycle = LANE_DASH_LENGTH + LANE_DASH_GAP
         start_offset = -(road_offset / 6) % full_cycle
-        
-        for i in range(len(points) - 1):
-            line_pos = i * SCREEN_HEIGHT / (ROAD_DETAIL * 2)
-            pos_in_cycle = (line_pos + start_offset) % full_cycle
-            if pos_in_cycle < dash_length:
-                # Draw neon line
-                pygame.draw.line(self.screen, NEON_GREEN, points[i], points[i + 1], 2)
-                # Add glow effect
-                pygame.draw.line(self.screen, (*NEON_GREEN, 50), points[i], points[i + 1], 4)
-
-    def _render_cyber_scenery(self, scenery):
-        # Draw cyber trees and rocks
-        for obj in scenery.scenery_objects:
-            if obj['type'] == 'tree':
-                self._draw_cyber_tree(obj)
-            elif obj['type'] == 'rock':
-                self._draw_cyber_rock(obj)
-            elif obj['type'] == 'bush':
-                self._draw_cyber_bush(obj)
-
-    def _draw_cyber_tree(self, tree):
-        x, y = tree['x'], tree['y']
+        segment_height = points[1][1] - points[0][1]
+        last = len(points) - 2
+
+        def x_at(y):
+            # Linear along the polyline; the end segments extend past the screen
+            i = min(max(int(y // segment_height), 0), last)
+            (x_a, y_a), (x_b, _) = points[i], points[i + 1]
+            return x_a + (x_b - x_a) * (y - y_a) / segment_height
+
+        placements = []
+        y = -start_offset
+        while y < points[-1][1]:
+            top, bottom = x_at(y), x_at(y + LANE_DASH_LENGTH)
+            # Positive angles lean the dash's top to the left, as transform.rotate does
+            angle = math.degrees(math.atan2(bottom - top, LANE_DASH_LENGTH))
+            placements.append((((top + bottom) / 2, y + LANE_DASH_LENGTH / 2), angle))
+            y += full_cycle
+        return placements
+
+    def _draw_cyber_lane_markings(self, lanes, road_offset):
+        # Every dash of every lane in one blits() call
+        blits = []
+        for points in lanes:
+            for center, angle in self._dash_placements(points, road_offset):
+                sprite = self._dash_sprite(angle)
+                x, y = self.target.point(center)
+                blits.append((sprite, (x - sprite.get_width() / 2, y - sprite.get_height() / 2)))
+        self.canvas.blits(blits, False)
+
+    def _scenery_tiles(self, scenery, road):
+        """(tile, screen y) for the scenery chunks on screen.
+
+        Each chunk is rasterized once into a colorkeyed tile. The chunk
+        just above the screen is drawn a few objects per frame so it is
+        ready when it scrolls in; tiles of evicted chunks are dropped.
+        """
+        visible = scenery.chunk_range(road.offset)
+        tiles = []
+        for index in visible:
+            tile = self._scenery_tile(scenery, index, finish=True)
+            if tile is not None:
+                tiles.append((index, tile, index * SCENERY_CHUNK_HEIGHT - SCENERY_TILE_PAD - road.offset))
+        self._scenery_tile(scenery, visible.start - 1, finish=False)
+        for index in [i for i in self.scenery_tiles if i not in scenery.chunks]:
+            del self.scenery_tiles[index]
+        return tiles
+
+    def _scenery_tile(self, scenery, index, finish):
+        objects = scenery.chunks.get(index)
+        if objects is None:
+            return None
+        entry = self.scenery_tiles.get(index)
+        if entry is None:
+            size = (self.target.length(SCREEN_WIDTH),
+                    self.target.length(SCENERY_CHUNK_HEIGHT + 2 * SCENERY_TILE_PAD))
+            tile = pygame.Surface(size)
+            tile.fill(SCENERY_KEY_COLOR)
+            tile.set_colorkey(SCENERY_KEY_COLOR)
+            entry = self.scenery_tiles[index] = [tile, 0]
+
+        tile, drawn = entry
+        if drawn < len(objects):
+            # Finish before showing; otherwise spread the work over the
+            # frames the chunk takes to reach the screen
+            frames = SCENERY_CHUNK_HEIGHT // SCROLL_SPEED
+            end = len(objects) if finish else min(len(objects), drawn + len(objects) // frames + 1)
+            origin = index * SCENERY_CHUNK_HEIGHT - SCENERY_TILE_PAD
+            draw = {'tree': self._draw_cyber_tree, 'rock': self._draw_cyber_rock,
+                    'bush': self._draw_cyber_bush}
+            for obj in objects[drawn:end]:
+                draw[obj['type']](tile, obj['x'], obj['y'] - origin)
+            entry[1] = end
+            if end == len(objects):
+                tile.set_colorkey(SCENERY_KEY_COLOR, pygame.RLEACCEL)
+        return tile
+
+    def _render_cyber_scenery(self, scenery, road):
+        for _, tile, y in self._scenery_tiles(scenery, road):
+            self.canvas.blit(tile, self.target.point((0, y)))
+
+    def _draw_cyber_tree(self, surface, x, y):
         # Draw digital tree trunk
-        pygame.draw.rect(self.screen, GRID_COLOR, 
-                        [x - 10, y - 40, 20, 40])
+        pygame.draw.rect(surface, GRID_COLOR, 
+                        self.target.rect([x - 10, y - 40, 20, 40]))
         
         # Draw digital foliage
         points = [
@@ -128,7 +277,7 @@ class GameRenderer:
             (x - 30, y - 40),
             (x + 30, y - 40)
         ]
-        pygame.draw.polygon(self.screen, NEON_GREEN, points)
+        pygame.draw.polygon(surface, NEON_GREEN, self.target.points(points))
         # Add glow effect
         for i in range(2):
             glow_points = [
@@ -136,40 +285,43 @@ class GameRenderer:
                 (x - 32 + i, y - 40),
                 (x + 32 - i, y - 40)
             ]
-            pygame.draw.polygon(self.screen, (*NEON_GREEN, 50), glow_points)
+            pygame.draw.polygon(surface, (*NEON_GREEN, 50), self.target.points(glow_points))
 
-    def _draw_cyber_rock(self, rock):
-        x, y = rock['x'], rock['y']
-        points = [
+    def _draw_cyber_rock(self, surface, x, y):
+        points = self.target.points([
             (x, y - 20),
             (x - 20, y),
             (x, y + 20),
             (x + 20, y)
-        ]
+        ])
         # Draw digital rock with wireframe effect
-        pygame.draw.polygon(self.screen, GRID_COLOR, points)
-        pygame.draw.lines(self.screen, NEON_BLUE, True, points, 2)
+        pygame.draw.polygon(surface, GRID_COLOR, points)
+        pygame.draw.lines(surface, NEON_BLUE, True, points, self.target.length(2))
 
-    def _draw_cyber_bush(self, bush):
-        x, y = bush['x'], bush['y']
+    def _draw_cyber_bush(self, surface, x, y):
         radius = 15
+        scaled = self.target.length(radius)
+        center = self.target.point((x, y))
         # Draw digital bush
-        pygame.draw.circle(self.screen, NEON_GREEN, (int(x), int(y)), radius)
+        pygame.draw.circle(surface, NEON_GREEN, center, scaled)
         # Add circuit pattern
-        pygame.draw.circle(self.screen, GRID_COLOR, (int(x), int(y)), radius, 2)
-        pygame.draw.line(self.screen, GRID_COLOR, (x - radius, y), (x + radius, y), 2)
-        pygame.draw.line(self.screen, GRID_COLOR, (x, y - radius), (x, y + radius), 2)
+        pygame.draw.circle(surface, GRID_COLOR, center, scaled, self.target.length(2))
+        pygame.draw.line(surface, GRID_COLOR, *self.target.points([(x - radius, y), (x + radius, y)]),
+                         self.target.length(2))
+        pygame.draw.line(surface, GRID_COLOR, *self.target.points([(x, y - radius), (x, y + radius)]),
+                         self.target.length(2))
 
-    def _render_cyber_car(self, car, road):
-        # Create energy field around car
+    def _create_car_glow_sprite(self, color):
+        # Energy field around the car
         glow_surface = pygame.Surface((CAR_WIDTH + 20, CAR_HEIGHT + 20), pygame.SRCALPHA)
-        for i in range(GLOW_INTENSITY):
+        for i in range(self.glow_layers):
             alpha = 100 - i * 20
-            color = NEON_BLUE if not car.is_off_road(road) else CYBER_PINK
             pygame.draw.rect(glow_surface, (*color, alpha),
                             (i, i, CAR_WIDTH + 20 - i*2, CAR_HEIGHT + 20 - i*2),
                             border_radius=10)
-        
+        return glow_surface
+
+    def _create_cyber_car_sprite(self):
         # Draw car base
         car_surface = pygame.Surface((CAR_WIDTH, CAR_HEIGHT), pygame.SRCALPHA)
         pygame.draw.rect(car_surface, NEON_GREEN, 
@@ -187,17 +339,20 @@ class GameRenderer:
         pygame.draw.rect(car_surface, NEON_BLUE,
                         (window_x, CAR_HEIGHT * 0.2, window_width, CAR_HEIGHT * 0.3),
                         border_radius=3)
-        
+        return car_surface
+
+    def _render_cyber_car(self, car, road):
         # Rotate car
-        rotated_glow = pygame.transform.rotate(glow_surface, car.angle)
-        rotated_car = pygame.transform.rotate(car_surface, car.angle)
+        rotated_glow = pygame.transform.rotate(self.car_glow_sprites[car.off_road], car.angle)
+        rotated_car = pygame.transform.rotate(self.car_sprite, car.angle)
         
         # Position and draw
-        glow_rect = rotated_glow.get_rect(center=(car.x + CAR_WIDTH//2, car.y + CAR_HEIGHT//2))
-        car_rect = rotated_car.get_rect(center=(car.x + CAR_WIDTH//2, car.y + CAR_HEIGHT//2))
+        center = self.target.point((car.x + CAR_WIDTH//2, car.y + CAR_HEIGHT//2))
+        glow_rect = rotated_glow.get_rect(center=center)
+        car_rect = rotated_car.get_rect(center=center)
         
-        self.screen.blit(rotated_glow, glow_rect.topleft)
-        self.screen.blit(rotated_car, car_rect.topleft)
+        self.canvas.blit(rotated_glow, glow_rect.topleft)
+        self.canvas.blit(rotated_car, car_rect.topleft)
 
     def _render_cyber_obstacles(self, obstacles):
         for obstacle in obstacles.obstacles:
@@ -210,62 +365,32 @@ class GameRenderer:
 
     def _apply_post_processing(self):
         # Apply scanlines
-        self.screen.blit(self.scanline_surface, (0, 0))
+        self.canvas.blit(self.scanline_surface, (0, 0))
         
         # Apply subtle color shift
-        self.screen.blit(self.glow_shader, (0, 0))
+        self.canvas.blit(self.glow_shader, (0, 0))
         
-        # Add chromatic aberration effect
-        ...
-
-    def _render_scenery(self, scenery):
-        scenery.draw(self.screen)
+        # Bloom, chromatic aberration and vignette
+        self._get_post_processor().apply(self.canvas)
 
     def _render_road(self, road):
-        # Create smooth road using more points for smoother curves
-        segment_height = SCREEN_HEIGHT // (ROAD_DETAIL * 2)  # Doubled detail for smoothness
-        
-        # Create points for the road edges
-        left_points = []
-        right_points = []
-        lane1_points = []
-        lane2_points = []
-        
-        # Generate points along the road with bezier curve smoothing
-        for i in range(ROAD_DETAIL * 2 + 1):
-            y = i * segment_height
-            left_edge, right_edge = road.get_road_edges(y)
-            center = (left_edge + right_edge) / 2
-            lane1 = left_edge + LANE_WIDTH
-            lane2 = left_edge + LANE_WIDTH * 2
-            
-            # Add points with slight horizontal interpolation for smoothness
-            if i > 0:
-                prev_left = left_points[-1][0]
-                prev_right = right_points[-1][0]
-                left_edge = prev_left + (left_edge - prev_left) * 0.7
-                right_edge = prev_right + (right_edge - prev_right) * 0.7
-            
-            left_points.append((left_edge, y))
-            right_points.append((right_edge, y))
-            lane1_points.append((lane1, y))
-            lane2_points.append((lane2, y))
+        left_points, right_points, divider_points = self._road_points(road)
         
         # Draw road background with anti-aliasing
         road_polygon = left_points + right_points[::-1]
         pygame.draw.polygon(self.screen, GRAY, road_polygon)
         
         # Draw lane markings
-        self._draw_lane_markings(lane1_points, road.offset)
-        self._draw_lane_markings(lane2_points, road.offset)
+        for points in divider_points:
+            self._draw_lane_markings(points, road.offset)
         
-        # Draw road edges with anti-aliasing
-        pygame.draw.aalines(self.screen, WHITE, False, left_points, 4)
-        pygame.draw.aalines(self.screen, WHITE, False, right_points, 4)
+        # Draw road edges; aalines has no width, so use lines
+        pygame.draw.lines(self.screen, WHITE, False, left_points, 4)
+        pygame.draw.lines(self.screen, WHITE, False, right_points, 4)
 
     def _draw_lane_markings(self, points, road_offset, is_dashed=True):
         if not is_dashed:
-            pygame.draw.aalines(self.screen, WHITE, False, points, 4)
+            pygame.draw.lines(self.screen, WHITE, False, points, 4)
             return
         
         # Longer dashes, shorter gaps for a more realistic look
@@ -287,14 +412,12 @@ class GameRenderer:
             line_pos = i * SCREEN_HEIGHT / (ROAD_DETAIL * 2)
             pos_in_cycle = (line_pos + start_offset) % full_cycle
             if pos_in_cycle < dash_length:
-                # Draw thicker anti-aliased line
-                pygame.draw.aaline(self.screen, stripe_color, 
-                                 points[i], points[i + 1], line_width)
-                
-                # Add a slight glow effect
+                # aaline has no width; draw the glow, then the stripe over it
                 glow_color = (255, 255, 255, 50)  # Very transparent white
-                pygame.draw.aaline(self.screen, glow_color,
+                pygame.draw.line(self.screen, glow_color,
                                  points[i], points[i + 1], line_width + 2)
+                pygame.draw.line(self.screen, stripe_color,
+                                 points[i], points[i + 1], line_width)
 
     def _render_obstacles(self, obstacles):
         for obstacle in obstacles.obstacles:
@@ -336,7 +459,7 @@ class GameRenderer:
     def _render_car(self, car, road):
         # Create a car surface with the correct color
         temp_car_surface = car.surface.copy()
-        if car.is_off_road(road):
+        if car.off_road:
             red_overlay = pygame.Surface((CAR_WIDTH, CAR_HEIGHT), pygame.SRCALPHA)
             red_overlay.fill((255, 0, 0, 100))  # Semi-transparent red
             temp_car_surface.blit(red_overlay, (0, 0))
@@ -351,7 +474,7 @@ class GameRenderer:
     def _render_debug_info(self, car, road):
         # Car position and lane info
         text = self.debug_font.render(
-            f"Car position: ({car.x:.1f}, {car.y:.1f}) | Lane: {car.lane} | Off road: {car.is_off_road(road)}",
+            f"Car position: ({car.x:.1f}, {car.y:.1f}) | Lane: {car.lane} | Off road: {car.off_road}",
             True, WHITE)
         self.screen.blit(text, (10, 10))
         
@@ -362,72 +485,91 @@ class GameRenderer:
             True, WHITE)
         self.screen.blit(boundaries_text, (10, 40))
 
-    def _render_cyber_traffic(self, obstacle):
+    def _create_traffic_sprite(self):
+        # Drawn at canvas resolution and opaque with a colorkey, so a blit
+        # gives the same pixels as drawing the rects onto the canvas
+        target = self.target
+        pad = max(self.glow_layers - 1, 0)
+        sprite = pygame.Surface((target.length(CAR_WIDTH + pad * 2), target.length(CAR_HEIGHT + pad * 2)))
+        sprite.fill(SPRITE_COLORKEY)
+        sprite.set_colorkey(SPRITE_COLORKEY)
+        x, y = pad, pad
+
         # Draw base with glow
-        for i in range(GLOW_INTENSITY):
+        for i in range(self.glow_layers):
             alpha = 100 - i * 20
-            pygame.draw.rect(self.screen, (*NEON_BLUE, alpha),
-                            [obstacle.x - i, obstacle.y - i, 
-                             obstacle.width + i*2, obstacle.height + i*2],
-                            border_radius=5)
+            pygame.draw.rect(sprite, (*NEON_BLUE, alpha),
+                            target.rect([x - i, y - i, CAR_WIDTH + i*2, CAR_HEIGHT + i*2]),
+                            border_radius=target.length(5))
         
         # Draw main body
-        pygame.draw.rect(self.screen, MATRIX_GREEN,
-                        [obstacle.x, obstacle.y, obstacle.width, obstacle.height],
-                        border_radius=5)
+        pygame.draw.rect(sprite, MATRIX_GREEN,
+                        target.rect([x, y, CAR_WIDTH, CAR_HEIGHT]),
+                        border_radius=target.length(5))
         
         # Add circuit pattern
-        pygame.draw.line(self.screen, GRID_COLOR,
-                        (obstacle.x + obstacle.width/2, obstacle.y),
-                        (obstacle.x + obstacle.width/2, obstacle.y + obstacle.height), 2)
+        pygame.draw.line(sprite, GRID_COLOR,
+                        target.point((x + CAR_WIDTH/2, y)),
+                        target.point((x + CAR_WIDTH/2, y + CAR_HEIGHT)),
+                        target.length(2))
         
         # Add data stream window
-        window_width = obstacle.width * 0.6
-        window_x = obstacle.x + (obstacle.width - window_width) / 2
-        pygame.draw.rect(self.screen, NEON_BLUE,
-                        [window_x, obstacle.y + obstacle.height * 0.2,
-                         window_width, obstacle.height * 0.3],
-                        border_radius=3)
+        window_width = CAR_WIDTH * 0.6
+        window_x = x + (CAR_WIDTH - window_width) / 2
+        pygame.draw.rect(sprite, NEON_BLUE,
+                        target.rect([window_x, y + CAR_HEIGHT * 0.2,
+                                     window_width, CAR_HEIGHT * 0.3]),
+                        border_radius=target.length(3))
+        return sprite, pad
+
+    def _render_cyber_traffic(self, obstacle):
+        sprite, pad = self.traffic_sprite
+        self.canvas.blit(sprite, self.target.point((obstacle.x - pad, obstacle.y - pad)))
 
     def _render_data_barrier(self, obstacle):
+        target = self.target
         # Draw base
-        pygame.draw.rect(self.screen, CYBER_PINK,
-                        [obstacle.x, obstacle.y, obstacle.width, obstacle.height])
+        pygame.draw.rect(self.canvas, CYBER_PINK,
+                        target.rect([obstacle.x, obstacle.y, obstacle.width, obstacle.height]))
         
         # Add warning stripes
         for i in range(0, int(obstacle.width), 20):
-            pygame.draw.line(self.screen, NEON_BLUE,
-                            (obstacle.x + i, obstacle.y),
-                            (obstacle.x + i + 10, obstacle.y + obstacle.height),
-                            5)
+            pygame.draw.line(self.canvas, NEON_BLUE,
+                            target.point((obstacle.x + i, obstacle.y)),
+                            target.point((obstacle.x + i + 10, obstacle.y + obstacle.height)),
+                            target.length(5))
         
         # Add glowing outline
-        pygame.draw.rect(self.screen, (*CYBER_PINK, 100),
-                        [obstacle.x - 2, obstacle.y - 2,
-                         obstacle.width + 4, obstacle.height + 4], 2)
+        pygame.draw.rect(self.canvas, (*CYBER_PINK, 100),
+                        target.rect([obstacle.x - 2, obstacle.y - 2,
+                                     obstacle.width + 4, obstacle.height + 4]),
+                        target.length(2))
 
     def _render_corrupt_data(self, obstacle):
-        # Create glitch effect surface
-        surface = pygame.Surface((obstacle.width, obstacle.height), pygame.SRCALPHA)
+        # Create glitch effect surface at canvas resolution
+        width = self.target.length(obstacle.width)
+        height = self.target.length(obstacle.height)
+        shift = self.target.length(2)
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
         
         # Draw glitch polygons
         glitch_points = [
-            (0, obstacle.height/2),
-            (obstacle.width/2, 0),
-            (obstacle.width, obstacle.height/2),
-            (obstacle.width/2, obstacle.height)
+            (0, height/2),
+            (width/2, 0),
+            (width, height/2),
+            (width/2, height)
         ]
         
         # Draw multiple layers with different colors for glitch effect
         pygame.draw.polygon(surface, (*CYBER_PINK, 150), glitch_points)
         pygame.draw.polygon(surface, (*NEON_BLUE, 100), 
-                           [(p[0]+2, p[1]-2) for p in glitch_points])
+                           [(p[0]+shift, p[1]-shift) for p in glitch_points])
         pygame.draw.polygon(surface, (*NEON_GREEN, 50), 
-                           [(p[0]-2, p[1]+2) for p in glitch_points])
+                           [(p[0]-shift, p[1]+shift) for p in glitch_points])
         
         # Rotate and draw
         rotated = pygame.transform.rotate(surface, obstacle.rotation)
-        self.screen.blit(rotated, (obstacle.x, obstacle.y))
+        self.canvas.blit(rotated, self.target.point((obstacle.x, obstacle.y)))
 
     def _render_ai_status(self, car):
         # Position in top-right corner
@@ -437,7 +579,7 @@ class GameRenderer:
         height = 40
         
         # Create background with glow effect
-        for i in range(GLOW_INTENSITY):
+        for i in range(self.glow_layers):
             alpha = 100 - i * 20
             color = NEON_GREEN if car.ai_mode else CYBER_PINK
             pygame.draw.rect(self.screen, (*color, alpha),
@@ -465,7 +607,7 @@ class GameRenderer:
         
         # Draw text with glitch effect if AI is on
         if car.ai_mode:
-            glitch_offset = random.randint(-1, 1)
+            glitch_offset = visual_random.randint(-1, 1)
             glitch_surface = self.debug_font.render(text, True, NEON_BLUE)
             self.screen.blit(glitch_surface, 
                             (text_rect.x + glitch_offset, text_rect.y))
@@ -0,0 +1,36 @@
+import random
+import time
+
+from config import *
+from car_game.env import CarEnv, STAY
+from game_objects.obstacle import OCC_ROADBLOCK, Roadblock
+
+def test_occupancy_is_opt_in():
+    env = CarEnv()
+    env.reset(seed=0)
+    assert "occupancy" not in env.step(STAY)[3]
+    assert not env.obstacles.observe
+
+def test_occupancy_shows_an_obstacle_ahead():
+    env = CarEnv({"traffic_density": 0}, observe=True)
+    env.reset(seed=0)
+    gap = 2.5 * OCCUPANCY_BIN_SIZE
+    env.obstacles.place(Roadblock, env.car.lane, env.car.y - gap - Roadblock(0, 0).height - SCROLL_SPEED, env.road)
+    occupancy = env.step(STAY)[3]["occupancy"]
+    assert occupancy[OCC_ROADBLOCK, env.car.lane, 2] == 1
+    assert occupancy[OCC_ROADBLOCK].sum() == 1
+
+MIN_TICKS_PER_SECOND = 10_000
+
+def test_steps_fast_enough():
+    env = CarEnv()
+    env.reset(seed=0)
+    rng = random.Random(0)
+    best = 0
+    for _ in range(5):  # Best of several runs, CPU time only, to ride out noise
+        start = time.process_time()
+        for _ in range(2000):
+            if env.step(rng.randrange(env.num_actions))[2]:
+                env.reset()
+        best = max(best, 2000 / (time.process_time() - start))
+    assert best >= MIN_TICKS_PER_SECOND, f"{best:.0f} ticks/s"
@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from car_game.main import Game
+
+@pytest.fixture
+def game(monkeypatch, tmp_path):
+    monkeypatch.setattr("car_game.main.LEADERBOARD_PATH", str(tmp_path / "leaderboard.db"))
+    random.seed(0)
+    game = Game(backend="software")
+    game.state = "playing"
+    yield game
+    game.effects.shutdown()
+    game.io.shutdown()
+    game.leaderboard.close()
+
+def test_pause_freezes_the_world(game):
+    game.car.ai_mode = True
+    for _ in range(300):
+        game.update()
+    assert game.obstacles.obstacles and not game.game_over
+    game.auto_scroll = False
+    frozen = [(obs.x, obs.y) for obs in game.obstacles.obstacles], game.distance, game.car.x
+    for _ in range(60):
+        game.update()
+    assert ([(obs.x, obs.y) for obs in game.obstacles.obstacles], game.distance, game.car.x) == frozen
+
+def test_a_paused_game_goes_idle(game):
+    game.auto_scroll = False
+    game.last_input = 0
+    game._check_idle()
+    assert game.idle
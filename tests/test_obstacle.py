@@ -0,0 +1,64 @@
+import random
+import types
+
+import pytest
+
+from config import *
+from game_objects.car import Car
+from game_objects.obstacle import ObstacleManager, Roadblock, TrafficCar
+from game_objects.road import Road
+from game_objects.traffic_flow import blocked_stretches, lane_intervals
+
+SETTINGS = [(1, 1.0), (2, 2.0)]
+
+def run(seed, difficulty, density, ticks):
+    """Yield (road, manager) after every tick of a seeded run"""
+    random.seed(seed)
+    road, car = Road(), Car()
+    manager = ObstacleManager({"difficulty": difficulty, "traffic_density": density})
+    road.game = car.game = types.SimpleNamespace(car=car, obstacles=manager)
+    for _ in range(ticks):
+        road.scroll()
+        manager.update(road)
+        yield road, manager
+
+@pytest.mark.parametrize("difficulty, density", SETTINGS)
+@pytest.mark.parametrize("seed", range(6))
+def test_a_lane_stays_open_everywhere(seed, difficulty, density):
+    for tick, (road, manager) in enumerate(run(seed, difficulty, density, 3000)):
+        obstacles = manager.obstacles
+        intervals = lane_intervals(
+            [obs.lane for obs in obstacles], [getattr(obs, "target_lane", obs.lane) for obs in obstacles],
+            [getattr(obs, "is_changing_lanes", False) for obs in obstacles],
+            [obs.y for obs in obstacles], [obs.height for obs in obstacles])
+        blocked = list(blocked_stretches(intervals, range(NUM_LANES)))
+        assert not blocked, f"every lane blocked at {blocked} on tick {tick}"
+
+@pytest.mark.parametrize("difficulty, density", SETTINGS)
+@pytest.mark.parametrize("seed", range(3))
+def test_a_car_parked_at_the_player_fits_in_some_lane(seed, difficulty, density):
+    probe = Car()
+    for tick, (road, manager) in enumerate(run(seed, difficulty, density, 3000)):
+        def fits(lane):
+            probe.x = road.get_lane_center(probe.y + CAR_HEIGHT / 2, lane) - CAR_WIDTH / 2
+            return not any(obs.collides_with_car(probe) for obs in manager.obstacles)
+        assert any(fits(lane) for lane in range(NUM_LANES)), f"no lane open on tick {tick}"
+
+@pytest.mark.parametrize("difficulty, density", SETTINGS)
+@pytest.mark.parametrize("seed", range(3))
+def test_only_traffic_is_held_back(seed, difficulty, density):
+    for tick, (road, manager) in enumerate(run(seed, difficulty, density, 3000)):
+        for obs in manager.obstacles:
+            if isinstance(obs, TrafficCar):
+                assert obs.speed <= 0, f"traffic reversing on tick {tick}"
+            else:
+                assert obs.speed == 0, f"{type(obs).__name__} sliding on tick {tick}"
+
+def test_place_leaves_a_lane_open():
+    road = Road()
+    manager = ObstacleManager()
+    road.game = types.SimpleNamespace(car=None, obstacles=manager)
+    for lane in range(NUM_LANES - 1):
+        assert manager.place(Roadblock, lane, 100, road) is not None
+    assert manager.place(TrafficCar, NUM_LANES - 1, 100 + CAR_HEIGHT, road) is None
+    assert manager.place(TrafficCar, NUM_LANES - 1, 100 + 2 * CAR_HEIGHT + 40, road) is not None
@@ -0,0 +1,35 @@
+import pygame
+
+from config import *
+from post_process import PostProcessor
+
+def counting_processor(budget_ms):
+    surface = pygame.Surface((64, 48), 0, 32)
+    post = PostProcessor(surface, budget_ms)
+    post.surface = surface  # What frames_run draws into
+    runs = {name: [] for name in post.enabled}
+    for name in post.enabled:
+        setattr(post, f"_{name}", lambda frame, name=name: runs[name].append(True))
+    return post, runs
+
+def frames_run(post, runs, name, frames):
+    """Which of the next frames ran the effect"""
+    ran = []
+    for _ in range(frames):
+        before = len(runs[name])
+        post.apply(post.surface)
+        ran.append(len(runs[name]) > before)
+    return ran
+
+def test_an_effect_over_budget_is_dropped_once_not_every_other_frame():
+    post, runs = counting_processor(budget_ms=0.0)
+    ran = frames_run(post, runs, "vignette", POST_DROP_FRAMES * 3)
+    assert ran == [True] * (POST_DROP_FRAMES - 1) + [False] * (POST_DROP_FRAMES * 2 + 1)
+
+def test_a_dropped_effect_comes_back_after_frames_with_room_to_spare():
+    post, runs = counting_processor(budget_ms=0.0)
+    frames_run(post, runs, "vignette", POST_DROP_FRAMES)
+    assert post.dropped["vignette"]
+    post.budget_ms = 1000.0
+    ran = frames_run(post, runs, "vignette", POST_RESTORE_FRAMES + 10)
+    assert ran == [False] * (POST_RESTORE_FRAMES - 1) + [True] * 11
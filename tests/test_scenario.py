@@ -0,0 +1,105 @@
+import os
+import types
+
+import pytest
+
+from config import *
+from car_game.env import CarEnv, STAY
+from car_game.scenario import Scenario, write_scenario
+from game_objects.car import Car
+from game_objects.obstacle import ObstacleManager
+from game_objects.road import Road
+from game_objects.traffic_flow import blocked_stretches, lane_intervals
+
+SCENARIOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scenarios")
+JAM = os.path.join(SCENARIOS, "jam.jsonl")
+
+def world(game):
+    """Everything a tick can change, for comparing runs"""
+    return (game.distance, game.car.x, game.car.lane,
+            tuple((type(obs).__name__, obs.lane, obs.x, obs.y, obs.speed) for obs in game.obstacles.obstacles))
+
+def play_headless(path):
+    """The states of run_headless's game after every tick"""
+    scenario = Scenario(path)
+    env = CarEnv(max_steps=scenario.ticks, ai_mode=True)
+    scenario.restart()
+    env.reset()
+    scenario.apply(env)
+    states, done = [], False
+    while not done:
+        scenario.update(env)
+        done = env.step(STAY)[2]
+        states.append(world(env))
+    scenario.close()
+    return states
+
+def test_reads_one_event_ahead(tmp_path):
+    path = tmp_path / "long.jsonl"
+    events = ({"tick": tick, "spawn": "trash", "lane": tick % NUM_LANES} for tick in range(0, 10000, 10))
+    write_scenario(path, {"ticks": 100000}, events)
+    scenario = Scenario(str(path))
+    assert scenario.line_number == 2 and scenario.pending["tick"] == 0
+    game = types.SimpleNamespace(distance=0, road=Road(), obstacles=ObstacleManager())
+    game.road.game = game
+    for _ in range(25):
+        scenario.update(game)
+    assert scenario.line_number == 5 and scenario.pending["tick"] == 30
+    scenario.close()
+
+@pytest.mark.parametrize("lines, message", [
+    ([], "empty scenario"),
+    (['{"seed": 1}'], "needs a 'ticks' length"),
+    (['{"ticks": 10}', '{"tick": 1, "spawn": "trash", "lane": 0'], ":2:"),
+    (['{"ticks": 10}', '', '{"tick": 1, "distance": 5, "spawn": "trash", "lane": 0}'], ":3: an event needs exactly one"),
+    (['{"ticks": 10}', '{"tick": 1}'], "needs one of"),
+    (['{"ticks": 10}', '{"tick": 1, "spawn": "bus", "lane": 0}'], "unknown spawn 'bus'"),
+    (['{"ticks": 10}', f'{{"tick": 1, "spawn": "trash", "lane": {NUM_LANES}}}'], "needs a lane"),
+])
+def test_rejects_malformed_files(tmp_path, lines, message):
+    path = tmp_path / "bad.jsonl"
+    path.write_text("".join(line + "\n" for line in lines))
+    with pytest.raises(ValueError, match=message):
+        Scenario(str(path))
+
+def test_same_seed_same_run():
+    assert play_headless(JAM) == play_headless(JAM)
+
+def test_game_plays_it_as_headless_does(monkeypatch, tmp_path):
+    from car_game.main import Game
+    monkeypatch.setattr("car_game.main.LEADERBOARD_PATH", str(tmp_path / "leaderboard.db"))
+    game = Game(backend="software", scenario_path=JAM)
+    try:
+        game.car.ai_mode = True
+        states = []
+        while not game.game_over:
+            game.update()
+            game.render()
+            states.append(world(game))
+    finally:
+        game.effects.shutdown()
+        game.io.shutdown()
+        game.leaderboard.close()
+    assert states == play_headless(JAM)
+
+def test_a_lane_stays_open_through_the_jam():
+    # Nothing crashes here, so the run reaches the random burst
+    scenario = Scenario(JAM)
+    game = types.SimpleNamespace(distance=0, car=Car(), road=Road(), obstacles=ObstacleManager())
+    game.car.game = game.road.game = game
+    scenario.apply(game)
+    burst = False
+    while not scenario.finished:
+        scenario.update(game)
+        game.road.scroll()
+        game.distance += SCROLL_SPEED
+        game.obstacles.update(game.road)
+        burst |= scenario.settings["traffic_density"] > 1
+        obstacles = game.obstacles.obstacles
+        intervals = lane_intervals(
+            [obs.lane for obs in obstacles], [getattr(obs, "target_lane", obs.lane) for obs in obstacles],
+            [getattr(obs, "is_changing_lanes", False) for obs in obstacles],
+            [obs.y for obs in obstacles], [obs.height for obs in obstacles])
+        assert not list(blocked_stretches(intervals, range(NUM_LANES))), f"every lane blocked on tick {scenario.tick}"
+    assert burst
+    scenario.close()
@@ -0,0 +1,21 @@
+import random
+
+import numpy as np
+
+from game_objects.traffic_flow import car_following_speeds, car_following_speeds_list
+
+def test_list_and_numpy_car_following_agree_exactly():
+    rng = random.Random(0)
+    for _ in range(2000):
+        count = rng.randint(1, 60)
+        lane = [rng.randrange(3) for _ in range(count)]
+        changing = [rng.random() < 0.2 for _ in range(count)]
+        target_lane = [min(2, max(0, l + rng.choice((-1, 1)))) if c else l for l, c in zip(lane, changing)]
+        # Whole-tick positions as well, so ties in y are covered
+        y = [rng.choice((rng.uniform(-100, 700), float(rng.randrange(-100, 700, 3)))) for _ in range(count)]
+        height = [rng.choice((40.0, 70.0)) for _ in range(count)]
+        speed = [-rng.uniform(0, 2) for _ in range(count)]
+        follows = [rng.random() < 0.7 for _ in range(count)]
+        columns = (lane, target_lane, changing, y, height, speed, follows)
+        expected = car_following_speeds(*map(np.array, columns)).tolist()
+        assert car_following_speeds_list(*columns) == expected
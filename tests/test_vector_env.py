@@ -0,0 +1,75 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def compare(num_envs, settings, steps, max_steps, seed=100):
+    """Step VectorCarEnv and one CarEnv per row on the same seeds and actions.
+
+    Episodes reset as they end, so resets are compared too. Returns the
+    differences as messages, empty when every observation, reward and
+    done matched.
+    """
+    from car_game.env import CarEnv
+    from car_game.vector_env import VectorCarEnv
+
+    actions = np.random.default_rng(seed).integers(0, CarEnv.num_actions, size=(steps, num_envs))
+    envs = VectorCarEnv(num_envs, settings=dict(settings), max_steps=max_steps)
+    vector = [envs.reset(seeds=seed)]
+    for step_actions in actions:
+        observations, rewards, dones, info = envs.step(step_actions)
+        vector.append((observations, rewards, dones, info["final_observation"]))
+
+    differences = []
+    for i in range(num_envs):
+        env = CarEnv(settings=dict(settings), max_steps=max_steps)
+        if not np.array_equal(env.reset(seed=seed + i), vector[0][i]):
+            differences.append(f"env {i}: first observation differs")
+            continue
+        for t, action in enumerate(actions[:, i]):
+            observation, reward, done, _ = env.step(int(action))
+            observations, rewards, dones, finals = vector[t + 1]
+            if done != dones[i] or reward != rewards[i] or not np.array_equal(observation, finals[i]):
+                differences.append(f"env {i}: step {t} differs (done {done} vs {dones[i]})")
+                break
+            if done and not np.array_equal(env.reset(), observations[i]):
+                differences.append(f"env {i}: reset after step {t} differs")
+                break
+    return differences
+
+SETTINGS = [
+    {"difficulty": 0, "traffic_density": 0.5},
+    {"difficulty": 1, "traffic_density": 1.0},
+    {"difficulty": 2, "traffic_density": 2.0},
+]
+
+@pytest.mark.parametrize("settings", SETTINGS)
+def test_vector_env_matches_car_env(settings):
+    assert compare(6, settings, steps=1500, max_steps=400) == []
+
+# NUM_LANES is read at import time, so other lane counts run in a fresh
+# interpreter with config patched first, the way benchmark.py --lanes does
+LANES_SCRIPT = """
+import json, sys
+import config
+lanes = int(sys.argv[1])
+config.NUM_LANES = lanes
+config.LANE_WIDTH = min(config.LANE_WIDTH, (config.SCREEN_WIDTH - 2 * config.CURVE_AMPLITUDE) // lanes)
+config.ROAD_WIDTH = config.LANE_WIDTH * lanes
+config.MIDDLE_LANE = lanes // 2
+from tests.test_vector_env import compare
+print(json.dumps(compare(4, json.loads(sys.argv[2]), steps=1000, max_steps=300)))
+"""
+
+@pytest.mark.parametrize("lanes", [2, 4, 6])
+@pytest.mark.parametrize("settings", SETTINGS[1:])
+def test_vector_env_matches_car_env_with_other_lane_counts(lanes, settings):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, "-c", LANES_SCRIPT, str(lanes), json.dumps(settings)],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout.splitlines()[-1]) == []
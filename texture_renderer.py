@@ -0,0 +1,291 @@
+import math
+import pygame
+from pygame._sdl2.video import Window, Renderer, Texture
+from config import *
+from game_objects.obstacle import TrafficCar, Trash, Roadblock
+from renderer import GameRenderer
+
+class TextureDisplay:
+    """Window drawn through an SDL2 Renderer instead of the display surface.
+
+    The menu and HUD keep drawing into a software surface (overlay), which is
+    uploaded to one streaming texture per frame and drawn over the world.
+    """
+    def __init__(self, title):
+        self.window = Window(title, size=(SCREEN_WIDTH, SCREEN_HEIGHT))
+        # -1 prefers a GPU renderer but accepts SDL's software renderer
+        self.renderer = Renderer(self.window, accelerated=-1)
+        self.overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.overlay_texture = Texture(self.renderer, (SCREEN_WIDTH, SCREEN_HEIGHT), streaming=True)
+        self.overlay_texture.blend_mode = pygame.BLENDMODE_BLEND
+
+    @classmethod
+    def create(cls, title):
+        """Return a TextureDisplay, or None if SDL can't provide a renderer"""
+        try:
+            return cls(title)
+        except pygame.error as e:
+            print(f"Texture backend unavailable ({e}); using software rendering")
+            return None
+
+    def present(self):
+        self.overlay_texture.update(self.overlay)
+        self.overlay_texture.draw()
+        self.renderer.present()
+
+class TextureRenderer(GameRenderer):
+    """GameRenderer that draws the world with SDL2 textures.
+
+    Sprites (car, traffic, barriers, trash, rain glyphs, grid, particles and
+    the post-process layers) are uploaded once and drawn with transforms, so
+    rotation is done by the backend. The road surface uses rect primitives;
+    edges and lane dashes are stretched and rotated textures. The HUD is still drawn in software on the overlay.
+    """
+    def __init__(self, screen, effects, gpu, settings=None):
+        self.gpu = gpu
+        self.glyph_atlases = {}
+        self.light_texture = None
+        self.light_sprite_textures = {}
+        self.scenery_textures = {}  # chunk index -> (tile, texture)
+        super().__init__(screen, effects, settings)
+        self.car_texture = self._upload(self.car_sprite)
+        self.grid_texture = self._upload(self._create_grid_sprite())
+        self.barrier_texture = self._upload(self._create_barrier_sprite())
+        self.trash_texture = self._upload(self._create_trash_sprite())
+        self.scanline_texture = self._upload(self.scanline_surface)
+        self.glow_shader_texture = self._upload(self.glow_shader)
+        self.dash_texture = self._upload(self._create_dash_sprite())
+        edge = pygame.Surface((3, 1))
+        edge.fill(NEON_BLUE)
+        self.edge_texture = self._upload(edge)
+
+    def _upload(self, surface):
+        texture = Texture.from_surface(self.gpu, surface)
+        texture.blend_mode = pygame.BLENDMODE_BLEND
+        return texture
+
+    def _create_car_glow_sprites(self):
+        # Called again by apply_quality whenever the glow layer count changes
+        super()._create_car_glow_sprites()
+        self.car_glow_textures = {
+            off_road: self._upload(sprite) for off_road, sprite in self.car_glow_sprites.items()
+        }
+        self.traffic_texture = self._upload(self._create_traffic_sprite())
+        self.particle_textures = {}
+
+    def _create_traffic_sprite(self):
+        layers = self.glow_layers
+        surface = pygame.Surface((CAR_WIDTH + layers * 2, CAR_HEIGHT + layers * 2), pygame.SRCALPHA)
+        for i in range(layers):
+            alpha = 100 - i * 20
+            pygame.draw.rect(surface, (*NEON_BLUE, alpha),
+                            [layers - i, layers - i, CAR_WIDTH + i*2, CAR_HEIGHT + i*2],
+                            border_radius=5)
+        pygame.draw.rect(surface, MATRIX_GREEN,
+                        [layers, layers, CAR_WIDTH, CAR_HEIGHT], border_radius=5)
+        pygame.draw.line(surface, GRID_COLOR,
+                        (layers + CAR_WIDTH/2, layers),
+                        (layers + CAR_WIDTH/2, layers + CAR_HEIGHT), 2)
+        window_width = CAR_WIDTH * 0.6
+        pygame.draw.rect(surface, NEON_BLUE,
+                        [layers + (CAR_WIDTH - window_width) / 2, layers + CAR_HEIGHT * 0.2,
+                         window_width, CAR_HEIGHT * 0.3],
+                        border_radius=3)
+        return surface
+
+    def _create_barrier_sprite(self):
+        width, height = LANE_WIDTH * 0.8, 40
+        surface = pygame.Surface((width + 4, height + 4), pygame.SRCALPHA)
+        pygame.draw.rect(surface, CYBER_PINK, [2, 2, width, height])
+        for i in range(0, int(width), 20):
+            pygame.draw.line(surface, NEON_BLUE, (2 + i, 2), (12 + i, 2 + height), 5)
+        pygame.draw.rect(surface, (*CYBER_PINK, 100), [0, 0, width + 4, height + 4], 2)
+        return surface
+
+    def _create_trash_sprite(self):
+        size = 30
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        glitch_points = [(0, size/2), (size/2, 0), (size, size/2), (size/2, size)]
+        pygame.draw.polygon(surface, (*CYBER_PINK, 150), glitch_points)
+        pygame.draw.polygon(surface, (*NEON_BLUE, 100),
+                           [(p[0]+2, p[1]-2) for p in glitch_points])
+        pygame.draw.polygon(surface, (*NEON_GREEN, 50),
+                           [(p[0]-2, p[1]+2) for p in glitch_points])
+        return surface
+
+    def _create_grid_sprite(self):
+        # One cell taller than the screen so it can scroll by offsetting the draw
+        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT + GRID_SIZE), pygame.SRCALPHA)
+        for y in range(0, SCREEN_HEIGHT + GRID_SIZE, GRID_SIZE):
+            pygame.draw.line(surface, GRID_COLOR, (0, y), (SCREEN_WIDTH, y), 1)
+        for x in range(0, SCREEN_WIDTH + GRID_SIZE, GRID_SIZE):
+            pygame.draw.line(surface, GRID_COLOR, (x, 0), (x, SCREEN_HEIGHT + GRID_SIZE), 1)
+        return surface
+
+    def _glyph_atlas(self):
+        antialias = self.effects.digital_rain.antialias
+        if antialias not in self.glyph_atlases:
+            font = self.effects.digital_rain.font
+            glyphs = [font.render(char, antialias, MATRIX_GREEN) for char in MATRIX_CHARS]
+            atlas = pygame.Surface((sum(g.get_width() for g in glyphs),
+                                    max(g.get_height() for g in glyphs)), pygame.SRCALPHA)
+            rects = {}
+            x = 0
+            for char, glyph in zip(MATRIX_CHARS, glyphs):
+                atlas.blit(glyph, (x, 0))
+                rects[char] = pygame.Rect(x, 0, glyph.get_width(), glyph.get_height())
+                x += glyph.get_width()
+            self.glyph_atlases[antialias] = (self._upload(atlas), rects)
+        return self.glyph_atlases[antialias]
+
+    def _particle_texture(self, color, size):
+        key = (color, size)
+        texture = self.particle_textures.get(key)
+        if texture is None:
+            layers = self.effects.particles.glow_layers
+            outer = size + (layers - 1) * 2
+            surface = pygame.Surface((outer * 2, outer * 2), pygame.SRCALPHA)
+            for i in range(layers):
+                layer_size = size + i * 2
+                alpha = 255 // (i + 1)
+                layer = pygame.Surface((layer_size * 2, layer_size * 2), pygame.SRCALPHA)
+                pygame.draw.circle(layer, (*color, alpha), (layer_size, layer_size), layer_size)
+                surface.blit(layer, (outer - layer_size, outer - layer_size))
+            texture = self._upload(surface)
+            self.particle_textures[key] = texture
+        return texture
+
+    def render_game(self, road, car, obstacles, scenery=None):
+        self.gpu.draw_color = (*DARK_MATRIX, 255)
+        self.gpu.clear()
+
+        self._draw_background()
+        if scenery is not None:
+            self._draw_scenery(scenery, road)
+        self._draw_road(road)
+        self._draw_obstacles(obstacles)
+        self._draw_car(car)
+
+        if self.settings.get("night_mode"):
+            self._draw_lighting(car, obstacles)
+
+        if self.post_process:
+            self.scanline_texture.draw()
+            self.glow_shader_texture.draw()
+
+        # HUD goes on the transparent overlay
+        self.screen.fill((0, 0, 0, 0))
+        self._render_ai_status(car)
+
+    def _draw_background(self):
+        effects = self.effects
+        effects.update()
+
+        atlas, rects = self._glyph_atlas()
+        for drop in effects.digital_rain.drops:
+            for i, char in enumerate(drop['chars']):
+                atlas.alpha = max(0, 255 - i * 15)
+                rect = rects[char]
+                atlas.draw(srcrect=rect, dstrect=(drop['x'], drop['y'] + i * 15, rect.width, rect.height))
+        atlas.alpha = 255
+
+        offset = effects.cyber_grid.offset
+        self.grid_texture.draw(dstrect=(0, offset - GRID_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT + GRID_SIZE))
+
+        if effects.particles.glow_layers:
+            for p in effects.particles.particles:
+                texture = self._particle_texture(p['color'], p['size'])
+                half = texture.width / 2
+                texture.draw(dstrect=(p['pos'].x - half, p['pos'].y - half, texture.width, texture.height))
+
+    def _draw_scenery(self, scenery, road):
+        # Tiles are rasterized in software, then uploaded once each
+        textures = {}
+        for index, tile, y in self._scenery_tiles(scenery, road):
+            cached = self.scenery_textures.get(index)
+            texture = cached[1] if cached is not None and cached[0] is tile else self._upload(tile)
+            textures[index] = (tile, texture)
+            texture.draw(dstrect=(0, y, texture.width, texture.height))
+        self.scenery_textures = textures
+
+    def _draw_road(self, road):
+        left_points, right_points, divider_points = self._road_points(road)
+        gpu = self.gpu
+
+        # Road surface: one rect per segment band
+        gpu.draw_color = (*DARK_MATRIX, 255)
+        for i in range(len(left_points) - 1):
+            (left_a, y_a), (left_b, y_b) = left_points[i], left_points[i + 1]
+            right_a, right_b = right_points[i][0], right_points[i + 1][0]
+            x = min(left_a, left_b)
+            gpu.fill_rect((x, y_a, max(right_a, right_b) - x, y_b - y_a))
+
+        # Edges, 3px wide: one stretched strip per segment
+        edge = self.edge_texture
+        for points in (left_points, right_points):
+            for (x_a, y_a), (x_b, y_b) in zip(points, points[1:]):
+                length = math.hypot(x_b - x_a, y_b - y_a) + 2  # Overlap the joints
+                angle = math.degrees(math.atan2(x_b - x_a, y_b - y_a))
+                edge.draw(dstrect=((x_a + x_b) / 2 - 1.5, (y_a + y_b) / 2 - length / 2, 3, length),
+                          angle=-angle)
+        calls = 3 * (len(left_points) - 1)  # Fill bands and both edges
+
+        # Lane dashes, the software path's sprite rotated by the backend
+        dash = self.dash_texture
+        for points in divider_points:
+            for (x, y), angle in self._dash_placements(points, road.offset):
+                dash.draw(dstrect=(x - dash.width / 2, y - dash.height / 2, dash.width, dash.height),
+                          angle=-angle)
+                calls += 1
+        self.road_draw_calls = calls
+
+    def _draw_obstacles(self, obstacles):
+        layers = self.glow_layers
+        for obstacle in obstacles.obstacles:
+            if isinstance(obstacle, TrafficCar):
+                texture = self.traffic_texture
+                texture.draw(dstrect=(obstacle.x - layers, obstacle.y - layers,
+                                      texture.width, texture.height))
+            elif isinstance(obstacle, Roadblock):
+                texture = self.barrier_texture
+                texture.draw(dstrect=(obstacle.x - 2, obstacle.y - 2, texture.width, texture.height))
+            elif isinstance(obstacle, Trash):
+                # Software blits the rotated bounding box at (x, y); match its center
+                rad = math.radians(obstacle.rotation)
+                box = obstacle.width * (abs(math.cos(rad)) + abs(math.sin(rad)))
+                center_x = obstacle.x + box / 2
+                center_y = obstacle.y + box / 2
+                self.trash_texture.draw(
+                    dstrect=(center_x - obstacle.width / 2, center_y - obstacle.height / 2,
+                             obstacle.width, obstacle.height),
+                    angle=-obstacle.rotation)
+
+    def _draw_car(self, car):
+        center_x = car.x + CAR_WIDTH // 2
+        center_y = car.y + CAR_HEIGHT // 2
+        # pygame.transform.rotate turns counter-clockwise, Texture.draw clockwise
+        for texture in (self.car_glow_textures[car.off_road], self.car_texture):
+            texture.draw(dstrect=(center_x - texture.width / 2, center_y - texture.height / 2,
+                                  texture.width, texture.height),
+                         angle=-car.angle)
+
+    def _draw_lighting(self, car, obstacles):
+        # Same cached light sprites as the software path, accumulated in a
+        # render target texture and multiplied over the frame
+        light_map = self._get_light_map()
+        if self.light_texture is None:
+            self.light_texture = Texture(self.gpu, (SCREEN_WIDTH, SCREEN_HEIGHT), target=True)
+            self.light_texture.blend_mode = pygame.BLENDMODE_MOD
+
+        self.gpu.target = self.light_texture
+        self.gpu.draw_color = (*NIGHT_AMBIENT, 255)
+        self.gpu.clear()
+        for bucket, sprite, (x, y) in light_map.placements(self._light_sources(car, obstacles)):
+            texture = self.light_sprite_textures.get(bucket)
+            if texture is None:
+                texture = Texture.from_surface(self.gpu, sprite)
+                texture.blend_mode = pygame.BLENDMODE_ADD
+                self.light_sprite_textures[bucket] = texture
+            texture.draw(dstrect=(x, y, texture.width, texture.height))
+        self.gpu.target = None
+        self.light_texture.draw()